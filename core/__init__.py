@@ -1,13 +1,27 @@
 """
 Core system modules for Huzenix.
+Exports are resolved lazily so that importing `core` (e.g. from the
+headless server or batch runner) never loads audio libraries.
 """
 
-from core.voice_input import listen, wait_for_wake
-from core.voice_output import speak
-from core.intent_parser import Intent, IntentParser
-from core.security import SecurityManager
-from core.conversation_engine import ConversationEngine
-from modules.code_runner import CodeRunner 
+import importlib
+
+_EXPORTS = {
+    "listen": "core.voice_input",
+    "wait_for_wake": "core.voice_input",
+    "speak": "core.voice_output",
+    "Intent": "core.intent_parser",
+    "IntentParser": "core.intent_parser",
+    "SecurityManager": "core.security",
+    "ConversationEngine": "core.conversation_engine",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'core' has no attribute '{name}'")
+    return getattr(importlib.import_module(module), name)
 
 
 __all__ = [
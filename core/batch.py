@@ -0,0 +1,175 @@
+"""
+Offline batch runner for Huzenix.
+Streams queries from JSONL through ConversationEngine with a worker pool,
+without microphone or speaker, and writes replies plus per-query timings
+as JSONL. Used for regression runs and nightly transcript replays.
+
+Input, one object per line (plain text lines are treated as queries):
+    {"id": "q1", "query": "aaj ka mausam", "session": "s1"}
+    "transcript" is accepted in place of "query". Lines without a session
+    run in a session of their own. Queries of one session run in order.
+
+Each worker keeps at most OPEN_SESSIONS sessions open; the least recently
+used one is closed (its memory checkpointed to its session folder) and is
+reopened from there if more of its queries arrive.
+"""
+
+import json
+import queue
+from collections import OrderedDict
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+from core.history_store import HistoryStore
+from core.intent_parser import Intent
+from core.memory_manager import MemoryManager
+from core.tracing import _percentiles
+
+DEFAULT_WORKERS = 4
+QUEUE_SIZE = 64    # per worker; bounds how far reading runs ahead
+OPEN_SESSIONS = 32  # per worker; least recently used sessions are closed
+
+
+def read_queries(stream: IO[str]) -> Iterator[dict]:
+    """Yield one query dict per non-empty input line."""
+    for seq, line in enumerate(stream):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            item = line
+        if not isinstance(item, dict):
+            item = {"query": str(item)}
+
+        item["seq"] = seq
+        item.setdefault("id", str(seq))
+        item["query"] = item.get("query") or item.get("transcript") or ""
+        item["session"] = str(item.get("session") or f"q{seq}")
+        yield item
+
+
+class BatchRunner:
+    """Runs queries on N workers; a session is always owned by one worker."""
+
+    def __init__(self, engine, security=None, workers: int = DEFAULT_WORKERS, data_dir: Path = None):
+        self.engine = engine
+        self.security = security
+        self.workers = max(1, workers)
+        self.data_dir = Path(data_dir or tempfile.mkdtemp(prefix="huzenix-batch-"))
+        self.history = HistoryStore(self.data_dir / "history.db")
+
+        self._queues = [queue.Queue(maxsize=QUEUE_SIZE) for _ in range(self.workers)]
+        self._write_lock = threading.Lock()
+        self._latencies = []
+        self._errors = 0
+
+    def _memory_for(self, sessions: "OrderedDict[str, MemoryManager]", session: str) -> MemoryManager:
+        memory = sessions.get(session)
+        if memory is not None:
+            sessions.move_to_end(session)
+            return memory
+
+        if len(sessions) >= OPEN_SESSIONS:
+            _, oldest = sessions.popitem(last=False)
+            oldest.close()
+        session_dir = self.data_dir / f"session-{zlib.crc32(session.encode()):08x}"
+        session_dir.mkdir(parents=True, exist_ok=True)
+        memory = sessions[session] = MemoryManager(
+            session_dir, session_id=session, history=self.history
+        )
+        return memory
+
+    def _worker(self, index: int, out: IO[str]) -> None:
+        sessions: "OrderedDict[str, MemoryManager]" = OrderedDict()
+        jobs = self._queues[index]
+
+        while True:
+            item = jobs.get()
+            if item is None:
+                for memory in sessions.values():
+                    memory.close()
+                return
+
+            start = time.perf_counter()
+            record = {"id": item["id"], "seq": item["seq"], "session": item["session"],
+                      "query": item["query"]}
+            try:
+                memory = self._memory_for(sessions, item["session"])
+                result, reply = self.engine.process_headless(
+                    item["query"], security_manager=self.security, memory=memory
+                )
+                record["reply"] = reply
+                record["exit"] = result == Intent.EXIT
+            except Exception as e:
+                record["error"] = f"{type(e).__name__}: {e}"
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            record["ms"] = round(elapsed_ms, 3)
+
+            with self._write_lock:
+                self._latencies.append(elapsed_ms)
+                if "error" in record:
+                    self._errors += 1
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def run(self, source: IO[str], out: IO[str]) -> dict:
+        """Process every query from source, write results to out, return a report."""
+        threads = [
+            threading.Thread(target=self._worker, args=(i, out), name=f"huzenix-batch-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in threads:
+            t.start()
+
+        start = time.perf_counter()
+        count = 0
+        for item in read_queries(source):
+            index = zlib.crc32(item["session"].encode()) % self.workers
+            self._queues[index].put(item)
+            count += 1
+
+        for q in self._queues:
+            q.put(None)
+        for t in threads:
+            t.join()
+        self.history.close()
+        elapsed = time.perf_counter() - start
+
+        report = {
+            "queries": count,
+            "errors": self._errors,
+            "workers": self.workers,
+            "seconds": round(elapsed, 3),
+            "queries_per_sec": round(count / elapsed, 1) if elapsed else 0.0,
+        }
+        if self._latencies:
+            report["latency_ms"] = _percentiles(list(self._latencies))
+        return report
+
+
+def run_batch(engine, security, input_path: str, output_path: Optional[str], workers: int,
+              keep_data: bool = False) -> dict:
+    runner = BatchRunner(engine, security, workers)
+    source = sys.stdin if input_path == "-" else open(input_path, encoding="utf-8")
+    out = sys.stdout if not output_path or output_path == "-" else open(output_path, "w", encoding="utf-8")
+
+    try:
+        report = runner.run(source, out)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+        if not keep_data:
+            shutil.rmtree(runner.data_dir, ignore_errors=True)
+
+    print(json.dumps(report), file=sys.stderr)
+    return report
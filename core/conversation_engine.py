@@ -3,9 +3,16 @@ Conversation engine for Huzenix.
 Conversation-first, coding-aware, memory-aware.
 """
 
-from typing import Callable, Dict
+import contextlib
+import threading
+import weakref
+from typing import Callable, Dict, Optional, Tuple
+from core import paging, security
 from core.intent_parser import Intent, IntentParser
-from core.llm_client import ask_llm
+from core.llm_client import ask_llm, stream_tokens
+from core.tracing import span
+from core.voice_input import scripted_input
+from core.voice_output import capture_speech
 
 CONFIDENCE_THRESHOLD = 0.45
 ROLE_USER = "user"
@@ -16,6 +23,9 @@ class ConversationEngine:
     def __init__(self):
         self.handlers: Dict[Intent, Callable[[str], str]] = {}
         self.intent_parser = IntentParser()
+        # Pending listing continuation or confirmation per memory (i.e. per session)
+        self._pending = weakref.WeakKeyDictionary()
+        self._pending_lock = threading.Lock()
 
     def register_handler(self, intent: Intent, handler: Callable[[str], str]) -> None:
         self.handlers[intent] = handler
@@ -30,9 +40,78 @@ class ConversationEngine:
         text = text.lower()
         return any(k in text for k in keywords)
 
-    def process(self, query: str, security_manager=None, memory=None) -> str:
+    # ---------- LISTING CONTINUATIONS ---------- #
+
+    def _pending_key(self, memory):
+        return self if memory is None else memory
+
+    def _pop_pending(self, memory):
+        with self._pending_lock:
+            return self._pending.pop(self._pending_key(memory), None)
+
+    def _keep_pending(self, memory, pending) -> None:
+        if pending is None or getattr(pending, "done", False):
+            return
+        with self._pending_lock:
+            self._pending[self._pending_key(memory)] = pending
+
+    def _continue_listing(self, query: str, pager: paging.Pager, memory) -> Optional[str]:
+        """Next page or summary of a pending listing; None if query is something else."""
+        if paging.is_continue(query):
+            reply = pager.next_page()
+            self._keep_pending(memory, pager)
+        elif paging.is_summary(query):
+            reply = pager.summary(ask_llm)
+        else:
+            return None
+
+        if memory:
+            memory.add_message(ROLE_USER, query)
+            memory.add_message(ROLE_ASSISTANT, reply)
+        return reply
+
+    def _answer_confirmation(self, query: str, confirmation, security_manager, memory) -> Optional[str]:
+        """Run or cancel a pending action; None if query is something else."""
+        if security.is_yes(query):
+            if security_manager is not None:
+                reply = security_manager.run_confirmed(confirmation)
+            else:
+                reply = confirmation.action()
+        elif security.is_no(query):
+            reply = "Theek hai, cancel kar diya."
+        else:
+            return None
+
+        if memory:
+            memory.add_message(ROLE_USER, query)
+            memory.add_message(ROLE_ASSISTANT, reply)
+        return reply
+
+    def process(self, query: str, security_manager=None, memory=None, disabled: frozenset = frozenset()) -> str:
+        """
+        Handle one user query.
+
+        Args:
+            disabled: Intents whose handlers may not run here (e.g. code and
+                      files over the network API)
+        """
         try:
-            intent, confidence = self.intent_parser.parse(query)
+            # Any other reply drops a pending listing or confirmation
+            pending = self._pop_pending(memory)
+            if isinstance(pending, security.Confirmation):
+                with span("confirmation"):
+                    reply = self._answer_confirmation(query, pending, security_manager, memory)
+                if reply is not None:
+                    return reply
+            elif pending is not None and not (security_manager and security_manager.is_locked()):
+                with span("listing"):
+                    reply = self._continue_listing(query, pending, memory)
+                if reply is not None:
+                    return reply
+
+            with span("intent") as s:
+                intent, confidence = self.intent_parser.parse(query)
+                s.set(intent=intent.value, confidence=confidence)
 
             # EXIT → no memory pollution
             if intent == Intent.EXIT:
@@ -42,6 +121,8 @@ class ConversationEngine:
             if security_manager and self.intent_parser.requires_security(intent):
                 if security_manager.is_locked():
                     return "System locked hai. Pehle unlock karo."
+            if intent in disabled:
+                return "Ye command yahan band hai."
 
             # 🧠 Store user message
             if memory:
@@ -67,11 +148,21 @@ class ConversationEngine:
             # 🛠 Command handling (only when clearly intended)
             handler = self.handlers.get(intent)
             if handler:
-                response = handler(query)
+                with span("handler", intent=intent.value), paging.capture() as offered, \
+                        security.capture_confirmations() as requested:
+                    response = handler(query)
+                if requested:
+                    self._keep_pending(memory, requested[-1])
+                elif offered:
+                    self._keep_pending(memory, offered[-1])
                 response = response if response else "Done."
 
                 if memory:
-                    memory.add_message(ROLE_ASSISTANT, response)
+                    # Module handlers may speak themselves and return a bool
+                    memory.add_message(
+                        ROLE_ASSISTANT,
+                        response if isinstance(response, str) else "Done."
+                    )
 
                 return response
 
@@ -84,3 +175,38 @@ class ConversationEngine:
         except Exception as e:
             print("ConversationEngine error:", e)
             return "Command process karte waqt error aaya."
+
+    def process_headless(
+        self,
+        query: str,
+        security_manager=None,
+        memory=None,
+        on_chunk: Callable[[str], None] = None,
+        disabled: frozenset = frozenset(),
+    ) -> Tuple[object, str]:
+        """
+        Run process() without microphone or speaker (server, batch).
+        Anything handlers speak is captured, listen() answers "", and when
+        on_chunk is given LLM replies are streamed to it.
+
+        Returns:
+            (raw result, reply text)
+        """
+        streaming = stream_tokens(on_chunk) if on_chunk else contextlib.nullcontext()
+
+        with capture_speech(on_chunk) as spoken, scripted_input(), streaming:
+            result = self.process(
+                query,
+                security_manager=security_manager,
+                memory=memory,
+                disabled=disabled,
+            )
+
+        if result == Intent.EXIT:
+            reply = "Theek hai, session band."
+        elif isinstance(result, str) and result:
+            reply = "\n".join(spoken + [result])
+        else:
+            reply = "\n".join(spoken) or "Done."
+
+        return result, reply
@@ -0,0 +1,137 @@
+"""
+Event loop for Huzenix.
+A single dispatcher thread fed by event sources (STT transcripts, speech
+completion, reminders, timers). Nothing polls or sleeps: the loop blocks on
+its queue until the next event arrives or the next timer is due.
+"""
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from enum import Enum, auto
+from typing import Any, Callable, Optional
+
+
+class EventType(Enum):
+    TRANSCRIPT = auto()
+    SPEECH_DONE = auto()
+    REMINDER = auto()
+    EXIT = auto()       # the app should shut down (posted after the farewell)
+    WAKEUP = auto()
+    STOP = auto()
+
+
+class Event:
+    __slots__ = ("type", "payload", "created")
+
+    def __init__(self, type_: EventType, payload: Any = None):
+        self.type = type_
+        self.payload = payload
+        self.created = time.monotonic()
+
+
+class TimerHandle:
+    __slots__ = ("when", "interval", "callback", "cancelled")
+
+    def __init__(self, when: float, interval: Optional[float], callback: Callable[[], None]):
+        self.when = when
+        self.interval = interval
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class EventLoop:
+    """Thread-safe event queue with monotonic timers."""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Event]" = queue.Queue()
+        self._timers = []  # heap of (when, seq, TimerHandle)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._running = False
+
+    # ---------- SOURCES ---------- #
+
+    def post(self, type_: EventType, payload: Any = None) -> None:
+        """Queue an event. Safe to call from any thread."""
+        self._queue.put(Event(type_, payload))
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> TimerHandle:
+        return self._add_timer(time.monotonic() + delay, None, callback)
+
+    def call_every(self, interval: float, callback: Callable[[], None], first: float = None) -> TimerHandle:
+        delay = interval if first is None else first
+        return self._add_timer(time.monotonic() + delay, interval, callback)
+
+    def _add_timer(self, when: float, interval: Optional[float], callback) -> TimerHandle:
+        handle = TimerHandle(when, interval, callback)
+        with self._lock:
+            heapq.heappush(self._timers, (when, next(self._seq), handle))
+        # Wake the dispatcher so it recomputes its timeout
+        self.post(EventType.WAKEUP)
+        return handle
+
+    def stop(self) -> None:
+        self.post(EventType.STOP)
+
+    # ---------- DISPATCH ---------- #
+
+    def _next_timeout(self) -> Optional[float]:
+        with self._lock:
+            while self._timers and self._timers[0][2].cancelled:
+                heapq.heappop(self._timers)
+            if not self._timers:
+                return None
+            return max(0.0, self._timers[0][0] - time.monotonic())
+
+    def _run_due_timers(self) -> None:
+        now = time.monotonic()
+        due = []
+        with self._lock:
+            while self._timers and self._timers[0][0] <= now:
+                _, _, handle = heapq.heappop(self._timers)
+                if handle.cancelled:
+                    continue
+                due.append(handle)
+                if handle.interval is not None:
+                    handle.when = max(handle.when + handle.interval, now)
+                    heapq.heappush(self._timers, (handle.when, next(self._seq), handle))
+
+        for handle in due:
+            try:
+                handle.callback()
+            except Exception as e:
+                print("Timer error:", e)
+
+    def run(self, handler: Callable[[Event], None]) -> None:
+        """
+        Dispatch events to handler until stop() is called.
+
+        Args:
+            handler: Called on the loop thread for every non-internal event
+        """
+        self._running = True
+        while self._running:
+            try:
+                event = self._queue.get(timeout=self._next_timeout())
+            except queue.Empty:
+                event = None
+
+            self._run_due_timers()
+
+            if event is None or event.type == EventType.WAKEUP:
+                continue
+            if event.type == EventType.STOP:
+                break
+
+            try:
+                handler(event)
+            except Exception as e:
+                print("Event handler error:", e)
+
+        self._running = False
@@ -0,0 +1,186 @@
+"""
+Relevance-ranked fact retrieval for Huzenix.
+Facts are tokenized into hashed terms and kept in an inverted index of
+compact postings (fact id + normalized TF weight). A query gathers only
+the postings of its own terms and scores them with TF-IDF in a few NumPy
+operations, so lookup cost depends on matches, not on how many facts exist.
+"""
+
+import math
+import re
+import threading
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset(
+    "a an the is are was were am be to of in on at for and or my me i you your it this that "
+    "hai hain tha thi ka ki ke ko se mein mera meri mere main hum tum aap ye yeh wo woh".split()
+)
+DEFAULT_TOP_K = 5
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _term_id(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def _normalize(fact: str) -> str:
+    return " ".join(fact.lower().split())
+
+
+class FactIndex:
+    """
+    Hashed dedup set + inverted TF-IDF index over facts. Fact ids are
+    positions in the fact list the index was built from.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path) if path else None
+        self.size = 0                        # number of indexed facts
+        self._keys = set()                   # normalized fact hashes (dedup)
+        self._postings: Dict[int, Tuple[array, array]] = {}
+        self._fingerprint = 0                # crc chain over indexed facts
+        self._lock = threading.Lock()
+
+    # ---------- UPDATES ---------- #
+
+    def contains(self, fact: str) -> bool:
+        return hash(_normalize(fact)) in self._keys
+
+    def add(self, fact: str) -> bool:
+        """
+        Index a fact. Returns False if an equivalent fact is already indexed.
+        """
+        key = hash(_normalize(fact))
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            self._index(fact)
+        return True
+
+    def _index(self, fact: str) -> None:
+        doc_id = self.size
+        self.size += 1
+        self._fingerprint = zlib.crc32(fact.encode("utf-8"), self._fingerprint)
+
+        counts: Dict[int, int] = {}
+        for token in tokenize(fact):
+            tid = _term_id(token)
+            counts[tid] = counts.get(tid, 0) + 1
+        if not counts:
+            return
+
+        weights = {tid: 1.0 + math.log(c) for tid, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+
+        for tid, w in weights.items():
+            posting = self._postings.get(tid)
+            if posting is None:
+                posting = self._postings[tid] = (array("I"), array("f"))
+            posting[0].append(doc_id)
+            posting[1].append(w / norm)
+
+    def rebuild(self, facts: List[str]) -> None:
+        """Bring the index in line with facts, indexing only what is missing."""
+        with self._lock:
+            if self.size > len(facts) or self._fingerprint != _chain(facts[: self.size]):
+                self.size, self._fingerprint = 0, 0
+                self._postings.clear()
+            self._keys = {hash(_normalize(fact)) for fact in facts}
+            for fact in facts[self.size:]:
+                self._index(fact)
+
+    # ---------- QUERY ---------- #
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K) -> List[Tuple[int, float]]:
+        """
+        Top-k (fact id, score) for query, best first.
+        """
+        terms = {_term_id(t) for t in tokenize(query)}
+        if not terms or not self.size:
+            return []
+
+        ids_parts, weight_parts = [], []
+        with self._lock:
+            n = self.size
+            for tid in terms:
+                posting = self._postings.get(tid)
+                if posting is None:
+                    continue
+                ids = np.array(posting[0], dtype=np.uint32)
+                idf = math.log(1.0 + n / len(ids))
+                ids_parts.append(ids)
+                weight_parts.append(np.array(posting[1], dtype=np.float32) * idf)
+
+        if not ids_parts:
+            return []
+
+        ids = np.concatenate(ids_parts)
+        weights = np.concatenate(weight_parts)
+        candidates, inverse = np.unique(ids, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    # ---------- PERSISTENCE ---------- #
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            terms = np.fromiter(self._postings.keys(), dtype=np.uint32, count=len(self._postings))
+            lengths = np.fromiter(
+                (len(p[0]) for p in self._postings.values()), dtype=np.int64, count=len(self._postings)
+            )
+            offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=offsets[1:])
+            ids = np.frombuffer(b"".join(p[0].tobytes() for p in self._postings.values()), dtype=np.uint32)
+            weights = np.frombuffer(b"".join(p[1].tobytes() for p in self._postings.values()), dtype=np.float32)
+            meta = np.array([self.size, self._fingerprint], dtype=np.int64)
+
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, meta=meta, terms=terms, offsets=offsets, ids=ids, weights=weights)
+        tmp.replace(self.path)
+
+    def load(self) -> bool:
+        """Load saved postings; call rebuild(facts) afterwards to sync."""
+        if not self.path or not self.path.exists():
+            return False
+        try:
+            with np.load(self.path) as data:
+                size, fingerprint = (int(v) for v in data["meta"])
+                terms, offsets = data["terms"], data["offsets"]
+                ids, weights = data["ids"], data["weights"]
+        except (OSError, ValueError, KeyError) as e:
+            print("Fact index load error:", e)
+            return False
+
+        postings = {}
+        for i, tid in enumerate(terms.tolist()):
+            start, end = offsets[i], offsets[i + 1]
+            postings[tid] = (array("I", ids[start:end].tobytes()), array("f", weights[start:end].tobytes()))
+
+        with self._lock:
+            self.size, self._fingerprint = size, fingerprint
+            self._postings = postings
+        return True
+
+
+def _chain(facts: List[str]) -> int:
+    crc = 0
+    for fact in facts:
+        crc = zlib.crc32(fact.encode("utf-8"), crc)
+    return crc
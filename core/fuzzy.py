@@ -0,0 +1,43 @@
+"""
+Fuzzy name matching helpers for Huzenix.
+Shared by the offline indexes that resolve noisy spoken names (cities,
+file names): names are compared as lowercase letters and digits only, found
+by hashed trigram overlap and ranked by edit distance.
+"""
+
+import unicodedata
+import zlib
+from typing import List
+
+# ASCII punctuation and spaces, dropped by normalize()'s fast path
+_ASCII_DROP = {c: None for c in range(128) if not chr(c).isalnum()}
+
+
+def normalize(name: str) -> str:
+    """Lowercase, accents stripped, letters and digits only ("São Paulo" -> "saopaulo")."""
+    if name.isascii():
+        return name.lower().translate(_ASCII_DROP)
+    text = unicodedata.normalize("NFKD", name.lower())
+    return "".join(ch for ch in text if ch.isalnum())
+
+
+def trigrams(key: str) -> List[int]:
+    """Distinct hashed trigrams of a padded key."""
+    padded = f"  {key} "
+    if padded.isascii():
+        data = padded.encode("ascii")
+        return sorted({zlib.crc32(data[i:i + 3]) for i in range(len(data) - 2)})
+    return sorted({zlib.crc32(padded[i:i + 3].encode("utf-8")) for i in range(len(padded) - 2)})
+
+
+def edit_ratio(a: str, b: str) -> float:
+    """1 - Levenshtein distance / longer length."""
+    if a == b:
+        return 1.0
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return 1.0 - previous[-1] / max(len(a), len(b))
@@ -0,0 +1,214 @@
+"""
+Persistent conversation history for Huzenix.
+SQLite (WAL) table of turns indexed by session and timestamp. Inserts are
+queued and written in batches by a background thread so the conversation
+path never waits on disk; old rows are pruned by a retention policy.
+"""
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core import metrics
+
+RETENTION_DAYS = 180        # rows older than this are deleted on compaction
+MAX_ROWS = 200_000          # hard cap; oldest rows beyond it are deleted
+FLUSH_INTERVAL = 0.5        # seconds between batched inserts
+BATCH_SIZE = 500
+COMPACT_INTERVAL = 60 * 60  # seconds between retention passes
+
+PENDING = metrics.gauge("huzenix_history_pending", "Turns queued for the history DB")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id      INTEGER PRIMARY KEY,
+    session TEXT    NOT NULL,
+    ts      REAL    NOT NULL,
+    role    TEXT    NOT NULL,
+    content TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_turns_session_ts ON turns(session, ts);
+CREATE INDEX IF NOT EXISTS idx_turns_ts ON turns(ts);
+"""
+
+
+class HistoryStore:
+    """Append-mostly turn log with fast "last N" and time-range reads."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        retention_days: float = RETENTION_DAYS,
+        max_rows: int = MAX_ROWS,
+    ):
+        self.db_path = Path(db_path)
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._local = threading.local()
+        self._closed = False
+
+        conn = self._connect()
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # only applies to new files
+        conn.executescript(SCHEMA)
+
+        self._writer = threading.Thread(
+            target=self._write_loop, name="huzenix-history", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+        PENDING.track(self, lambda store: store._queue.qsize())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    # ---------- WRITES ---------- #
+
+    def append(self, session: str, role: str, content: str, ts: float = None) -> None:
+        """Queue a turn; it is written by the background thread."""
+        self._queue.put((session, ts or time.time(), role, content))
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything queued so far is on disk."""
+        if self._closed or not self._writer.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        last_compact = time.monotonic()
+
+        while True:
+            try:
+                item = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                item = False
+
+            rows, waiters, stop = [], [], False
+            while item is not False:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    rows.append(item)
+                if len(rows) >= BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = False
+
+            if rows:
+                try:
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO turns (session, ts, role, content) VALUES (?, ?, ?, ?)",
+                            rows,
+                        )
+                except sqlite3.Error as e:
+                    print("History write error:", e)
+
+            for waiter in waiters:
+                waiter.set()
+
+            if stop:
+                return
+
+            if time.monotonic() - last_compact > COMPACT_INTERVAL:
+                last_compact = time.monotonic()
+                self._compact(conn)
+
+    # ---------- READS ---------- #
+
+    def last_turns(self, session: str, n: int) -> List[Dict[str, str]]:
+        """Last n turns of a session, oldest first."""
+        rows = self._connect().execute(
+            "SELECT ts, role, content FROM turns WHERE session = ? ORDER BY ts DESC, id DESC LIMIT ?",
+            (session, n),
+        ).fetchall()
+        return [dict(r) for r in reversed(rows)]
+
+    def turns_between(
+        self,
+        start: float,
+        end: float = None,
+        session: Optional[str] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, str]]:
+        """Turns with start <= ts < end (epoch seconds), oldest first."""
+        end = end if end is not None else time.time()
+        if session is None:
+            sql = "SELECT session, ts, role, content FROM turns WHERE ts >= ? AND ts < ? ORDER BY ts LIMIT ?"
+            params = (start, end, limit)
+        else:
+            sql = ("SELECT session, ts, role, content FROM turns "
+                   "WHERE session = ? AND ts >= ? AND ts < ? ORDER BY ts LIMIT ?")
+            params = (session, start, end, limit)
+        return [dict(r) for r in self._connect().execute(sql, params).fetchall()]
+
+    def search(self, text: str, session: Optional[str] = None, limit: int = 20) -> List[Dict[str, str]]:
+        """Most recent turns containing text."""
+        pattern = f"%{text}%"
+        if session is None:
+            rows = self._connect().execute(
+                "SELECT session, ts, role, content FROM turns WHERE content LIKE ? ORDER BY ts DESC LIMIT ?",
+                (pattern, limit),
+            )
+        else:
+            rows = self._connect().execute(
+                "SELECT session, ts, role, content FROM turns "
+                "WHERE session = ? AND content LIKE ? ORDER BY ts DESC LIMIT ?",
+                (session, pattern, limit),
+            )
+        return [dict(r) for r in rows.fetchall()]
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+
+    # ---------- RETENTION ---------- #
+
+    def compact(self) -> None:
+        """Apply the retention policy now (normally done by the writer)."""
+        self.flush()
+        self._compact(self._connect())
+
+    def _compact(self, conn: sqlite3.Connection) -> None:
+        try:
+            with conn:
+                if self.retention_days:
+                    cutoff = time.time() - self.retention_days * 86400
+                    conn.execute("DELETE FROM turns WHERE ts < ?", (cutoff,))
+                if self.max_rows:
+                    conn.execute(
+                        "DELETE FROM turns WHERE id <= ("
+                        "SELECT id FROM turns ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                        (self.max_rows,),
+                    )
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            print("History compaction error:", e)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=5)
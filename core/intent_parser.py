@@ -6,6 +6,10 @@ Smartly distinguishes between commands and casual conversation.
 from enum import Enum
 from typing import Tuple
 
+from core import spoken_math
+
+MATH_CONFIDENCE = 0.9  # the whole query compiles as a calculation
+
 
 class Intent(Enum):
     TIME = "time"
@@ -32,10 +36,15 @@ class IntentParser:
         Intent.WEATHER: ["weather", "mausam", "temperature", "rain"],
         Intent.NOTES: ["note", "notes", "likh", "padho"],
         Intent.REMINDERS: ["reminder", "remind", "yaad"],
-        Intent.FILES: ["file", "folder", "directory", "delete file"],
+        Intent.FILES: ["file", "folder", "directory", "delete file", "kaunsi file", "which file",
+                       "move all", "copy all", "rename all", "delete all",
+                       "find text", "search text", "find content", "search content"],
         Intent.HELP: ["help", "commands", "what can you do"],
         Intent.EXIT: ["exit", "quit", "bye", "goodbye"],
-        Intent.CALCULATOR: ["calculate", "plus", "minus", "into", "divide", "+", "-", "*", "/"],
+        Intent.CALCULATOR: [
+            "calculate", "plus", "minus", "into", "divide", "+", "-", "*", "/",
+            "multiply", "guna", "square root", "percent", "power", "factorial",
+        ],
         Intent.CODE: ["code", "program", "script", "run code", "execute code","run this code","execute this code"],
     }
 
@@ -49,6 +58,10 @@ class IntentParser:
 
         text = query.lower()
 
+        # "paanch plus teen", "square root of 81": nothing but math
+        if spoken_math.compile_expression(spoken_math.normalize(text)) is not None:
+            return Intent.CALCULATOR, MATH_CONFIDENCE
+
         best_intent = Intent.CONVERSATION
         best_score = 0.0
 
@@ -72,6 +85,12 @@ class IntentParser:
         # stronger weighting
         return min(1.0, hits * 0.5)
 
+    @staticmethod
+    def add_keywords(intent: Intent, keywords: list) -> None:
+        """Extend an intent's keywords (plugins); duplicates are ignored."""
+        known = IntentParser.INTENT_KEYWORDS.setdefault(intent, [])
+        known.extend(kw.lower() for kw in keywords if kw.lower() not in known)
+
     @staticmethod
     def requires_security(intent: Intent) -> bool:
         return intent in {Intent.FILES}
@@ -1,10 +1,23 @@
+import contextlib
+import contextvars
+import json
+import os
+import threading
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from core import metrics
+from core.tracing import span
 
 # ---------------- CONFIG ---------------- #
 
-OLLAMA_URL = "http://localhost:11434/api/chat"
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/chat")
 MODEL = "llama3"
 REQUEST_TIMEOUT = 45
+FACTS_TOP_K = 5    # long-term facts injected per prompt
+POOL_SIZE = 16     # keep-alive connections shared by all callers
+MAX_IN_FLIGHT = 8  # concurrent requests; the rest wait for a slot
 
 SYSTEM_PROMPT = """
 You are Huzenix, a sharp personal AI assistant.
@@ -37,6 +50,40 @@ WHEN GIVING CODE:
 You remember the ongoing conversation context.
 """
 
+LLM_IN_FLIGHT = metrics.gauge("huzenix_llm_in_flight", "LLM requests currently running")
+LLM_REQUESTS = metrics.counter("huzenix_llm_requests_total", "LLM requests by outcome")
+LLM_LATENCY = metrics.histogram("huzenix_llm_request_seconds", "LLM request latency")
+
+_session = None
+_session_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+# When set, replies are streamed and every chunk is passed to the sink
+_token_sink: contextvars.ContextVar = contextvars.ContextVar("huzenix_token_sink", default=None)
+
+
+def _get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+@contextlib.contextmanager
+def stream_tokens(sink):
+    """Stream ask_llm replies in this context, calling sink(chunk) per chunk."""
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
 
 # ---------------- CORE ---------------- #
 
@@ -48,6 +95,14 @@ def ask_llm(user_message: str, memory=None) -> str:
         {"role": "system", "content": SYSTEM_PROMPT}
     ]
 
+    # ---- Inject relevant long-term facts (top-k only) ----
+    facts = memory.relevant_facts(user_message, FACTS_TOP_K) if memory else []
+    if facts:
+        messages.append({
+            "role": "system",
+            "content": "Known facts about the user:\n" + "\n".join(f"- {f}" for f in facts)
+        })
+
     # ---- Inject short-term memory ----
     if memory:
         for m in memory.get_context():
@@ -62,10 +117,12 @@ def ask_llm(user_message: str, memory=None) -> str:
         "content": user_message
     })
 
+    sink = _token_sink.get()
+
     payload = {
         "model": MODEL,
         "messages": messages,
-        "stream": False,
+        "stream": sink is not None,
         "options": {
             "temperature": 0.3,
             "top_p": 0.9,
@@ -74,24 +131,76 @@ def ask_llm(user_message: str, memory=None) -> str:
     }
 
     try:
-        r = requests.post(
-            OLLAMA_URL,
-            json=payload,
-            timeout=REQUEST_TIMEOUT
-        )
-        r.raise_for_status()
+        with span("llm", model=MODEL, messages=len(messages)) as s:
+            reply, data = _post(payload, sink)
+            s.set(**_ollama_timings(data))
 
-        data = r.json()
-        reply = data.get("message", {}).get("content", "").strip()
+        LLM_REQUESTS.inc(outcome="ok")
 
         return reply or "Samajh nahi aaya, thoda aur batao."
 
     except requests.exceptions.ConnectionError:
+        LLM_REQUESTS.inc(outcome="connection_error")
         return "Ollama connect nahi ho pa raha. Kya service chal rahi hai?"
 
     except requests.exceptions.Timeout:
+        LLM_REQUESTS.inc(outcome="timeout")
         return "Response thoda slow ho gaya. Dobara try karo."
 
     except Exception as e:
+        LLM_REQUESTS.inc(outcome="error")
         print("LLM error:", e)
         return "Internal error aaya. Thodi der baad try karo."
+
+
+def _post(payload: dict, sink=None):
+    """Send one chat request through the shared pool. Returns (reply, final data)."""
+    with _slots:
+        LLM_IN_FLIGHT.inc()
+        try:
+            with LLM_LATENCY.time():
+                r = _get_session().post(
+                    OLLAMA_URL,
+                    json=payload,
+                    timeout=REQUEST_TIMEOUT,
+                    stream=sink is not None
+                )
+                r.raise_for_status()
+
+                if sink is None:
+                    data = r.json()
+                    return data.get("message", {}).get("content", "").strip(), data
+
+                return _read_stream(r, sink)
+        finally:
+            LLM_IN_FLIGHT.dec()
+
+
+def _read_stream(r, sink):
+    """Consume Ollama's NDJSON stream, forwarding each content chunk."""
+    parts = []
+    data = {}
+    for line in r.iter_lines():
+        if not line:
+            continue
+        chunk = json.loads(line)
+        piece = chunk.get("message", {}).get("content", "")
+        if piece:
+            parts.append(piece)
+            sink(piece)
+        if chunk.get("done"):
+            data = chunk
+            break
+    return "".join(parts).strip(), data
+
+
+def _ollama_timings(data: dict) -> dict:
+    """Token counts and durations (ns -> ms) reported by Ollama."""
+    ns = 1_000_000
+    return {
+        "prompt_tokens": data.get("prompt_eval_count"),
+        "eval_tokens": data.get("eval_count"),
+        "load_ms": (data.get("load_duration") or 0) / ns,
+        "prompt_eval_ms": (data.get("prompt_eval_duration") or 0) / ns,
+        "eval_ms": (data.get("eval_duration") or 0) / ns,
+    }
@@ -0,0 +1,171 @@
+"""
+Load tester for the headless API.
+Starts a stub Ollama endpoint and an in-process HuzenixServer, then drives
+many concurrent sessions over HTTP and reports sessions/sec and tail latency.
+
+    python -m core.loadtest --sessions 200 --turns 3 --concurrency 32
+"""
+
+import argparse
+import http.client
+import json
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from core import llm_client, tracing
+from core.conversation_engine import ConversationEngine
+from core.memory_manager import MemoryManager
+from core.server import HuzenixServer
+from core.tracing import _percentiles
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    """Answers /api/chat like Ollama after a fixed delay (+/- jitter)."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are separate writes
+    delay = 0.05
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.delay * random.uniform(0.8, 1.2))
+
+        words = ["stub", "reply", "from", "a", "local", "model."]
+        final = {
+            "done": True,
+            "prompt_eval_count": sum(len(m["content"]) // 4 for m in payload["messages"]),
+            "eval_count": len(words),
+            "eval_duration": int(self.delay * 1e9),
+        }
+
+        if payload.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for word in words:
+                line = json.dumps({"message": {"content": word + " "}, "done": False}) + "\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line.encode()))
+            line = json.dumps(final) + "\n"
+            self.wfile.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(line), line.encode()))
+            return
+
+        final["message"] = {"role": "assistant", "content": " ".join(words)}
+        body = json.dumps(final).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_stub_llm(delay: float) -> ThreadingHTTPServer:
+    handler = type("StubOllama", (_StubOllama,), {"delay": delay})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.daemon_threads = True
+    httpd.request_queue_size = 128
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def _request(conn, method, path, token, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {"Authorization": f"Bearer {token}"}
+    if data:
+        headers["Content-Type"] = "application/json"
+    conn.request(method, path, body=data, headers=headers)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def _run_session(port: int, token: str, turns: int, stream: bool, latencies: list, statuses: dict, lock):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        status, raw = _request(conn, "POST", "/v1/sessions", token, {})
+        if status != 201:
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+            return
+        sid = json.loads(raw)["session"]
+
+        suffix = "?stream=1" if stream else ""
+        for i in range(turns):
+            start = time.perf_counter()
+            status, _ = _request(
+                conn, "POST", f"/v1/sessions/{sid}/messages{suffix}", token,
+                {"text": f"tell me something interesting #{i}"}
+            )
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed)
+
+        _request(conn, "DELETE", f"/v1/sessions/{sid}", token)
+    finally:
+        conn.close()
+
+
+def run(sessions: int, turns: int, concurrency: int, llm_delay: float, stream: bool) -> dict:
+    stub = start_stub_llm(llm_delay)
+    llm_client.OLLAMA_URL = f"http://127.0.0.1:{stub.server_address[1]}/api/chat"
+
+    data_dir = Path(tempfile.mkdtemp(prefix="huzenix-load-"))
+    tracing.tracer.path = data_dir / "traces.jsonl"
+    server = HuzenixServer(
+        ConversationEngine(),
+        MemoryManager(data_dir),
+        port=0,
+        max_in_flight=concurrency,
+        rate=1000.0,
+        burst=max(turns, 1),
+    ).start()
+
+    latencies, statuses, lock = [], {}, threading.Lock()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(sessions):
+            pool.submit(_run_session, server.port, server.token, turns, stream, latencies, statuses, lock)
+    elapsed = time.perf_counter() - start
+
+    server.shutdown()
+    stub.shutdown()
+
+    report = {
+        "sessions": sessions,
+        "turns": len(latencies),
+        "seconds": round(elapsed, 3),
+        "sessions_per_sec": round(sessions / elapsed, 1),
+        "turns_per_sec": round(len(latencies) / elapsed, 1),
+        "status": statuses,
+    }
+    if latencies:
+        report["latency_ms"] = _percentiles(latencies)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Huzenix API against a stub LLM")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="stub LLM latency (s)")
+    parser.add_argument("--stream", action="store_true", help="use streaming replies")
+    args = parser.parse_args()
+
+    print(json.dumps(
+        run(args.sessions, args.turns, args.concurrency, args.llm_delay, args.stream),
+        indent=2,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,80 @@
-import json
 from pathlib import Path
 from collections import deque
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+from core import metrics
+from core.fact_index import DEFAULT_TOP_K, FactIndex
+from core.history_store import HistoryStore
+from core.storage import JournaledStore
 
 MAX_CONTEXT = 12  # last N messages only
+DEFAULT_SESSION = "default"
+
+# Summed over all live MemoryManagers (one per session in batch runs)
+CONTEXT_MESSAGES = metrics.gauge("huzenix_memory_context_messages", "Short-term context size")
+FACTS = metrics.gauge("huzenix_memory_facts", "Stored long-term facts")
+PROFILE_KEYS = metrics.gauge("huzenix_memory_profile_keys", "Stored profile entries")
+
+
+def _warm_context(history: HistoryStore, session_id: str) -> deque:
+    return deque(
+        ({"role": t["role"], "content": t["content"]}
+         for t in history.last_turns(session_id, MAX_CONTEXT)),
+        maxlen=MAX_CONTEXT,
+    )
 
 
 class MemoryManager:
     """
     Hybrid memory system for Huzenix.
-    - Short-term: conversation context (RAM only)
-    - Long-term: profile + facts (persistent)
+    - Short-term: conversation context (bounded RAM tail of the history)
+    - History: every turn, persisted in SQLite (history.db)
+    - Long-term: profile + facts (persistent, facts indexed for retrieval)
     """
 
-    def __init__(self, data_dir: Path):
+    def __init__(
+        self,
+        data_dir: Path,
+        session_id: str = DEFAULT_SESSION,
+        history: Optional[HistoryStore] = None,
+    ):
         self.file = data_dir / "memory.json"
+        self.session_id = session_id
+
+        # long-term: journaled, written behind (memory.json + memory.json.journal)
+        self.store = JournaledStore(self.file, default={"profile": {}, "facts": []})
+        self.profile: Dict[str, str] = self.store.data["profile"]
+        self.facts: List[str] = self.store.data["facts"]
 
-        # long-term
-        self.profile: Dict[str, str] = {}
-        self.facts: List[str] = []
+        # history (shared store may be passed in, e.g. by the batch runner)
+        self._owns_history = history is None
+        self.history = history or HistoryStore(data_dir / "history.db")
 
-        # short-term (session only)
-        self.context = deque(maxlen=MAX_CONTEXT)
+        # short-term: tail cache, warmed from history so it survives restarts
+        self.context = _warm_context(self.history, session_id)
 
-        self._load()
+        # fact index (facts_index.npz next to memory.json), saved on checkpoints;
+        # facts added since the last save are re-indexed by rebuild() on load
+        self.fact_index = FactIndex(data_dir / "facts_index.npz")
+        self.fact_index.load()
+        self.fact_index.rebuild(self.facts)
+        self.store.on_checkpoint(self.fact_index.save)
 
-    # ---------- LOAD / SAVE ---------- #
+        CONTEXT_MESSAGES.track(self, lambda memory: len(memory.context))
+        FACTS.track(self, lambda memory: len(memory.facts))
+        PROFILE_KEYS.track(self, lambda memory: len(memory.profile))
 
-    def _load(self):
-        if self.file.exists():
-            try:
-                data = json.loads(self.file.read_text())
-                self.profile = data.get("profile", {})
-                self.facts = data.get("facts", [])
-            except Exception:
-                pass
+    # ---------- SAVE ---------- #
 
     def save(self):
-        data = {
-            "profile": self.profile,
-            "facts": self.facts,
-        }
-        self.file.write_text(json.dumps(data, indent=2))
+        """Force pending long-term changes to disk (normally written behind)."""
+        self.store.flush()
+
+    def close(self):
+        """Checkpoint long-term memory; closes history too unless it was shared."""
+        self.store.close()
+        if self._owns_history:
+            self.history.close()
 
     # ---------- SHORT TERM (SESSION) ---------- #
 
@@ -53,6 +86,7 @@ class MemoryManager:
             "role": role,
             "content": content
         })
+        self.history.append(self.session_id, role, content)
 
     def get_context(self) -> List[Dict[str, str]]:
         return list(self.context)
@@ -60,11 +94,26 @@ class MemoryManager:
     def clear_context(self):
         self.context.clear()
 
+    # ---------- HISTORY ---------- #
+
+    def recent_turns(self, n: int) -> List[Dict[str, str]]:
+        """Last n turns of this session, beyond the in-RAM context."""
+        self.history.flush()
+        return self.history.last_turns(self.session_id, n)
+
+    def turns_between(self, start: float, end: float = None) -> List[Dict[str, str]]:
+        """Turns of this session between two epoch timestamps."""
+        self.history.flush()
+        return self.history.turns_between(start, end, session=self.session_id)
+
+    def search_history(self, text: str, limit: int = 20) -> List[Dict[str, str]]:
+        self.history.flush()
+        return self.history.search(text, session=self.session_id, limit=limit)
+
     # ---------- PROFILE ---------- #
 
     def set_profile(self, key: str, value: str):
-        self.profile[key] = value
-        self.save()
+        self.store.set_item("profile", key, value)
 
     def get_profile(self) -> Dict[str, str]:
         return self.profile
@@ -72,9 +121,58 @@ class MemoryManager:
     # ---------- FACTS ---------- #
 
     def remember_fact(self, fact: str):
-        if fact not in self.facts:
-            self.facts.append(fact)
-            self.save()
+        if self.fact_index.add(fact):
+            self.store.append("facts", fact)
 
     def get_facts(self) -> List[str]:
         return self.facts
+
+    def relevant_facts(self, query: str, k: int = DEFAULT_TOP_K) -> List[str]:
+        """Top-k facts for query, most relevant first."""
+        return [self.facts[i] for i, _ in self.fact_index.search(query, k) if i < len(self.facts)]
+
+
+class SessionMemory:
+    """
+    Per-session view over a shared MemoryManager.
+    - Short-term: own context (isolated per session)
+    - Long-term: profile + facts delegated to the shared manager
+    """
+
+    def __init__(self, shared: MemoryManager, session_id: str):
+        self.shared = shared
+        self.session_id = session_id
+        self.history = shared.history
+        self.context = _warm_context(self.history, session_id)
+
+    # ---------- SHORT TERM (SESSION) ---------- #
+
+    def add_message(self, role: str, content: str):
+        self.context.append({
+            "role": role,
+            "content": content
+        })
+        self.history.append(self.session_id, role, content)
+
+    def get_context(self) -> List[Dict[str, str]]:
+        return list(self.context)
+
+    def clear_context(self):
+        self.context.clear()
+
+    # ---------- LONG TERM (SHARED) ---------- #
+
+    def set_profile(self, key: str, value: str):
+        self.shared.set_profile(key, value)
+
+    def get_profile(self) -> Dict[str, str]:
+        return self.shared.get_profile()
+
+    def remember_fact(self, fact: str):
+        self.shared.remember_fact(fact)
+
+    def get_facts(self) -> List[str]:
+        return self.shared.get_facts()
+
+    def relevant_facts(self, query: str, k: int = DEFAULT_TOP_K) -> List[str]:
+        return self.shared.relevant_facts(query, k)
@@ -0,0 +1,419 @@
+"""
+Runtime metrics for long-running Huzenix instances.
+A small registry of counters, gauges and histograms, rendered in the
+Prometheus text format. Exposed on a localhost HTTP endpoint, dumpable on a
+signal, and with an on-demand sampling profiler for live processes.
+"""
+
+import math
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import Counter as _TallyCounter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = int(os.getenv("HUZENIX_METRICS_PORT", "9464"))  # 0 = disabled
+DUMP_DIR = Path(__file__).parent.parent / "data"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ---------------- METRIC TYPES ---------------- #
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, key, value, extra in self.samples():
+            lines.append(f"{self.name}{suffix}{_fmt_labels(key, extra)} {_fmt_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str = ""):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_key(labels), 0)
+
+    def samples(self):
+        for key, value in list(self._values.items()):
+            yield "", key, value, ""
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str = ""):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+        self._functions: Dict[LabelKey, Callable[[], float]] = {}
+        self._owners: Dict[LabelKey, "weakref.WeakKeyDictionary"] = {}
+
+    def set(self, value: float, **labels) -> None:
+        self._values[_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels) -> None:
+        """Evaluate fn() at scrape time instead of storing a value."""
+        self._functions[_key(labels)] = fn
+
+    def track(self, owner: Any, fn: Callable[[Any], float], **labels) -> None:
+        """
+        Report the sum of fn(owner) over all live owners at scrape time.
+
+        Owners are held weakly, so every instance of a class can track itself
+        without replacing the others or being kept alive by the registry.
+        fn must take the owner as its argument, not close over it.
+        """
+        key = _key(labels)
+        with self._lock:
+            owners = self._owners.get(key)
+            if owners is None:
+                owners = self._owners[key] = weakref.WeakKeyDictionary()
+                self._functions[key] = lambda: sum(f(o) for o, f in list(owners.items()))
+            owners[owner] = fn
+
+    def value(self, **labels) -> float:
+        key = _key(labels)
+        fn = self._functions.get(key)
+        return fn() if fn else self._values.get(key, 0)
+
+    def samples(self):
+        for key, value in list(self._values.items()):
+            if key not in self._functions:
+                yield "", key, value, ""
+        for key, fn in list(self._functions.items()):
+            try:
+                yield "", key, fn(), ""
+            except Exception:
+                continue
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._series: Dict[LabelKey, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, **labels):
+        return _HistogramTimer(self, labels)
+
+    def samples(self):
+        for key, series in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield "_bucket", key, cumulative, f'le="{_fmt_value(bound)}"'
+            yield "_sum", key, series[-2], ""
+            yield "_count", key, series[-1], ""
+
+
+class _HistogramTimer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+# ---------------- REGISTRY ---------------- #
+
+class MetricsRegistry:
+    """Get-or-create registry; components ask for metrics by name."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, help_text, **kwargs)
+        return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in list(self._metrics.values())) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def counter(name: str, help_text: str = "") -> Counter:
+    return registry.counter(name, help_text)
+
+
+def gauge(name: str, help_text: str = "") -> Gauge:
+    return registry.gauge(name, help_text)
+
+
+def histogram(name: str, help_text: str = "", buckets=DEFAULT_BUCKETS) -> Histogram:
+    return registry.histogram(name, help_text, buckets)
+
+
+# ---------------- PROCESS GAUGES ---------------- #
+
+_START_TIME = time.time()
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _rss_bytes() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return 0
+
+
+def _thread_cpu_seconds() -> Dict[str, float]:
+    """CPU time per live thread (Linux /proc only)."""
+    names = {t.native_id: t.name for t in threading.enumerate()}
+    result = {}
+    for native_id, name in names.items():
+        try:
+            with open(f"/proc/self/task/{native_id}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        result[name] = (int(fields[11]) + int(fields[12])) / _CLK_TCK
+    return result
+
+
+class _ThreadCpuGauge(Gauge):
+    def samples(self):
+        for name, seconds in _thread_cpu_seconds().items():
+            yield "", (("thread", name),), seconds, ""
+
+
+def register_process_metrics() -> None:
+    gauge("huzenix_process_resident_memory_bytes", "Resident set size").set_function(_rss_bytes)
+    gauge("huzenix_process_cpu_seconds", "Total process CPU time").set_function(time.process_time)
+    gauge("huzenix_process_uptime_seconds", "Seconds since start").set_function(
+        lambda: time.time() - _START_TIME
+    )
+    gauge("huzenix_threads", "Live Python threads").set_function(threading.active_count)
+    registry._get(_ThreadCpuGauge, "huzenix_thread_cpu_seconds", "CPU time per thread")
+
+
+# ---------------- SAMPLING PROFILER ---------------- #
+
+def sample_stacks(seconds: float = 5.0, interval: float = 0.01) -> str:
+    """
+    Sample every thread's stack for `seconds` and return collapsed stacks
+    ("thread;outer;...;inner count" per line, flamegraph compatible).
+    """
+    tally = _TallyCounter()
+    me = threading.get_ident()
+    names = {}
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            if ident not in names:
+                names = {t.ident: t.name for t in threading.enumerate()}
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            tally[";".join(reversed(stack))] += 1
+        time.sleep(interval)
+
+    return "\n".join(f"{stack} {count}" for stack, count in tally.most_common()) + "\n"
+
+
+def dump_threads() -> str:
+    names = {t.ident: t.name for t in threading.enumerate()}
+    out = []
+    for ident, frame in sys._current_frames().items():
+        out.append(f"--- {names.get(ident, ident)} ---")
+        out.extend(line.rstrip() for line in traceback.format_stack(frame))
+    return "\n".join(out) + "\n"
+
+
+# ---------------- HTTP ENDPOINT ---------------- #
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/metrics":
+            body = registry.render()
+            content_type = "text/plain; version=0.0.4"
+        elif url.path == "/debug/profile":
+            try:
+                seconds = float(query.get("seconds", ["5"])[0])
+                interval = float(query.get("interval", ["0.01"])[0])
+            except ValueError:
+                seconds = interval = float("nan")
+            if not (math.isfinite(seconds) and math.isfinite(interval) and seconds > 0 and interval > 0):
+                self.send_error(400, "seconds and interval must be positive numbers")
+                return
+            body = sample_stacks(min(seconds, 60.0), max(interval, 0.001))
+            content_type = "text/plain"
+        elif url.path == "/debug/threads":
+            body = dump_threads()
+            content_type = "text/plain"
+        else:
+            self.send_error(404)
+            return
+
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_http_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics, /debug/profile and /debug/threads on localhost."""
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        print(f"Metrics server not started: {e}")
+        return None
+
+    server.daemon_threads = True
+    threading.Thread(
+        target=server.serve_forever, name="huzenix-metrics", daemon=True
+    ).start()
+    print(f"📈 Metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+# ---------------- SIGNAL DUMP ---------------- #
+
+def dump(path: Path = None) -> Path:
+    path = Path(path or DUMP_DIR / "metrics.prom")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(registry.render(), encoding="utf-8")
+    return path
+
+
+def _profile_to_file(seconds: float) -> None:
+    path = DUMP_DIR / time.strftime("profile-%Y%m%d-%H%M%S.txt")
+    path.write_text(sample_stacks(seconds), encoding="utf-8")
+    print(f"Profile written to {path}")
+
+
+def install_signal_handlers(profile_seconds: float = 10.0) -> bool:
+    """
+    SIGUSR1 dumps metrics to data/metrics.prom, SIGUSR2 writes a sampling
+    profile. Not available on Windows; use the HTTP endpoint there.
+    """
+    if not hasattr(signal, "SIGUSR1"):
+        return False
+    if threading.current_thread() is not threading.main_thread():
+        return False
+
+    signal.signal(signal.SIGUSR1, lambda *_: dump())
+    signal.signal(
+        signal.SIGUSR2,
+        lambda *_: threading.Thread(
+            target=_profile_to_file, args=(profile_seconds,), daemon=True
+        ).start(),
+    )
+    return True
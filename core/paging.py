@@ -0,0 +1,139 @@
+"""
+Paged spoken listings for Huzenix.
+A long listing is answered with its count and first page only. The rest is
+pulled lazily from storage when the user says "aur" / "next", so the first
+answer costs the same for ten items or a hundred thousand. Long listings
+can also be condensed into a single LLM summary on request.
+"""
+
+import contextlib
+import contextvars
+import re
+from itertools import islice
+from typing import Callable, Iterable, List
+
+PAGE_SIZE = 5
+SUMMARY_MIN_ITEMS = 30    # offer a summary for listings at least this long
+SUMMARY_MAX_ITEMS = 200   # items handed to the LLM for one summary
+
+CONTINUE_PHRASES = frozenset({
+    "aur", "next", "more", "aage", "continue", "aur batao", "aur sunao",
+    "aage batao", "aage bolo", "next page", "haan aur",
+})
+SUMMARY_PHRASES = frozenset({
+    "summary", "summarize", "summarise", "saar", "summary do", "summary batao",
+    "short mein batao", "overview",
+})
+
+# Set by capture() for the duration of one handler call
+_offered: contextvars.ContextVar = contextvars.ContextVar("huzenix_pager", default=None)
+
+
+class Pager:
+    """Lazily pages an iterable of spoken lines, PAGE_SIZE at a time."""
+
+    def __init__(self, items: Iterable[str], total: int, heading: str, page_size: int = PAGE_SIZE):
+        """
+        Args:
+            items: Spoken line per item; consumed only as pages are read
+            total: Number of items (spoken up front)
+            heading: e.g. "You have 240 notes. Newest first"
+            page_size: Items per page
+        """
+        self._items = iter(items)
+        self.total = total
+        self.heading = heading
+        self.page_size = page_size
+        self.spoken = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.total - self.spoken)
+
+    @property
+    def done(self) -> bool:
+        return self.remaining == 0
+
+    def _take(self, n: int) -> List[str]:
+        lines = list(islice(self._items, n))
+        self.spoken += len(lines)
+        if len(lines) < n:
+            # Storage shrank since the count was taken
+            self.total = self.spoken
+        return lines
+
+    def _footer(self) -> str:
+        if self.done:
+            return ""
+        hint = f" {self.remaining} more. Say 'next' to continue"
+        if self.total >= SUMMARY_MIN_ITEMS:
+            hint += " or 'summary' for an overview"
+        return hint + "."
+
+    def first_page(self) -> str:
+        lines = self._take(self.page_size)
+        return f"{self.heading}: " + "; ".join(lines) + "." + self._footer()
+
+    def next_page(self) -> str:
+        lines = self._take(self.page_size)
+        if not lines:
+            return "That's all."
+        return "; ".join(lines) + "." + self._footer()
+
+    def summary(self, ask: Callable[[str], str]) -> str:
+        """
+        One LLM summary of the items not yet spoken. Ends the listing.
+
+        Args:
+            ask: prompt -> reply (e.g. core.llm_client.ask_llm)
+        """
+        lines = self._take(SUMMARY_MAX_ITEMS)
+        if not lines:
+            return "That's all."
+        remaining = self.total - self.spoken
+        self.total = self.spoken
+        shown = f"the first {len(lines)} of {len(lines) + remaining}" if remaining else f"all {len(lines)}"
+        prompt = (
+            f"Summarize these items for speech in 2-3 short sentences ({shown} shown). "
+            "Group similar ones and mention dates or counts that stand out.\n"
+            + "\n".join(f"- {line}" for line in lines)
+        )
+        return ask(prompt)
+
+
+def offer(pager: Pager) -> None:
+    """Make pager the pending continuation of the current turn (no-op outside one)."""
+    box = _offered.get()
+    if box is not None:
+        box.append(pager)
+
+
+@contextlib.contextmanager
+def capture():
+    """Collect pagers offered by handlers called in this context (last one wins)."""
+    box = []
+    token = _offered.set(box)
+    try:
+        yield box
+    finally:
+        _offered.reset(token)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"[\w']+", text.lower()))
+
+
+def is_continue(text: str) -> bool:
+    return _normalize(text) in CONTINUE_PHRASES
+
+
+def is_summary(text: str) -> bool:
+    return _normalize(text) in SUMMARY_PHRASES
+
+
+def answer(pager: Pager) -> str:
+    """First page as a handler reply; the rest is offered as the continuation."""
+    text = pager.first_page()
+    if not pager.done:
+        offer(pager)
+    return text
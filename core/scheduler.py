@@ -0,0 +1,125 @@
+"""
+Deadline scheduler for Huzenix.
+Keys (e.g. reminder ids) are kept in a min-heap by wall-clock due time. A
+single thread sleeps until the earliest deadline and is woken only when an
+insert moves that deadline earlier, so pending items cost nothing between
+events. Cancelled or rescheduled entries are dropped lazily.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+MAX_SLEEP = 300.0  # re-check at least this often (wall clock may jump)
+
+
+class DeadlineScheduler:
+    """Calls on_due(key) on its own thread once time.time() reaches a key's deadline."""
+
+    def __init__(self, on_due: Callable[[str], None] = None, name: str = "huzenix-scheduler"):
+        self.on_due = on_due
+        self.name = name
+        self._heap: List[Tuple[float, int, str]] = []
+        self._live: Dict[str, Tuple[float, int]] = {}  # key -> current (when, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    # ---------- UPDATES ---------- #
+
+    def schedule(self, key: str, when: float) -> None:
+        """Set (or move) key's deadline to epoch seconds `when`."""
+        with self._cond:
+            entry = (when, next(self._seq))
+            self._live[key] = entry
+            earliest = self._heap[0][0] if self._heap else None
+            heapq.heappush(self._heap, (entry[0], entry[1], key))
+            if earliest is None or when < earliest:
+                self._cond.notify()
+
+    def cancel(self, key: str) -> None:
+        with self._cond:
+            if self._live.pop(key, None) is not None:
+                self._maybe_compact()
+
+    def clear(self) -> None:
+        with self._cond:
+            self._live.clear()
+            self._heap.clear()
+
+    def _maybe_compact(self) -> None:
+        # Keep lazy-deleted entries from dominating the heap
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._live):
+            self._heap = [(w, s, k) for k, (w, s) in self._live.items()]
+            heapq.heapify(self._heap)
+
+    def _drop_stale(self) -> None:
+        while self._heap:
+            when, seq, key = self._heap[0]
+            if self._live.get(key) == (when, seq):
+                return
+            heapq.heappop(self._heap)
+
+    # ---------- DUE ITEMS ---------- #
+
+    def next_due(self) -> Optional[Tuple[float, str]]:
+        with self._cond:
+            self._drop_stale()
+            if not self._heap:
+                return None
+            return self._heap[0][0], self._heap[0][2]
+
+    def pop_due(self, now: float = None) -> List[str]:
+        """Remove and return every key due at `now`, earliest first."""
+        now = time.time() if now is None else now
+        due = []
+        with self._cond:
+            while True:
+                self._drop_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    break
+                _, _, key = heapq.heappop(self._heap)
+                del self._live[key]
+                due.append(key)
+        return due
+
+    # ---------- THREAD ---------- #
+
+    def start(self) -> "DeadlineScheduler":
+        with self._cond:
+            if self._thread is None:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                self._drop_stale()
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._cond.wait(min(delay, MAX_SLEEP))
+                    continue
+
+            for key in self.pop_due():
+                try:
+                    self.on_due(key)
+                except Exception as e:
+                    print("Scheduler callback error:", e)
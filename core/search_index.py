@@ -0,0 +1,221 @@
+"""
+Full-text search index for Huzenix.
+Incremental inverted index with BM25 ranking, prefix expansion, timestamp
+filters and short snippets for speech. Postings are compact arrays; removed
+or replaced documents are masked out and the index is rebuilt once they
+make up half of it.
+"""
+
+import bisect
+import math
+import re
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.fact_index import tokenize
+
+K1 = 1.2
+B = 0.75
+MIN_PREFIX = 3          # shortest term that is expanded as a prefix
+MAX_EXPANSIONS = 50     # terms one prefix may expand to
+SNIPPET_WORDS = 12
+WORD_RE = re.compile(r"\S+")
+
+
+class SearchIndex:
+    """Keyed documents (e.g. note ids) -> BM25-ranked keyword search."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._postings: Dict[str, Tuple[array, array]] = {}  # term -> (doc, tf)
+        self._doc_key = array("q")   # doc -> key
+        self._doc_len = array("I")   # doc -> token count
+        self._doc_ts = array("d")    # doc -> timestamp
+        self._live = bytearray()     # doc -> 1 if current
+        self._key_doc: Dict[int, int] = {}
+        self._total_len = 0
+        self._terms: Optional[List[str]] = None  # sorted vocabulary, built lazily
+
+    def __len__(self) -> int:
+        return len(self._key_doc)
+
+    # ---------- UPDATES ---------- #
+
+    def add(self, key: int, text: str, ts: float) -> None:
+        """Index text under key, replacing any earlier version."""
+        tokens = tokenize(text)
+        with self._lock:
+            self._remove(key)
+            doc = len(self._doc_key)
+            self._doc_key.append(key)
+            self._doc_len.append(len(tokens))
+            self._doc_ts.append(ts)
+            self._live.append(1)
+            self._key_doc[key] = doc
+            self._total_len += len(tokens)
+
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for term, tf in counts.items():
+                posting = self._postings.get(term)
+                if posting is None:
+                    posting = self._postings[term] = (array("I"), array("H"))
+                    self._terms = None
+                posting[0].append(doc)
+                posting[1].append(min(tf, 65535))
+
+    def remove(self, key: int) -> None:
+        with self._lock:
+            self._remove(key)
+            if len(self._live) > 1024 and len(self._key_doc) * 2 < len(self._live):
+                self._rebuild()
+
+    def _remove(self, key: int) -> None:
+        doc = self._key_doc.pop(key, None)
+        if doc is not None:
+            self._live[doc] = 0
+            self._total_len -= self._doc_len[doc]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def _rebuild(self) -> None:
+        """Renumber live documents and drop dead postings."""
+        remap = array("q", [-1]) * len(self._live)
+        new = 0
+        for doc, live in enumerate(self._live):
+            if live:
+                remap[doc] = new
+                new += 1
+
+        postings = {}
+        for term, (docs, tfs) in self._postings.items():
+            kept_docs, kept_tfs = array("I"), array("H")
+            for doc, tf in zip(docs, tfs):
+                if remap[doc] >= 0:
+                    kept_docs.append(remap[doc])
+                    kept_tfs.append(tf)
+            if kept_docs:
+                postings[term] = (kept_docs, kept_tfs)
+
+        live_docs = [doc for doc, live in enumerate(self._live) if live]
+        self._postings = postings
+        self._doc_key = array("q", (self._doc_key[d] for d in live_docs))
+        self._doc_len = array("I", (self._doc_len[d] for d in live_docs))
+        self._doc_ts = array("d", (self._doc_ts[d] for d in live_docs))
+        self._live = bytearray(b"\x01" * len(live_docs))
+        self._key_doc = {key: doc for doc, key in enumerate(self._doc_key)}
+        self._terms = None
+
+    # ---------- QUERY ---------- #
+
+    def _expand(self, term: str, prefix: bool) -> List[str]:
+        if not prefix and term in self._postings:
+            return [term]
+        if len(term) < MIN_PREFIX:
+            return []
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        i = bisect.bisect_left(self._terms, term)
+        out = []
+        while i < len(self._terms) and self._terms[i].startswith(term) and len(out) < MAX_EXPANSIONS:
+            out.append(self._terms[i])
+            i += 1
+        return out
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        since: float = None,
+        until: float = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k (key, score) for query, best first.
+
+        Args:
+            query: Keywords; "term*" is a prefix query, and terms with no
+                exact match are expanded as prefixes
+            since, until: Optional timestamp bounds (since <= ts < until)
+        """
+        words = [(w.rstrip("*"), w.endswith("*")) for w in query.lower().split()]
+        terms = []
+        for word, prefix in words:
+            for token in tokenize(word):
+                terms.append((token, prefix))
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._key_doc)
+            if not n_docs:
+                return []
+            avg_len = self._total_len / n_docs
+            doc_len = np.frombuffer(self._doc_len, dtype=np.uint32)
+            live = np.frombuffer(bytes(self._live), dtype=np.uint8)
+
+            id_parts, score_parts = [], []
+            for token, prefix in terms:
+                for term in self._expand(token, prefix):
+                    docs_arr, tfs_arr = self._postings[term]
+                    docs = np.frombuffer(docs_arr, dtype=np.uint32).copy()
+                    tfs = np.frombuffer(tfs_arr, dtype=np.uint16).astype(np.float32)
+                    df = int(live[docs].sum())
+                    if not df:
+                        continue
+                    idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                    norm = K1 * (1.0 - B + B * doc_len[docs] / avg_len)
+                    id_parts.append(docs)
+                    score_parts.append(idf * tfs * (K1 + 1.0) / (tfs + norm))
+
+            if not id_parts:
+                return []
+            docs = np.concatenate(id_parts)
+            scores = np.concatenate(score_parts)
+
+            mask = live[docs].astype(bool)
+            if since is not None or until is not None:
+                ts = np.frombuffer(self._doc_ts, dtype=np.float64)[docs]
+                if since is not None:
+                    mask &= ts >= since
+                if until is not None:
+                    mask &= ts < until
+            docs, scores = docs[mask], scores[mask]
+            if not len(docs):
+                return []
+
+            candidates, inverse = np.unique(docs, return_inverse=True)
+            totals = np.bincount(inverse, weights=scores)
+            k = min(k, len(candidates))
+            top = np.argpartition(-totals, k - 1)[:k]
+            top = top[np.argsort(-totals[top], kind="stable")]
+            return [(int(self._doc_key[candidates[i]]), float(totals[i])) for i in top]
+
+
+def snippet(text: str, query: str, words: int = SNIPPET_WORDS) -> str:
+    """A short window of text around the first query match, for speech."""
+    tokens = WORD_RE.findall(text)
+    if len(tokens) <= words:
+        return text
+
+    needles = [t.rstrip("*") for t in tokenize(query.replace("*", ""))]
+    hit = 0
+    for i, token in enumerate(tokens):
+        lowered = token.lower()
+        if any(lowered.strip(".,!?;:\"'()").startswith(n) for n in needles):
+            hit = i
+            break
+
+    start = max(0, min(hit - words // 3, len(tokens) - words))
+    text = " ".join(tokens[start:start + words])
+    prefix = "... " if start else ""
+    suffix = " ..." if start + words < len(tokens) else ""
+    return prefix + text + suffix
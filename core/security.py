@@ -1,11 +1,88 @@
 """
 Security module for Huzenix.
 Manages locked/unlocked state and access control.
+
+Destructive actions (bulk file operations) are not run by the handler
+that plans them: it asks for confirmation with ask_confirmation(), the
+engine keeps the request for the session, and the action only runs when the
+next reply is a "haan" and SecurityManager.run_confirmed() allows it.
 """
 
+import contextlib
+import contextvars
+import re
+import time
 from pathlib import Path
-import json
-from typing import Optional
+from typing import Callable, Optional
+
+from core.storage import JournaledStore
+
+CONFIRM_TIMEOUT = 120  # seconds a confirmation stays valid
+
+YES_PHRASES = frozenset({
+    "haan", "ha", "han", "yes", "yeah", "yep", "ok", "okay", "confirm", "kar do",
+    "haan karo", "haan kar do", "theek hai", "go ahead", "do it", "yes do it",
+})
+NO_PHRASES = frozenset({
+    "nahi", "nahin", "na", "no", "nope", "cancel", "mat karo", "rehne do", "ruko", "stop",
+})
+
+# Set by capture_confirmations() for the duration of one handler call
+_requested: contextvars.ContextVar = contextvars.ContextVar("huzenix_confirmation", default=None)
+
+
+class Confirmation:
+    """An action held until the user says yes."""
+
+    def __init__(self, question: str, action: Callable[[], str]):
+        """
+        Args:
+            question: What was asked, e.g. "Delete 42 files? Say 'yes'"
+            action: Runs the operation and returns the reply to speak
+        """
+        self.question = question
+        self.action = action
+        self.created = time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() - self.created > CONFIRM_TIMEOUT
+
+
+def ask_confirmation(question: str, action: Callable[[], str]) -> str:
+    """
+    Hold action until the next reply confirms it (no-op outside a turn).
+
+    Returns:
+        question, for the handler to speak
+    """
+    box = _requested.get()
+    if box is not None:
+        box.append(Confirmation(question, action))
+    return question
+
+
+@contextlib.contextmanager
+def capture_confirmations():
+    """Collect confirmations requested by handlers called in this context."""
+    box = []
+    token = _requested.set(box)
+    try:
+        yield box
+    finally:
+        _requested.reset(token)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.findall(r"[\w']+", text.lower()))
+
+
+def is_yes(text: str) -> bool:
+    return _normalize(text) in YES_PHRASES
+
+
+def is_no(text: str) -> bool:
+    return _normalize(text) in NO_PHRASES
 
 
 class SecurityManager:
@@ -24,22 +101,18 @@ class SecurityManager:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         self.state_file = self.data_dir / "security.json"
-        self._state = self._load_state()
-
-    def _load_state(self) -> dict:
-        """Load security state from file."""
-        if self.state_file.exists():
-            try:
-                with open(self.state_file, "r") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                pass
-        return {"locked": False, "password_hash": None}
-
-    def _save_state(self) -> None:
-        """Save security state to file."""
-        with open(self.state_file, "w") as f:
-            json.dump(self._state, f, indent=2)
+        self._store = JournaledStore(
+            self.state_file, default={"locked": False, "password_hash": None}
+        )
+        self._state = self._store.data
+
+    def _save_state(self, key: str, value) -> None:
+        """
+        Journal one state change and flush it immediately; security changes
+        are rare and must survive a crash right after lock/unlock.
+        """
+        self._store.set(key, value)
+        self._store.flush()
 
     def is_locked(self) -> bool:
         """Check if system is locked."""
@@ -47,18 +120,15 @@ class SecurityManager:
 
     def lock(self) -> None:
         """Lock the system."""
-        self._state["locked"] = True
-        self._save_state()
+        self._save_state("locked", True)
 
     def unlock(self) -> None:
         """Unlock the system."""
-        self._state["locked"] = False
-        self._save_state()
+        self._save_state("locked", False)
 
     def set_password(self, password_hash: str) -> None:
         """Store password hash (NOT the password itself)."""
-        self._state["password_hash"] = password_hash
-        self._save_state()
+        self._save_state("password_hash", password_hash)
 
     def verify_password(self, password_hash: str) -> bool:
         """Verify password hash."""
@@ -78,3 +148,19 @@ class SecurityManager:
         if not sensitive:
             return True
         return not self.is_locked()
+
+    def run_confirmed(self, confirmation: Confirmation) -> str:
+        """
+        Run a confirmed action if it is still allowed.
+
+        Args:
+            confirmation: Pending request the user just said yes to
+
+        Returns:
+            The action's reply, or why it didn't run
+        """
+        if not self.allow_operation(sensitive=True):
+            return "System locked hai. Pehle unlock karo."
+        if confirmation.expired:
+            return "Confirmation ka time nikal gaya. Command dobara bolo."
+        return confirmation.action()
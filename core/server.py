@@ -0,0 +1,485 @@
+"""
+Headless multi-session text API for Huzenix.
+Serves the ConversationEngine over local HTTP and WebSocket without the
+microphone or speaker. Every session has its own short-term context, while
+handlers, long-term memory and the LLM connection pool are shared.
+
+HTTP:
+    POST   /v1/sessions                   -> {"session": id} (ids are issued by the server;
+                                          {"session": id} resumes a live one, else 404)
+    POST   /v1/sessions/<id>/messages     {"text": ...} -> {"reply": ..., "ms": ...}
+           ?stream=1 -> NDJSON: {"chunk": ...} ... {"done": true, "reply": ..., "ms": ...}
+    DELETE /v1/sessions/<id>
+    GET    /v1/health
+WebSocket:
+    GET    /v1/ws[?session=<id>]          one text frame per query, JSON frames back
+
+Every request needs "Authorization: Bearer <token>" (WebSocket clients that
+can't set headers may pass ?token=<token>). The token comes from
+HUZENIX_API_TOKEN or is generated per start and printed. POST bodies must be
+sent as application/json, and requests carrying an Origin header (i.e. from
+a browser page) are refused unless it is the server's own host, so a web
+page the user visits can't drive the API. Code execution and file
+commands are off unless the server is created with allow_unsafe=True.
+"""
+
+import base64
+import contextlib
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from core import metrics, tracing
+from core.intent_parser import Intent
+from core.memory_manager import MemoryManager, SessionMemory
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_IN_FLIGHT = 16      # turns processed concurrently across all sessions
+QUEUE_WAIT = 2.0        # seconds a turn may wait for a slot before 503
+RATE_PER_SEC = 1.0      # per-session sustained turns/sec
+RATE_BURST = 5          # per-session burst
+MAX_SESSIONS = 1000
+SESSION_TTL = 30 * 60   # idle seconds before a session is dropped
+MAX_BODY = 64 * 1024
+TOKEN_ENV = "HUZENIX_API_TOKEN"
+# Handlers that run code or touch files; off unless explicitly allowed
+UNSAFE_INTENTS = frozenset({Intent.CODE, Intent.FILES})
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+SESSIONS = metrics.gauge("huzenix_server_sessions", "Open API sessions")
+TURNS = metrics.counter("huzenix_server_turns_total", "API turns by status")
+TURN_LATENCY = metrics.histogram("huzenix_server_turn_seconds", "API turn latency")
+
+
+class RateLimited(Exception):
+    status = 429
+
+
+class Busy(Exception):
+    status = 503
+
+
+class TokenBucket:
+    """Per-session rate limiter."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class Session:
+    def __init__(self, session_id: str, shared: MemoryManager, rate: float, burst: int):
+        self.id = session_id
+        self.memory = SessionMemory(shared, session_id)
+        self.bucket = TokenBucket(rate, burst)
+        self.lock = threading.Lock()  # one turn at a time per session
+        self.last_seen = time.monotonic()
+
+
+class HuzenixServer:
+    """Runs turns for many sessions against one shared ConversationEngine."""
+
+    def __init__(
+        self,
+        engine,
+        memory: MemoryManager,
+        security=None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        rate: float = RATE_PER_SEC,
+        burst: int = RATE_BURST,
+        token: str = None,
+        allow_unsafe: bool = False,
+    ):
+        """
+        Args:
+            token: Bearer token clients must send (default: HUZENIX_API_TOKEN,
+                   else a random one per start)
+            allow_unsafe: Serve code execution and file commands too
+        """
+        self.engine = engine
+        self.memory = memory
+        self.security = security
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.burst = burst
+        self.token = token or os.getenv(TOKEN_ENV) or secrets.token_urlsafe(32)
+        self.disabled = frozenset() if allow_unsafe else UNSAFE_INTENTS
+
+        self.sessions: Dict[str, Session] = {}
+        self._sessions_lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._httpd: Optional["_ApiHTTPServer"] = None
+
+        SESSIONS.track(self, lambda server: len(server.sessions))
+
+    # ---------- SESSIONS ---------- #
+
+    def create_session(self) -> Session:
+        """New session with a server-issued id (clients can't pick ids)."""
+        with self._sessions_lock:
+            self._sweep()
+            if len(self.sessions) >= MAX_SESSIONS:
+                raise Busy("too many sessions")
+            session = Session(uuid.uuid4().hex, self.memory, self.rate, self.burst)
+            self.sessions[session.id] = session
+            return session
+
+    def get_session(self, session_id: str) -> Optional[Session]:
+        session = self.sessions.get(session_id)
+        if session:
+            session.last_seen = time.monotonic()
+        return session
+
+    def close_session(self, session_id: str) -> bool:
+        with self._sessions_lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep < 30:
+            return
+        self._last_sweep = now
+        for sid in [s.id for s in self.sessions.values() if now - s.last_seen > SESSION_TTL]:
+            del self.sessions[sid]
+
+    # ---------- TURNS ---------- #
+
+    @contextlib.contextmanager
+    def admit(self, session: Session):
+        """Apply the per-session rate limit and global backpressure."""
+        if not session.bucket.allow():
+            TURNS.inc(status="rate_limited")
+            raise RateLimited("rate limit exceeded")
+        if not self._slots.acquire(timeout=QUEUE_WAIT):
+            TURNS.inc(status="busy")
+            raise Busy("server busy")
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def run_turn(self, session: Session, text: str, on_chunk: Callable[[str], None] = None) -> dict:
+        """
+        Process one query for a session. Call inside admit().
+        on_chunk receives streamed LLM chunks and any text handlers speak.
+        """
+        start = time.perf_counter()
+
+        with session.lock, tracing.turn(session=session.id, chars=len(text)):
+            result, reply = self.engine.process_headless(
+                text,
+                security_manager=self.security,
+                memory=session.memory,
+                on_chunk=on_chunk,
+                disabled=self.disabled,
+            )
+
+        if result == Intent.EXIT:
+            self.close_session(session.id)
+
+        elapsed = time.perf_counter() - start
+        TURNS.inc(status="ok")
+        TURN_LATENCY.observe(elapsed)
+        return {"session": session.id, "reply": reply, "ms": round(elapsed * 1000, 2)}
+
+    # ---------- LIFECYCLE ---------- #
+
+    def _bind(self) -> None:
+        self._httpd = _ApiHTTPServer((self.host, self.port), _ApiHandler)
+        self._httpd.api = self
+        self.port = self._httpd.server_address[1]
+
+    def serve_forever(self) -> None:
+        self._bind()
+        print(f"🌐 Huzenix API on http://{self.host}:{self.port}/v1")
+        print(f"🔑 API token: {self.token}")
+        self._httpd.serve_forever()
+
+    def start(self) -> "HuzenixServer":
+        """Serve on a background thread (used by the load tester)."""
+        self._bind()
+        threading.Thread(
+            target=self._httpd.serve_forever, name="huzenix-api", daemon=True
+        ).start()
+        return self
+
+    def shutdown(self) -> None:
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+
+# ---------------- HTTP / WEBSOCKET ---------------- #
+
+class _ApiHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+_MESSAGES_PATH = re.compile(r"^/v1/sessions/([\w-]+)/messages$")
+_SESSION_PATH = re.compile(r"^/v1/sessions/([\w-]+)$")
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    @property
+    def api(self) -> HuzenixServer:
+        return self.server.api
+
+    def log_message(self, *args):
+        pass
+
+    # ---------- HELPERS ---------- #
+
+    def _json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self, query: dict) -> bool:
+        """Bearer token (or ?token= for WebSocket) and, from browsers, our own Origin."""
+        origin = self.headers.get("Origin")
+        if origin is not None and urlparse(origin).netloc.lower() != (self.headers.get("Host") or "").lower():
+            self._json(403, {"error": "origin not allowed"})
+            return False
+        auth = self.headers.get("Authorization") or ""
+        token = auth[len("Bearer "):] if auth.startswith("Bearer ") else query.get("token", [""])[0]
+        if not hmac.compare_digest(token.encode("utf-8"), self.api.token.encode("utf-8")):
+            self._json(401, {"error": "missing or wrong token"})
+            return False
+        return True
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            raise ValueError("body too large")
+        raw = self.rfile.read(length) if length else b"{}"
+        body = json.loads(raw or b"{}")
+        if not isinstance(body, dict):
+            raise ValueError("body must be a JSON object")
+        return body
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    # ---------- ROUTES ---------- #
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if not self._authorized(query if url.path == "/v1/ws" else {}):
+            return
+        if url.path == "/v1/health":
+            self._json(200, {"status": "ok", "sessions": len(self.api.sessions)})
+        elif url.path == "/v1/ws":
+            self._websocket(query.get("session", [None])[0])
+        else:
+            self._json(404, {"error": "not found"})
+
+    def do_DELETE(self):
+        if not self._authorized({}):
+            return
+        match = _SESSION_PATH.match(urlparse(self.path).path)
+        if match and self.api.close_session(match.group(1)):
+            self._json(200, {"closed": match.group(1)})
+        else:
+            self._json(404, {"error": "unknown session"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if not self._authorized({}):
+            return
+        if (self.headers.get("Content-Type") or "").split(";")[0].strip().lower() != "application/json":
+            self._json(415, {"error": "Content-Type must be application/json"})
+            return
+
+        try:
+            body = self._read_json()
+        except ValueError as e:
+            self._json(400, {"error": str(e)})
+            return
+
+        if url.path == "/v1/sessions":
+            if body.get("session") is not None:
+                session = self.api.get_session(str(body["session"]))
+                if session is None:
+                    self._json(404, {"error": "unknown session"})
+                else:
+                    self._json(200, {"session": session.id})
+                return
+            try:
+                session = self.api.create_session()
+            except Busy as e:
+                self._json(503, {"error": str(e)})
+                return
+            self._json(201, {"session": session.id})
+            return
+
+        match = _MESSAGES_PATH.match(url.path)
+        if not match:
+            self._json(404, {"error": "not found"})
+            return
+
+        session = self.api.get_session(match.group(1))
+        text = (body.get("text") or "").strip()
+        if session is None:
+            self._json(404, {"error": "unknown session"})
+            return
+        if not text:
+            self._json(400, {"error": "text required"})
+            return
+
+        stream = parse_qs(url.query).get("stream", ["0"])[0] not in ("0", "false")
+        try:
+            with self.api.admit(session):
+                if stream:
+                    self._stream_turn(session, text)
+                else:
+                    self._json(200, self.api.run_turn(session, text))
+        except (RateLimited, Busy) as e:
+            self._json(e.status, {"error": str(e)})
+
+    def _stream_turn(self, session: Session, text: str) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def on_chunk(piece: str) -> None:
+            self._write_chunk(json.dumps({"chunk": piece}).encode("utf-8") + b"\n")
+
+        result = self.api.run_turn(session, text, on_chunk)
+        result["done"] = True
+        self._write_chunk(json.dumps(result).encode("utf-8") + b"\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    # ---------- WEBSOCKET ---------- #
+
+    def _websocket(self, session_id: Optional[str]) -> None:
+        key = self.headers.get("Sec-WebSocket-Key")
+        if "websocket" not in (self.headers.get("Upgrade") or "").lower() or not key:
+            self._json(400, {"error": "websocket upgrade required"})
+            return
+
+        session = self.api.get_session(session_id) if session_id else None
+        if session_id and session is None:
+            self._json(404, {"error": "unknown session"})
+            return
+        try:
+            session = session or self.api.create_session()
+        except Busy as e:
+            self._json(503, {"error": str(e)})
+            return
+
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.close_connection = True
+
+        self._ws_send({"type": "session", "session": session.id})
+        while True:
+            text = self._ws_recv()
+            if text is None:
+                return
+            text = text.strip()
+            if not text:
+                continue
+
+            try:
+                with self.api.admit(session):
+                    result = self.api.run_turn(
+                        session, text,
+                        lambda piece: self._ws_send({"type": "chunk", "text": piece})
+                    )
+            except (RateLimited, Busy) as e:
+                self._ws_send({"type": "error", "status": e.status, "error": str(e)})
+                continue
+
+            result["type"] = "done"
+            self._ws_send(result)
+
+    def _ws_send(self, message: dict, opcode: int = 0x1) -> None:
+        payload = json.dumps(message).encode("utf-8") if opcode == 0x1 else b""
+        header = bytes([0x80 | opcode])
+        n = len(payload)
+        if n < 126:
+            header += bytes([n])
+        elif n < 65536:
+            header += bytes([126]) + struct.pack(">H", n)
+        else:
+            header += bytes([127]) + struct.pack(">Q", n)
+        self.wfile.write(header + payload)
+        self.wfile.flush()
+
+    def _ws_recv(self) -> Optional[str]:
+        """Read one (possibly fragmented) text message. None on close."""
+        parts = []
+        while True:
+            head = self.rfile.read(2)
+            if len(head) < 2:
+                return None
+            fin, opcode = head[0] & 0x80, head[0] & 0x0F
+            n = head[1] & 0x7F
+            if n == 126:
+                n = struct.unpack(">H", self.rfile.read(2))[0]
+            elif n == 127:
+                n = struct.unpack(">Q", self.rfile.read(8))[0]
+            if n > MAX_BODY:
+                return None
+            mask = self.rfile.read(4) if head[1] & 0x80 else b"\x00\x00\x00\x00"
+            data = bytes(b ^ mask[i % 4] for i, b in enumerate(self.rfile.read(n)))
+
+            if opcode == 0x8:  # close
+                try:
+                    self._ws_send({}, opcode=0x8)
+                except OSError:
+                    pass
+                return None
+            if opcode == 0x9:  # ping -> pong
+                self.wfile.write(bytes([0x8A, len(data)]) + data)
+                self.wfile.flush()
+                continue
+            if opcode in (0x0, 0x1):
+                parts.append(data)
+                if fin:
+                    return b"".join(parts).decode("utf-8", errors="replace")
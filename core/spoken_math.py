@@ -0,0 +1,498 @@
+"""
+Spoken math for Huzenix.
+Turns "paanch plus teen", "five into six", "square root of 81",
+"20 percent of 150" or "12*(3+4)" into a small expression tree, memoized
+per phrase, and evaluates it without eval(): only numbers, arithmetic
+operators and a fixed set of functions exist in the tree.
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+MEMO_SIZE = 1024
+MAX_EXPONENT = 1000
+MAX_FACTORIAL = 170
+MAX_DEPTH = 100  # brackets / functions / signs nested inside each other
+
+UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17,
+    "eighteen": 18, "nineteen": 19, "twenty": 20, "thirty": 30, "forty": 40,
+    "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+    # Hinglish
+    "shunya": 0, "ek": 1, "do": 2, "teen": 3, "char": 4, "chaar": 4, "paanch": 5,
+    "panch": 5, "chhe": 6, "che": 6, "saat": 7, "aath": 8, "nau": 9, "das": 10,
+    "gyarah": 11, "barah": 12, "baarah": 12, "terah": 13, "chaudah": 14,
+    "pandrah": 15, "solah": 16, "satrah": 17, "atharah": 18, "unnis": 19,
+    "bees": 20, "pachchis": 25, "pachis": 25, "tees": 30, "chalis": 40,
+    "chaalis": 40, "pachaas": 50, "pachas": 50, "saath": 60, "sattar": 70,
+    "assi": 80, "nabbe": 90,
+}
+SCALES = {
+    "hundred": 100, "sau": 100, "thousand": 1000, "hazaar": 1000, "hazar": 1000,
+    "lakh": 100000, "lac": 100000, "million": 10 ** 6, "crore": 10 ** 7,
+    "billion": 10 ** 9, "arab": 10 ** 9,
+}
+FRACTIONS = {"half": 0.5, "aadha": 0.5, "dedh": 1.5, "dhai": 2.5, "dhaai": 2.5}
+# "saade teen" = 3.5, "sava do" = 2.25, "paune do" = 1.75
+MODIFIERS = {"saade": 0.5, "sade": 0.5, "sava": 0.25, "sawa": 0.25, "paune": -0.25}
+
+# Multi-word phrases first, longest match wins
+PHRASES = {
+    "to the power of": "^", "raised to the power of": "^", "raised to": "^",
+    "to the power": "^", "power of": "^", "power": "^", "ki power": "^",
+    "multiplied by": "*", "times": "*", "into": "*", "x": "*", "guna": "*", "multiply": "*",
+    "product of": "*", "sum of": "+", "subtract": "-",
+    "divided by": "/", "divide": "/", "by": "/", "over": "/", "bata": "/", "bate": "/",
+    "plus": "+", "add": "+", "jod": "+", "jama": "+", "aur": "+",
+    "minus": "-", "ghata": "-", "kam": "-", "less": "-",
+    "mod": "mod", "modulo": "mod", "remainder": "mod",
+    "percent of": "pct_of", "% of": "pct_of", "pratishat": "pct", "percent": "pct", "%": "pct",
+    "square root of": "sqrt", "square root": "sqrt", "root of": "sqrt", "root": "sqrt",
+    "sqrt": "sqrt", "cube root of": "cbrt", "cube root": "cbrt", "log of": "log",
+    "log": "log", "ln": "ln", "sin": "sin", "sine of": "sin", "sine": "sin", "cos": "cos",
+    "cosine": "cos", "cosine of": "cos", "tan": "tan", "tangent of": "tan",
+    "absolute value of": "abs", "abs": "abs", "open bracket": "(", "close bracket": ")",
+    "squared": "sq", "square": "sq", "cubed": "cube", "cube": "cube",
+    "factorial": "fact", "factorial of": "fact_of",
+    "negative": "neg",
+}
+FILLER = frozenset(
+    "what whats what's is the calculate compute equals equal kitna kitne kitni kya hai "
+    "hota hoga hoti batao bataiye please answer value result tell me of ka ki ke "
+    "find solve huzenix hey karo kar".split()
+)
+# Hinglish "... bata do" / "batao" at the end means "tell me", not "divided by 2"
+ASK_SUFFIX_RE = re.compile(r"\s+(?:bata\s+do|bata\s+dijiye|batao|bataiye|kar\s+do|karo)\s*[?.!]*$")
+
+BINARY = {"+": 1, "-": 1, "*": 2, "/": 2, "mod": 2, "pct_of": 2, "^": 4}
+FUNCTIONS = {"sqrt", "cbrt", "log", "ln", "sin", "cos", "tan", "abs", "fact_of"}
+POSTFIX = {"sq", "cube", "fact", "pct", "sqrt", "cbrt"}
+
+TOKEN_RE = re.compile(r"\d+(?:,\d{2,3})*(?:\.\d+)?|\.\d+|\*\*|[-+*/^()%×÷x]|[a-z']+")
+MAX_PHRASE = max(len(p.split()) for p in PHRASES)
+# Other words a partial match may take in around the numbers and operators
+# ("sum of", "absolute value of")
+SPAN_EDGE = MAX_PHRASE
+
+# Expression tree: ("num", value) | ("neg", node) | ("bin", op, left, right)
+# | ("call", name, node) | ("post", name, node)
+Node = Tuple
+
+
+class MathError(ValueError):
+    """Expression parsed but can't be evaluated (division by zero, overflow...)."""
+
+
+# ---------- TOKENIZER ---------- #
+
+def _words(text: str) -> List[str]:
+    text = text.lower().replace("×", " x ").replace("÷", " / ").replace("**", " ^ ")
+    return TOKEN_RE.findall(text)
+
+
+def normalize(text: str) -> str:
+    """Canonical spelling of a phrase (the memo key)."""
+    return " ".join(_words(text))
+
+
+def _is_number_word(word: str) -> bool:
+    return word in UNITS or word in SCALES or word in FRACTIONS or word in MODIFIERS
+
+
+def _fits(current: float, value: float) -> bool:
+    """Can value continue the number read so far ("twenty" + "five", "sau" + "das")?"""
+    rest = current % 100
+    if value < 10:
+        return rest == 0 or (rest >= 20 and rest % 10 == 0)
+    return rest == 0
+
+
+def _read_number(words: List[str], i: int) -> Tuple[Optional[float], int]:
+    """Number (digits and/or words) starting at words[i] -> (value, next index)."""
+    total = current = modifier = 0.0
+    seen = False
+    while i < len(words):
+        word = words[i]
+        if word[0].isdigit() or word[0] == ".":
+            value = float(word.replace(",", ""))
+            if seen and not (value.is_integer() and value < 100 and _fits(current, value)):
+                break  # "5 6" is two numbers
+            current += value
+        elif word in UNITS:
+            if seen and not _fits(current, UNITS[word]):
+                break  # "five six" is two numbers
+            current += UNITS[word]
+        elif word in SCALES:
+            # "sau" alone is a hundred
+            if SCALES[word] == 100:
+                current = (current or 1) * 100
+            else:
+                total += (current or 1) * SCALES[word]
+                current = 0.0
+        elif word in FRACTIONS and not seen:
+            current = FRACTIONS[word]
+        elif word in MODIFIERS and not seen and not modifier:
+            modifier = MODIFIERS[word]
+            i += 1
+            continue
+        elif word == "and" and seen and i + 1 < len(words) and words[i + 1] in UNITS:
+            pass  # "one hundred and five"
+        elif word in ("point", "dashamlav") and seen:
+            digits = []
+            j = i + 1
+            while j < len(words) and (words[j].isdigit() or UNITS.get(words[j], 10) < 10):
+                digits.append(str(UNITS.get(words[j], words[j])))
+                j += 1
+            if not digits:
+                break
+            current += float("0." + "".join(digits))
+            i = j
+            continue
+        else:
+            break
+        seen = True
+        i += 1
+    if not seen:
+        return None, i
+    return total + current + modifier, i
+
+
+def tokenize(text: str) -> Optional[List[Tuple[str, object]]]:
+    """
+    Spoken or typed math -> [(kind, value)]; None if a word isn't math.
+
+    Kinds: "num", "op" (binary), "fn" (prefix function), "post" (postfix),
+    "neg", "(" and ")". Filler words are dropped.
+    """
+    words = _words(text)
+    tokens = []
+    i = 0
+    while i < len(words):
+        word = words[i]
+        after_operand = bool(tokens) and tokens[-1][0] in ("num", "post", ")")
+
+        if word[0].isdigit() or (word[0] == "." and len(word) > 1) or _is_number_word(word):
+            if word == "do" and after_operand:
+                # Hinglish "... kar do": a number can't follow an operand anyway
+                i += 1
+                continue
+            value, j = _read_number(words, i)
+            if value is not None:
+                tokens.append(("num", value))
+                i = j
+                continue
+
+        for n in range(min(MAX_PHRASE, len(words) - i), 0, -1):
+            symbol = PHRASES.get(" ".join(words[i:i + n]))
+            if symbol is not None:
+                break
+        else:
+            symbol, n = None, 1
+
+        if symbol is None:
+            if word in "+-*/^":
+                symbol = word
+            elif word in "()":
+                tokens.append((word, None))
+                i += 1
+                continue
+            elif word == "and" and _lead_op(tokens):
+                # "add 2 and 3": the conjunction is the operator
+                tokens.append(("op", _lead_op(tokens)))
+                i += 1
+                continue
+            elif word == "from" and _lead_op(tokens) == "-":
+                # "subtract 3 from 10"
+                tokens.append(("op", "from"))
+                i += 1
+                continue
+            elif word in FILLER:
+                i += 1
+                continue
+            else:
+                return None
+
+        if symbol in ("(", ")"):
+            tokens.append((symbol, None))
+        else:
+            tokens.append(_classify(symbol, tokens, after_operand))
+        i += n
+    return _rewrite_lead(tokens)
+
+
+def _lead_op(tokens) -> Optional[str]:
+    """Operator of a leading "add"/"multiply"/... waiting for its second operand."""
+    if len(tokens) == 2 and tokens[0][0] == "lead" and tokens[1][0] == "num":
+        return tokens[0][1]
+    return None
+
+
+def _classify(symbol: str, tokens, after_operand: bool) -> Tuple[str, object]:
+    if symbol == "neg":
+        return ("neg", None)
+    if symbol in POSTFIX or symbol in FUNCTIONS:
+        # "81 ka square root" vs "square root of 81"
+        if symbol in POSTFIX and after_operand:
+            return ("post", symbol)
+        return ("fn", "fact" if symbol == "fact_of" else symbol)
+    if not tokens and symbol in ("+", "-", "*", "/"):
+        # "add 2 and 3", "multiply 4 by 5", "subtract 3 from 10"
+        return ("lead", symbol)
+    if symbol == "-" and not after_operand:
+        return ("neg", None)
+    return ("op", symbol)
+
+
+def _rewrite_lead(tokens) -> List[Tuple[str, object]]:
+    if not tokens or tokens[0][0] != "lead":
+        return tokens
+    op, tokens = tokens[0][1], tokens[1:]
+    simple = len(tokens) == 3 and tokens[1][0] == "op"
+    if op == "-":
+        if simple and tokens[1][1] == "from":
+            return [tokens[2], ("op", "-"), tokens[0]]
+        # "minus 3 plus 5", "-2^2"
+        return [("neg", None)] + tokens
+    if simple:
+        # "multiply 4 by 5": "by" is the multiplication here, not a division
+        return [tokens[0], ("op", op), tokens[2]]
+    return tokens
+
+
+# ---------- PARSER ---------- #
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.i = 0
+        self.depth = 0
+
+    def peek(self):
+        return self.tokens[self.i] if self.i < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.i += 1
+        return token
+
+    def expression(self, min_prec: int = 1) -> Node:
+        left = self.unary()
+        while True:
+            kind, op = self.peek()
+            if kind != "op" or BINARY[op] < min_prec:
+                return left
+            self.take()
+            # ^ is right-associative
+            right = self.expression(BINARY[op] + (0 if op == "^" else 1))
+            left = ("bin", op, left, right)
+
+    def unary(self) -> Node:
+        # Every nested level passes through here
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise SyntaxError("nested too deep")
+        try:
+            kind, value = self.peek()
+            if kind == "neg":
+                self.take()
+                # -2^2 is -(2^2)
+                return ("neg", self.expression(BINARY["^"]))
+            if kind == "fn":
+                self.take()
+                return self.postfix(("call", value, self.unary()))
+            return self.postfix(self.primary())
+        finally:
+            self.depth -= 1
+
+    def primary(self) -> Node:
+        kind, value = self.take()
+        if kind == "num":
+            return ("num", value)
+        if kind == "(":
+            node = self.expression()
+            if self.take()[0] != ")":
+                raise SyntaxError("unbalanced bracket")
+            return node
+        raise SyntaxError(f"unexpected {kind}")
+
+    def postfix(self, node: Node) -> Node:
+        while self.peek()[0] == "post":
+            node = ("post", self.take()[1], node)
+        return node
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def compile_expression(text: str) -> Optional[Node]:
+    """
+    Phrase -> expression tree, or None if it isn't a calculation.
+
+    A lone number is not a calculation: at least one operator or function
+    is required.
+    """
+    stripped = ASK_SUFFIX_RE.sub("", text)
+    if stripped != text:
+        tree = _compile(stripped)
+        if tree is not None:
+            return tree
+    return _compile(text)
+
+
+def _compile(text: str) -> Optional[Node]:
+    tokens = tokenize(text)
+    if not tokens or all(kind == "num" for kind, _ in tokens):
+        return None
+    parser = _Parser(tokens)
+    try:
+        tree = parser.expression()
+    except (SyntaxError, KeyError, RecursionError):
+        return None
+    if parser.i != len(tokens):
+        return None
+    return tree
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def find_expression(text: str) -> Optional[Node]:
+    """
+    Like compile_expression, but ignores words before and after the math
+    ("yaar 5 plus 3 kitna hua"). Longest span wins, and only if the words
+    left out hold no numbers or operators: "5 6 plus 1" is not "6 plus 1".
+
+    So the span runs from the first math word to the last, plus at most
+    SPAN_EDGE words on either side: a handful of tries, not every sub-span.
+    """
+    tree = compile_expression(text)
+    if tree is not None:
+        return tree
+    words = text.split()
+    math_at = [i for i, word in enumerate(words) if _is_math_word(word)]
+    if not math_at:
+        return None
+    first, last = math_at[0], math_at[-1] + 1
+    starts = range(max(0, first - SPAN_EDGE), first + 1)
+    ends = range(last, min(len(words), last + SPAN_EDGE) + 1)
+    # Longest first; the whole text was tried above
+    for start, end in sorted(((s, e) for s in starts for e in ends), key=lambda span: span[0] - span[1]):
+        if end - start < len(words):
+            tree = compile_expression(" ".join(words[start:end]))
+            if tree is not None:
+                return tree
+    return None
+
+
+def _is_math_word(word: str) -> bool:
+    return (
+        word[0].isdigit() or word[0] == "." or _is_number_word(word)
+        or word in PHRASES or word in BINARY or word in ("(", ")")
+    )
+
+
+# ---------- EVALUATION ---------- #
+
+def _call(name: str, x: float) -> float:
+    if name == "sqrt":
+        if x < 0:
+            raise MathError("square root of a negative number")
+        return math.sqrt(x)
+    if name == "cbrt":
+        return math.copysign(abs(x) ** (1 / 3), x)
+    if name in ("log", "ln"):
+        if x <= 0:
+            raise MathError("log of a non-positive number")
+        return math.log10(x) if name == "log" else math.log(x)
+    if name in ("sin", "cos", "tan"):
+        # Spoken angles are degrees
+        return round(getattr(math, name)(math.radians(x)), 12)
+    if name == "abs":
+        return abs(x)
+    if name == "sq":
+        return x * x
+    if name == "cube":
+        return x * x * x
+    if name == "fact":
+        if x < 0 or x != int(x) or x > MAX_FACTORIAL:
+            raise MathError("factorial needs a whole number up to 170")
+        return float(math.factorial(int(x)))
+    if name == "pct":
+        return x / 100
+    raise MathError(f"unknown function {name}")
+
+
+def evaluate(node: Node) -> float:
+    """Value of an expression tree from compile_expression()."""
+    kind = node[0]
+    if kind == "num":
+        return node[1]
+    if kind == "neg":
+        return -evaluate(node[1])
+    if kind in ("call", "post"):
+        return _call(node[1], evaluate(node[2]))
+
+    _, op, left, right = node
+    a = evaluate(left)
+    if op in ("+", "-") and right[0] == "post" and right[1] == "pct":
+        # "200 plus 10 percent" = 220
+        b = evaluate(right[2]) / 100
+        return a * (1 + b) if op == "+" else a * (1 - b)
+    b = evaluate(right)
+    if op == "+":
+        return a + b
+    if op == "-":
+        return a - b
+    if op == "*":
+        return a * b
+    if op == "pct_of":
+        return a / 100 * b
+    if op in ("/", "mod"):
+        if b == 0:
+            raise MathError("division by zero")
+        return a / b if op == "/" else math.fmod(a, b)
+    if op == "^":
+        if abs(b) > MAX_EXPONENT:
+            raise MathError("exponent too large")
+        try:
+            return math.pow(a, b)
+        except (OverflowError, ValueError) as e:
+            raise MathError(str(e))
+    raise MathError(f"unknown operator {op}")
+
+
+def calculate(text: str, partial: bool = False) -> Optional[float]:
+    """
+    Evaluate spoken or typed math.
+
+    Args:
+        text: e.g. "paanch plus teen", "square root of 81", "12*(3+4)"
+        partial: Allow other words around the math
+
+    Returns:
+        The result, or None if text isn't a calculation
+
+    Raises:
+        MathError: It is one, but has no finite answer
+    """
+    phrase = normalize(text)
+    tree = find_expression(phrase) if partial else compile_expression(phrase)
+    if tree is None:
+        return None
+    try:
+        result = evaluate(tree)
+    except RecursionError:
+        # "1 plus 1 plus ..." for thousands of words
+        raise MathError("expression too long")
+    if isinstance(result, float) and not math.isfinite(result):
+        raise MathError("result too large")
+    return result
+
+
+def format_number(value: float) -> str:
+    """45.0 -> "45", 1/3 -> "0.3333", 1e20 -> "1e+20"."""
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    if abs(value) >= 1e15 or abs(value) < 1e-4:
+        return f"{value:.6g}"
+    return f"{value:.4f}".rstrip("0").rstrip(".")
@@ -0,0 +1,316 @@
+"""
+Write-behind, crash-safe JSON storage for Huzenix.
+Each store is a snapshot file (the familiar <name>.json) plus an append-only
+journal of small operations. Mutations update memory immediately and are
+flushed to the journal in batches by a background thread; the snapshot is
+rewritten (tmp file + fsync + atomic rename) only at checkpoints, so a
+write costs O(size of the change) instead of O(size of the whole file).
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+FLUSH_INTERVAL = 0.5          # seconds to batch mutations before writing
+CHECKPOINT_OPS = 500          # journal ops before the snapshot is rewritten
+CHECKPOINT_RATIO = 2.0        # ... or journal bytes > ratio * snapshot bytes
+SEQ_KEY = "__seq__"           # last op folded into the snapshot
+
+
+class JournaledStore:
+    """
+    Dict-of-values store. Mutate only through set/delete/append/set_item/
+    del_item so every change is journaled; read freely through .data.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        default: Dict[str, Any] = None,
+        migrate: Callable[[Any], Dict[str, Any]] = None,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.path = Path(path)
+        self.journal_path = self.path.with_name(self.path.name + ".journal")
+        self.flush_interval = flush_interval
+
+        self.data: Dict[str, Any] = {}
+        self._seq = 0
+        self._pending: List[str] = []
+        self._journal_ops = 0
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self._checkpoint_hooks: List[Callable[[], None]] = []
+
+        self._lock = threading.RLock()
+        self._closed = False
+
+        # write-amplification accounting
+        self.stats = {"ops": 0, "op_bytes": 0, "bytes_written": 0, "flushes": 0, "checkpoints": 0}
+
+        self._load(default or {}, migrate)
+        _flusher.register(self)
+
+    # ---------- LOAD ---------- #
+
+    def _load(self, default: Dict[str, Any], migrate) -> None:
+        raw = None
+        if self.path.exists():
+            try:
+                text = self.path.read_text(encoding="utf-8")
+                self._snapshot_bytes = len(text)
+                raw = json.loads(text) if text.strip() else None
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Store load error ({self.path.name}): {e}")
+                self.path.replace(self.path.with_name(self.path.name + ".corrupt"))
+
+        if migrate and raw is not None:
+            raw = migrate(raw)
+        data = raw if isinstance(raw, dict) else {}
+        self._seq = int(data.pop(SEQ_KEY, 0))
+
+        for key, value in default.items():
+            data.setdefault(key, json.loads(json.dumps(value)))
+        self.data = data
+
+        # Replay journal ops newer than the snapshot; stop at a torn line
+        if self.journal_path.exists():
+            good_end = 0
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        op = json.loads(line)
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        break
+                    if not isinstance(op, dict):
+                        break
+                    good_end += len(line)
+                    self._journal_ops += 1
+                    self._journal_bytes += len(line)
+                    if op.get("seq", 0) > self._seq:
+                        self._apply(op)
+                        self._seq = op["seq"]
+                torn = f.seek(0, os.SEEK_END) > good_end
+            if torn:
+                self._truncate_journal(good_end)
+
+    def _truncate_journal(self, size: int) -> None:
+        """Cut a torn tail off the journal so new appends start on a fresh line."""
+        print(f"Store journal torn ({self.journal_path.name}): dropping bytes after {size}")
+        try:
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(size)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"Store journal error ({self.path.name}): {e}")
+
+    # ---------- MUTATIONS ---------- #
+
+    def set(self, key: str, value: Any) -> None:
+        self._record({"op": "set", "key": key, "value": value})
+
+    def delete(self, key: str) -> None:
+        self._record({"op": "delete", "key": key})
+
+    def append(self, key: str, value: Any) -> None:
+        """Append to the list stored under key."""
+        self._record({"op": "append", "key": key, "value": value})
+
+    def set_item(self, key: str, sub: str, value: Any) -> None:
+        """Set data[key][sub] = value (data[key] is a dict)."""
+        self._record({"op": "set_item", "key": key, "sub": sub, "value": value})
+
+    def del_item(self, key: str, sub: str) -> None:
+        self._record({"op": "del_item", "key": key, "sub": sub})
+
+    def _record(self, op: dict) -> None:
+        with self._lock:
+            self._seq += 1
+            op["seq"] = self._seq
+            self._apply(op)
+            line = json.dumps(op, ensure_ascii=False) + "\n"
+            self._pending.append(line)
+            self.stats["ops"] += 1
+            self.stats["op_bytes"] += len(line)
+            first = len(self._pending) == 1
+        if first:
+            _flusher.mark_dirty(self)
+
+    def _apply(self, op: dict) -> None:
+        kind, key = op["op"], op["key"]
+        if kind == "set":
+            self.data[key] = op["value"]
+        elif kind == "delete":
+            self.data.pop(key, None)
+        elif kind == "append":
+            self.data.setdefault(key, []).append(op["value"])
+        elif kind == "set_item":
+            self.data.setdefault(key, {})[op["sub"]] = op["value"]
+        elif kind == "del_item":
+            self.data.get(key, {}).pop(op["sub"], None)
+
+    # ---------- FLUSH / CHECKPOINT ---------- #
+
+    def on_checkpoint(self, hook: Callable[[], None]) -> None:
+        """Run hook after each checkpoint (e.g. to persist a derived index)."""
+        self._checkpoint_hooks.append(hook)
+
+    def flush(self) -> None:
+        """Write pending ops to the journal now (fsynced)."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        chunk = "".join(self._pending)
+        ops = len(self._pending)
+        self._pending.clear()
+
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"Store journal error ({self.path.name}): {e}")
+            return
+
+        size = len(chunk.encode("utf-8"))
+        self._journal_ops += ops
+        self._journal_bytes += size
+        self.stats["bytes_written"] += size
+        self.stats["flushes"] += 1
+
+        if (self._journal_ops >= CHECKPOINT_OPS
+                or self._journal_bytes > CHECKPOINT_RATIO * max(self._snapshot_bytes, 4096)):
+            self._checkpoint_locked()
+
+    def checkpoint(self) -> None:
+        """Fold the journal into a fresh snapshot."""
+        with self._lock:
+            self._flush_locked()
+            self._checkpoint_locked()
+
+    def _checkpoint_locked(self) -> None:
+        snapshot = dict(self.data)
+        snapshot[SEQ_KEY] = self._seq
+        text = json.dumps(snapshot, ensure_ascii=False)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            _fsync_dir(self.path.parent)
+            # Ops up to _seq are in the snapshot; replay skips them anyway
+            with open(self.journal_path, "w", encoding="utf-8"):
+                pass
+        except OSError as e:
+            print(f"Store checkpoint error ({self.path.name}): {e}")
+            return
+
+        self._snapshot_bytes = len(text)
+        self._journal_ops = 0
+        self._journal_bytes = 0
+        self.stats["bytes_written"] += len(text.encode("utf-8"))
+        self.stats["checkpoints"] += 1
+
+        for hook in self._checkpoint_hooks:
+            try:
+                hook()
+            except Exception as e:
+                print(f"Checkpoint hook error ({self.path.name}): {e}")
+
+    def write_amplification(self) -> Optional[float]:
+        """Bytes written to disk per byte of logical change."""
+        if not self.stats["op_bytes"]:
+            return None
+        return round(self.stats["bytes_written"] / self.stats["op_bytes"], 2)
+
+    def close(self) -> None:
+        """Flush and checkpoint; called for every open store at exit."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._pending or self._journal_ops:
+                self._flush_locked()
+                self._checkpoint_locked()
+
+
+class _Flusher:
+    """
+    One background thread for all stores: a store marks itself dirty on its
+    first pending op and is flushed once its debounce interval has passed.
+    """
+
+    def __init__(self):
+        self._stores = weakref.WeakSet()
+        self._dirty: Dict[JournaledStore, float] = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        atexit.register(self.close_all)
+
+    def register(self, store: JournaledStore) -> None:
+        with self._cond:
+            self._stores.add(store)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="huzenix-storage", daemon=True)
+                self._thread.start()
+
+    def mark_dirty(self, store: JournaledStore) -> None:
+        with self._cond:
+            if store not in self._dirty:
+                self._dirty[store] = time.monotonic() + store.flush_interval
+                self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._dirty:
+                    self._cond.wait()
+                now = time.monotonic()
+                due = [s for s, at in self._dirty.items() if at <= now]
+                if not due:
+                    self._cond.wait(min(self._dirty.values()) - now)
+                    continue
+                for store in due:
+                    del self._dirty[store]
+            for store in due:
+                store.flush()
+
+    def close_all(self) -> None:
+        for store in list(self._stores):
+            store.close()
+
+
+_flusher = _Flusher()
+
+
+def close_all() -> None:
+    """Flush and checkpoint every open store now (e.g. before removing its folder)."""
+    _flusher.close_all()
+
+
+def _fsync_dir(path: Path) -> None:
+    if os.name != "posix":
+        return
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -1,13 +1,20 @@
 import queue
 import json
+import threading
 import time
 import sounddevice as sd
 from vosk import Model, KaldiRecognizer
 
+from core import metrics, tracing
+from core.voice_output import add_speech_listener
+
 SAMPLE_RATE = 16000
 BLOCK_SIZE = 8000
 VOSK_MODEL_PATH = "models/vosk/vosk-model-small-en-in-0.4"
 WAKE_WORDS = ("hello", "huzenix", "hey huzenix")
+PHRASE_TIME_LIMIT = 8.0  # streaming listen() waits for a whole phrase
+
+QUEUE_DEPTH = metrics.gauge("huzenix_stt_queue_depth", "Audio blocks waiting for the recognizer")
 
 
 class STTEngine:
@@ -16,6 +23,14 @@ class STTEngine:
         self.model = Model(VOSK_MODEL_PATH)
         self.recognizer = KaldiRecognizer(self.model, SAMPLE_RATE)
 
+        # Streaming mode state
+        self._on_text = None
+        self._thread = None
+        self._waiter = None
+        self._lock = threading.Lock()
+        self._muted = False
+        self._reset_pending = False
+
         # 🔥 Stream always ON (low latency)
         self.stream = sd.RawInputStream(
             samplerate=SAMPLE_RATE,
@@ -26,10 +41,14 @@ class STTEngine:
         )
         self.stream.start()
 
+        QUEUE_DEPTH.track(self, lambda engine: engine.audio_queue.qsize())
+
         print("🎧 STT stream started (low latency mode)")
 
     def _callback(self, indata, frames, time_info, status):
-        self.audio_queue.put(bytes(indata))
+        # Don't transcribe our own voice while Piper is playing
+        if not self._muted:
+            self.audio_queue.put(bytes(indata))
 
     def _reset(self):
         self.recognizer = KaldiRecognizer(self.model, SAMPLE_RATE)
@@ -39,11 +58,98 @@ class STTEngine:
             except queue.Empty:
                 break
 
+    @staticmethod
+    def has_wake_word(text: str) -> bool:
+        words = text.lower().split()
+        return any(w == word for w in WAKE_WORDS for word in words)
+
+    # ---------- STREAMING ---------- #
+
+    def start(self, on_text):
+        """
+        Recognize continuously on a background thread and hand every final
+        transcript to on_text(text). Audio is muted while speech plays.
+        """
+        self._on_text = on_text
+        add_speech_listener(self.mute, self.unmute)
+
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._recognize_loop, name="huzenix-stt", daemon=True
+            )
+            self._thread.start()
+
+    def mute(self, *_):
+        self._muted = True
+
+    def unmute(self, *_):
+        self._reset_pending = True
+        self._muted = False
+
+    def _recognize_loop(self):
+        utterance_start = None
+
+        while True:
+            data = self.audio_queue.get()
+
+            if self._reset_pending:
+                self._reset_pending = False
+                self._reset()
+                utterance_start = None
+                continue
+
+            if self.recognizer.AcceptWaveform(data):
+                result = json.loads(self.recognizer.Result())
+                text = result.get("text", "").lower().strip()
+
+                if text:
+                    started = utterance_start or time.perf_counter()
+                    tracing.record(
+                        "listen",
+                        (time.perf_counter() - started) * 1000.0,
+                        words=len(text.split()),
+                    )
+                    print("🗣 Heard:", text)
+                    self._emit(text)
+                utterance_start = None
+
+            elif utterance_start is None:
+                if json.loads(self.recognizer.PartialResult()).get("partial"):
+                    utterance_start = time.perf_counter()
+
+    def _emit(self, text):
+        with self._lock:
+            waiter, self._waiter = self._waiter, None
+
+        # A blocking listen() from inside a handler gets first claim
+        if waiter is not None:
+            waiter.put(text)
+        elif self._on_text:
+            self._on_text(text)
+
+    def _next_transcript(self, timeout=None):
+        waiter = queue.Queue(maxsize=1)
+        with self._lock:
+            self._waiter = waiter
+        try:
+            return waiter.get(timeout=timeout)
+        except queue.Empty:
+            return ""
+        finally:
+            with self._lock:
+                if self._waiter is waiter:
+                    self._waiter = None
+
     # ---------- WAKE ---------- #
 
     def wait_for_wake(self):
         print("🛌 Waiting for wake word...")
 
+        if self._thread is not None:
+            while not self.has_wake_word(self._next_transcript()):
+                pass
+            return
+
         while True:
             data = self.audio_queue.get()
             if self.recognizer.AcceptWaveform(data):
@@ -53,8 +159,7 @@ class STTEngine:
                 if not text:
                     continue
 
-                words = text.split()
-                if any(w == word for w in WAKE_WORDS for word in words):
+                if self.has_wake_word(text):
                     print("Wake word detected:", text)
                     self._reset()
                     return
@@ -62,13 +167,21 @@ class STTEngine:
     # ---------- LISTEN ---------- #
 
     def listen_once(self, timeout=2.5):
-        start = time.time()
+        if self._thread is not None:
+            return self._next_transcript(max(timeout, PHRASE_TIME_LIMIT))
+
+        deadline = time.time() + timeout
 
         while True:
-            if time.time() - start > timeout:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return ""
+
+            try:
+                data = self.audio_queue.get(timeout=remaining)
+            except queue.Empty:
                 return ""
 
-            data = self.audio_queue.get()
             if self.recognizer.AcceptWaveform(data):
                 result = json.loads(self.recognizer.Result())
                 text = result.get("text", "").lower().strip()
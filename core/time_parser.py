@@ -0,0 +1,249 @@
+"""
+Time expression parser for Huzenix.
+Common spoken forms ("10 minute baad", "in 2 hours", "kal subah 9 baje",
+"at 5 pm", "next monday 6 pm") are handled by compiled regexes. A phrase is
+compiled once into a small spec (memoized) and resolved against the current
+time on every call. dateparser is imported lazily, only for the long tail.
+"""
+
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from core import metrics
+
+DEFAULT_TIMEZONE = "Asia/Kolkata"
+MEMO_SIZE = 1024
+
+PARSES = metrics.counter("huzenix_time_parse_total", "Time phrases parsed, by path")
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "ek": 1,
+    "two": 2, "do": 2, "three": 3, "teen": 3, "four": 4, "char": 4, "chaar": 4,
+    "five": 5, "paanch": 5, "panch": 5, "six": 6, "che": 6, "chhe": 6,
+    "seven": 7, "saat": 7, "eight": 8, "aath": 8, "nine": 9, "nau": 9,
+    "ten": 10, "das": 10, "fifteen": 15, "pandrah": 15, "twenty": 20, "bees": 20,
+    "thirty": 30, "tees": 30, "forty five": 45, "paintalis": 45,
+    "half": 0.5, "half an": 0.5, "aadha": 0.5, "aadhe": 0.5, "aadhi": 0.5,
+}
+UNIT_SECONDS = {
+    "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+    "min": 60, "mins": 60, "minute": 60, "minutes": 60, "minat": 60, "minut": 60,
+    "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
+    "ghanta": 3600, "ghante": 3600, "ghanton": 3600,
+    "day": 86400, "days": 86400, "din": 86400,
+    "week": 604800, "weeks": 604800, "hafta": 604800, "hafte": 604800,
+}
+DAY_OFFSETS = {
+    "today": 0, "aaj": 0, "tonight": 0,
+    "tomorrow": 1, "kal": 1, "parso": 2, "day after tomorrow": 2,
+}
+WEEKDAYS = {
+    "monday": 0, "somvaar": 0, "somvar": 0,
+    "tuesday": 1, "mangalvaar": 1, "mangalvar": 1,
+    "wednesday": 2, "budhvaar": 2, "budhvar": 2,
+    "thursday": 3, "guruvaar": 3, "guruvar": 3, "veervaar": 3,
+    "friday": 4, "shukravaar": 4, "shukravar": 4,
+    "saturday": 5, "shanivaar": 5, "shanivar": 5,
+    "sunday": 6, "ravivaar": 6, "ravivar": 6, "itvaar": 6,
+}
+# Default hour for a period word, and whether bare hours in it are PM
+PERIODS = {
+    "subah": (9, False), "morning": (9, False),
+    "dopahar": (14, True), "afternoon": (14, True), "noon": (12, True),
+    "shaam": (18, True), "sham": (18, True), "evening": (18, True),
+    "raat": (21, True), "night": (21, True), "tonight": (21, True),
+}
+# "raat 12 baje" is midnight; "dopahar 12 baje" is noon
+MIDNIGHT_PERIODS = {"raat", "night", "tonight"}
+FILLER = {"at", "ko", "ke", "ka", "ki", "on", "the", "this", "se", "par", "next", "agle", "is", "wale"}
+
+
+def _alternation(words) -> str:
+    return "|".join(sorted((re.escape(w) for w in words), key=len, reverse=True))
+
+
+# Digits may run into the unit ("5s", "10min"); number words need a space
+# and a full unit, so "as" or "a s" is not "in 1 second"
+_NUM = (
+    rf"(?:(?P<digits>\d+(?:\.\d+)?)\s*"
+    rf"|(?P<word>{_alternation(NUMBER_WORDS)})\s+(?!(?:s|h)\b))"
+)
+RELATIVE_RE = re.compile(
+    rf"^(?:(?:in|after)\s+)?{_NUM}(?P<unit>{_alternation(UNIT_SECONDS)})"
+    r"(?:\s+(?:baad|later|mein|me|from now))?$"
+)
+DAY_RE = re.compile(rf"\b(?P<day>{_alternation(DAY_OFFSETS)})\b")
+WEEKDAY_RE = re.compile(rf"\b(?P<weekday>{_alternation(WEEKDAYS)})\b")
+PERIOD_RE = re.compile(rf"\b(?P<period>{_alternation(PERIODS)})\b")
+CLOCK_RE = re.compile(
+    r"\b(?P<hour>\d{1,2})(?:[:.](?P<minute>\d{2}))?\s*"
+    r"(?P<suffix>a\.?m\.?|p\.?m\.?|baje|bje|o'?clock|hrs|hours)?(?=\s|$)"
+)
+
+# Spec: ("rel", seconds) or ("at", day_offset, weekday, hour, minute, meridiem)
+# where weekday counts days after Monday and 7+ means "next <weekday>" (not today),
+# and hour is 24 for the midnight that ends a night ("raat 12 baje")
+Spec = Tuple
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().replace(",", " ").split())
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def compile_phrase(phrase: str) -> Optional[Spec]:
+    """Phrase -> spec resolvable against any 'now'; None if not a fast-path form."""
+    match = RELATIVE_RE.match(phrase)
+    if match:
+        digits = match.group("digits")
+        amount = float(digits) if digits else NUMBER_WORDS[match.group("word")]
+        return ("rel", amount * UNIT_SECONDS[match.group("unit")])
+
+    rest = phrase
+    day_offset = weekday = period = None
+    for regex in (DAY_RE, WEEKDAY_RE, PERIOD_RE):
+        found = regex.search(rest)
+        if not found:
+            continue
+        word = found.group(0)
+        if regex is DAY_RE:
+            day_offset = DAY_OFFSETS[word]
+            if word == "tonight":
+                period = word
+        elif regex is WEEKDAY_RE:
+            weekday = WEEKDAYS[word] + (7 if re.search(rf"\b(?:next|agle)\s+{word}", phrase) else 0)
+        else:
+            period = word
+        rest = rest[: found.start()] + " " + rest[found.end():]
+
+    hour = minute = None
+    meridiem = None
+    clock = CLOCK_RE.search(rest)
+    if clock:
+        hour, minute = int(clock.group("hour")), int(clock.group("minute") or 0)
+        suffix = (clock.group("suffix") or "").replace(".", "")
+        if suffix in ("am", "pm"):
+            meridiem = suffix
+        elif suffix in ("hrs", "hours") or hour > 12:
+            meridiem = "24"
+        rest = rest[: clock.start()] + " " + rest[clock.end():]
+
+    # Anything left other than filler words means this is not a form we know
+    if any(token not in FILLER for token in rest.split()):
+        return None
+    if hour is None and period is None and day_offset is None and weekday is None:
+        return None
+    if hour is not None and (hour > 23 or minute > 59):
+        return None
+
+    if period is not None:
+        default_hour, is_pm = PERIODS[period]
+        if hour is None:
+            hour, minute, meridiem = default_hour, 0, "24"
+        elif meridiem is None and hour == 12 and period in MIDNIGHT_PERIODS:
+            # Midnight that ends the named night: hour 24 of that day
+            hour, meridiem = 24, "24"
+        elif meridiem is None and hour == 12:
+            meridiem = "pm" if is_pm else "am"
+        elif meridiem is None:
+            meridiem = "pm" if is_pm else "am"
+
+    return ("at", day_offset, weekday, hour, minute, meridiem)
+
+
+def _resolve(spec: Spec, now: datetime) -> datetime:
+    if spec[0] == "rel":
+        return now + timedelta(seconds=spec[1])
+
+    _, day_offset, weekday, hour, minute, meridiem = spec
+    if hour is None:
+        # "kal" / "monday" alone: same time on that day
+        hour, minute, meridiem = now.hour, now.minute, "24"
+
+    if meridiem == "pm":
+        hours = [hour % 12 + 12]
+    elif meridiem == "am":
+        hours = [hour % 12]
+    elif meridiem == "24":
+        hours = [hour]
+    elif day_offset is not None or weekday is not None:
+        # Bare hour on a named day: 1-6 means afternoon/evening
+        hours = [hour + 12 if 1 <= hour <= 6 else hour]
+    else:
+        # Bare "5 baje": whichever of 5:00 / 17:00 comes first
+        hours = sorted({hour % 12, hour % 12 + 12})
+
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if weekday is not None:
+        days_ahead = (weekday % 7 - now.weekday()) % 7
+        if weekday >= 7 and days_ahead == 0:
+            days_ahead = 7
+        days = [days_ahead, days_ahead + 7]
+    elif day_offset is not None:
+        days = [day_offset]
+    else:
+        days = [0, 1]
+
+    # timedelta, not replace(): hour 24 is midnight at the end of the day
+    candidates = [
+        today + timedelta(days=d, hours=h, minutes=minute)
+        for d in days for h in hours
+    ]
+    if day_offset is not None:
+        # An explicit day is kept even if that time has passed
+        return candidates[0]
+    future = [c for c in candidates if c > now]
+    return future[0] if future else candidates[-1]
+
+
+def parse_time(
+    text: str,
+    timezone: str = DEFAULT_TIMEZONE,
+    now: Optional[datetime] = None,
+    fast_only: bool = False,
+) -> Optional[datetime]:
+    """
+    Parse a natural language time expression.
+
+    Args:
+        text: e.g. "10 minute baad", "kal subah 9 baje", "at 5 pm"
+        timezone: Zone for wall-clock phrases
+        now: Reference time (default: current time in timezone)
+        fast_only: Don't fall back to dateparser (None instead)
+
+    Returns:
+        Timezone-aware datetime, or None if unparseable
+    """
+    tz = ZoneInfo(timezone)
+    now = now.astimezone(tz) if now else datetime.now(tz)
+
+    phrase = _normalize(text)
+    spec = compile_phrase(phrase) if phrase else None
+    if spec is not None:
+        PARSES.inc(path="fast")
+        return _resolve(spec, now)
+    if fast_only:
+        return None
+
+    PARSES.inc(path="dateparser")
+    return _parse_long_tail(text, timezone, now)
+
+
+def _parse_long_tail(text: str, timezone: str, now: datetime) -> Optional[datetime]:
+    try:
+        import dateparser  # slow to import; only the long tail needs it
+    except ImportError:
+        return None
+
+    settings = {
+        "TIMEZONE": timezone,
+        "RETURN_AS_TIMEZONE_AWARE": True,
+        "RELATIVE_BASE": now.replace(tzinfo=None),
+    }
+    result = dateparser.parse(text, settings=settings)
+    if result is not None and result.tzinfo is None:
+        result = result.replace(tzinfo=ZoneInfo(timezone))
+    return result
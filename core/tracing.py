@@ -0,0 +1,270 @@
+"""
+Per-turn latency tracing for Huzenix.
+Lightweight spans for every stage of a turn (wake, listen, intent, handler,
+LLM, TTS). The hot path only takes two perf_counter() readings and hands the
+finished span to a background writer, which appends it to a rotating JSONL
+file. Rolling p50/p95/p99 per stage are kept in memory.
+"""
+
+import atexit
+import contextvars
+import itertools
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+TRACE_ENABLED = os.getenv("HUZENIX_TRACE", "1").lower() not in ("0", "false", "off")
+TRACE_FILE = Path(__file__).parent.parent / "data" / "traces.jsonl"
+MAX_FILE_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+WINDOW = 2000  # last N samples per stage for percentiles
+
+_current_turn = contextvars.ContextVar("huzenix_turn", default=None)
+_turn_ids = itertools.count(1)
+
+
+class _NullSpan:
+    """Shared no-op span returned when tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A single timed stage. Use as a context manager."""
+
+    __slots__ = ("tracer", "stage", "turn", "attrs", "start", "_token")
+
+    def __init__(self, tracer: "Tracer", stage: str, attrs: dict):
+        self.tracer = tracer
+        self.stage = stage
+        self.turn = _current_turn.get()
+        self.attrs = attrs
+        self.start = 0.0
+        self._token = None
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self.start) * 1000.0
+        if self._token is not None:
+            _current_turn.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer._record(self, duration_ms)
+        return False
+
+
+class Tracer:
+    """Collects spans, aggregates percentiles and writes JSONL in the background."""
+
+    def __init__(
+        self,
+        path: Path = TRACE_FILE,
+        enabled: bool = TRACE_ENABLED,
+        max_bytes: int = MAX_FILE_BYTES,
+        backup_count: int = BACKUP_COUNT,
+    ):
+        self.path = Path(path)
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self._samples: Dict[str, deque] = {}
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # ---------- SPANS ---------- #
+
+    def span(self, stage: str, **attrs):
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, stage, attrs)
+
+    def turn(self, **attrs):
+        """
+        Start a new turn. Spans opened inside it share its turn id, and the
+        whole turn is recorded as the "turn" stage.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        span = Span(self, "turn", attrs)
+        span.turn = next(_turn_ids)
+        span._token = _current_turn.set(span.turn)
+        return span
+
+    def record(self, stage: str, duration_ms: float, **attrs) -> None:
+        """Record a stage that was timed elsewhere (e.g. on another thread)."""
+        if self.enabled:
+            self._record(Span(self, stage, attrs), duration_ms)
+
+    def _record(self, span: Span, duration_ms: float) -> None:
+        samples = self._samples.get(span.stage)
+        if samples is None:
+            samples = self._samples.setdefault(span.stage, deque(maxlen=WINDOW))
+        samples.append(duration_ms)
+
+        if self._writer is None:
+            self._start_writer()
+        self._queue.put((time.time(), span.turn, span.stage, duration_ms, span.attrs))
+
+    # ---------- AGGREGATION ---------- #
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Rolling p50/p95/p99 (ms) per stage."""
+        return {
+            stage: _percentiles(list(samples))
+            for stage, samples in list(self._samples.items())
+            if samples
+        }
+
+    def reset(self) -> None:
+        self._samples.clear()
+
+    # ---------- WRITER ---------- #
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(
+                target=self._write_loop, name="huzenix-tracer", daemon=True
+            )
+            self._writer.start()
+            atexit.register(self.flush)
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < 256:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            self._write(batch)
+
+    def flush(self) -> None:
+        """Write out everything still queued (called at exit)."""
+        batch = []
+        try:
+            while True:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch: List[tuple]) -> None:
+        lines = []
+        for ts, turn, stage, duration_ms, attrs in batch:
+            record = {"ts": round(ts, 3), "turn": turn, "stage": stage,
+                      "ms": round(duration_ms, 3)}
+            if attrs:
+                record.update(attrs)
+            lines.append(json.dumps(record, default=str))
+
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            print("Trace write error:", e)
+
+    def _rotate(self) -> None:
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        if self.backup_count > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    values.sort()
+    n = len(values)
+
+    def pick(p: float) -> float:
+        return round(values[min(n - 1, max(0, math.ceil(p * n) - 1))], 3)
+
+    return {"count": n, "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def summarize(lines: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """Aggregate JSONL trace lines into p50/p95/p99 (ms) per stage."""
+    per_stage: Dict[str, List[float]] = {}
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        per_stage.setdefault(record.get("stage", "?"), []).append(record.get("ms", 0.0))
+    return {stage: _percentiles(values) for stage, values in per_stage.items()}
+
+
+def format_stats(stats: Dict[str, Dict[str, float]]) -> str:
+    rows = [f"{'stage':<14}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}"]
+    for stage, s in sorted(stats.items()):
+        rows.append(
+            f"{stage:<14}{s['count']:>8}{s['p50']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}"
+        )
+    return "\n".join(rows)
+
+
+# ---------- DEFAULT TRACER ---------- #
+
+tracer = Tracer()
+
+
+def span(stage: str, **attrs):
+    return tracer.span(stage, **attrs)
+
+
+def turn(**attrs):
+    return tracer.turn(**attrs)
+
+
+def record(stage: str, duration_ms: float, **attrs) -> None:
+    tracer.record(stage, duration_ms, **attrs)
+
+
+def set_enabled(enabled: bool) -> None:
+    tracer.enabled = enabled
+
+
+if __name__ == "__main__":
+    # python -m core.tracing [traces.jsonl ...]
+    paths = [Path(p) for p in sys.argv[1:]] or [TRACE_FILE]
+    collected: List[str] = []
+    for p in paths:
+        if p.exists():
+            collected.extend(p.read_text(encoding="utf-8").splitlines())
+    print(format_stats(summarize(collected)))
@@ -1,14 +1,48 @@
 """
 Voice input interface for Huzenix.
-Thin wrapper over STTEngine.
+Thin wrapper over STTEngine. The engine (and the microphone) is only
+created on first use, so importing this module is safe in headless modes.
 """
 
-from core.stt_engine import STTEngine
+import contextlib
+import contextvars
+from typing import Iterable, Optional
 
-_stt = STTEngine()
+_stt = None
+
+# Headless callers (server, batch) answer listen() from a script instead
+_scripted: contextvars.ContextVar = contextvars.ContextVar("huzenix_scripted_input", default=None)
+
+
+def _get_stt():
+    global _stt
+    if _stt is None:
+        from core.stt_engine import STTEngine
+        _stt = STTEngine()
+    return _stt
 
 def wait_for_wake():
-    _stt.wait_for_wake()
+    _get_stt().wait_for_wake()
 
 def listen():
-    return _stt.listen_once()
+    answers = _scripted.get()
+    if answers is not None:
+        return answers.pop(0) if answers else ""
+    return _get_stt().listen_once()
+
+def start_listening(on_text):
+    """Stream every final transcript to on_text(text) from a background thread."""
+    _get_stt().start(on_text)
+
+def has_wake_word(text: str) -> bool:
+    from core.stt_engine import STTEngine
+    return STTEngine.has_wake_word(text)
+
+@contextlib.contextmanager
+def scripted_input(answers: Optional[Iterable[str]] = None):
+    """Answer listen() calls in this context from `answers`, then with ""."""
+    token = _scripted.set(list(answers or ()))
+    try:
+        yield
+    finally:
+        _scripted.reset(token)
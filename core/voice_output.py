@@ -1,8 +1,14 @@
+import contextlib
+import contextvars
 import subprocess
 import os
-import sounddevice as sd
-import soundfile as sf
+import queue
 import tempfile
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from core import metrics
+from core.tracing import span
 
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 
@@ -11,11 +17,114 @@ VOICE_MODEL = os.path.join(BASE_DIR, "tools", "piper", "models", "en_US-amy-medi
 
 SAMPLE_RATE = 22050
 
+PIPER_LAUNCHES = metrics.counter("huzenix_piper_launches_total", "Piper processes started")
+PIPER_FAILURES = metrics.counter("huzenix_piper_failures_total", "Failed TTS attempts")
+
+# Speech runs on one worker thread so every caller is serialized and the
+# rest of the app can react to start/finish events.
+_speech_queue: "queue.Queue" = queue.Queue()
+_speech_thread: Optional[threading.Thread] = None
+_speech_lock = threading.Lock()
+_listeners: List[Tuple[Optional[Callable[[str], None]], Optional[Callable[[str], None]]]] = []
+
+# Headless callers (server, batch) redirect speech into a sink instead
+_capture: contextvars.ContextVar = contextvars.ContextVar("huzenix_speech_capture", default=None)
+
+
+@contextlib.contextmanager
+def capture_speech(sink: Callable[[str], None] = None):
+    """
+    Collect everything spoken in this context instead of playing it.
+    Yields the list of captured texts; sink(text) is also called per item.
+    """
+    captured: List[str] = []
+
+    def _collect(text: str) -> None:
+        captured.append(text)
+        if sink:
+            sink(text)
+
+    token = _capture.set(_collect)
+    try:
+        yield captured
+    finally:
+        _capture.reset(token)
+
+
+def add_speech_listener(
+    on_start: Callable[[str], None] = None,
+    on_done: Callable[[str], None] = None,
+) -> None:
+    """Get notified (on the speech thread) when an utterance starts/finishes."""
+    _listeners.append((on_start, on_done))
+
 
 def speak(text: str):
-    if not text.strip():
-        return
+    """Speak text and block until playback has finished."""
+    done = speak_async(text)
+    if done is not None:
+        done.wait()
+
 
+def speak_async(text: str, on_done: Callable[[], None] = None) -> Optional[threading.Event]:
+    """Queue text for speech and return an Event that is set when it is done."""
+    if not isinstance(text, str) or not text.strip():
+        return None
+
+    collect = _capture.get()
+    if collect is not None:
+        collect(text)
+        if on_done:
+            on_done()
+        return None
+
+    if threading.current_thread() is _speech_thread:
+        # Called from a listener: speaking inline avoids waiting on ourselves
+        _say(text)
+        if on_done:
+            on_done()
+        return None
+
+    _ensure_worker()
+    done = threading.Event()
+    _speech_queue.put((text, done, on_done))
+    return done
+
+
+def _ensure_worker() -> None:
+    global _speech_thread
+    with _speech_lock:
+        if _speech_thread is None:
+            _speech_thread = threading.Thread(
+                target=_speech_worker, name="huzenix-speech", daemon=True
+            )
+            _speech_thread.start()
+
+
+def _speech_worker() -> None:
+    while True:
+        text, done, on_done = _speech_queue.get()
+        _notify(0, text)
+        try:
+            _say(text)
+        finally:
+            _notify(1, text)
+            done.set()
+            if on_done:
+                on_done()
+
+
+def _notify(index: int, text: str) -> None:
+    for callbacks in list(_listeners):
+        callback = callbacks[index]
+        if callback:
+            try:
+                callback(text)
+            except Exception as e:
+                print("Speech listener error:", e)
+
+
+def _say(text: str):
     print("Huzenix:", text)
 
     if os.path.exists(PIPER_EXE) and os.path.exists(VOICE_MODEL):
@@ -26,6 +135,10 @@ def speak(text: str):
 
 def _speak_piper(text: str):
     try:
+        # Imported here so headless modes never load audio libraries
+        import sounddevice as sd
+        import soundfile as sf
+
         with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as f:
             wav_path = f.name
 
@@ -36,6 +149,7 @@ def _speak_piper(text: str):
             "--length_scale", "1.05"
         ]
 
+        PIPER_LAUNCHES.inc()
         process = subprocess.Popen(
             cmd,
             stdin=subprocess.PIPE,
@@ -44,13 +158,16 @@ def _speak_piper(text: str):
             text=True
         )
 
-        process.communicate(input=text)
+        with span("tts_synth", chars=len(text)):
+            process.communicate(input=text)
 
-        data, sr = sf.read(wav_path, dtype="float32")
-        sd.play(data, sr)
-        sd.wait()
+        with span("tts_play"):
+            data, sr = sf.read(wav_path, dtype="float32")
+            sd.play(data, sr)
+            sd.wait()
 
         os.remove(wav_path)
 
     except Exception as e:
+        PIPER_FAILURES.inc()
         print("TTS error:", e)
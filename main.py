@@ -3,19 +3,20 @@ Huzenix - Modular Voice AI Assistant
 Main entry point (ROUTER ONLY).
 """
 
-import time
-import schedule
+import argparse
 from pathlib import Path
 from datetime import datetime
 from enum import Enum, auto
 
 # Core
-from core.voice_input import listen, wait_for_wake
-from core.voice_output import speak
+from core.voice_input import has_wake_word, start_listening
+from core.voice_output import speak, speak_async
+from core.event_loop import Event, EventLoop, EventType
 from core.security import SecurityManager
 from core.conversation_engine import ConversationEngine
 from core.intent_parser import Intent
 from core.memory_manager import MemoryManager
+from core import metrics, tracing
 
 
 # Modules
@@ -26,12 +27,8 @@ from modules.weather import WeatherManager
 from modules.calculator import Calculator
 from modules.file_manager import FileManager
 
-# Plugins
-try:
-    from plugins.chat import ChatPlugin
-    CHAT_PLUGIN_AVAILABLE = True
-except ImportError:
-    CHAT_PLUGIN_AVAILABLE = False
+# Plugins (found by manifest, imported on first use)
+from plugins.registry import discover as discover_plugins
 
 
 class AppSignal(Enum):
@@ -39,12 +36,21 @@ class AppSignal(Enum):
     EXIT = auto()
 
 
+class AppState(Enum):
+    STANDBY = auto()
+    CONVERSATION = auto()
+
+
+STANDBY_WORDS = ("exit", "stop", "ruk jao", "bye")
+FAREWELL = "Theek hai, band ho raha hoon."
+
+
 class HuzenixApp:
     """Main application router and lifecycle manager."""
 
-    def __init__(self):
-        self.data_dir = Path(__file__).parent / "data"
-        self.data_dir.mkdir(exist_ok=True)
+    def __init__(self, data_dir: Path = None):
+        self.data_dir = Path(data_dir or Path(__file__).parent / "data")
+        self.data_dir.mkdir(parents=True, exist_ok=True)
 
         # Core managers
         self.security = SecurityManager(self.data_dir)
@@ -64,7 +70,9 @@ class HuzenixApp:
         self._register_handlers()
         self._load_plugins()
 
-        schedule.every(60).seconds.do(self.reminders.check_and_trigger)
+        # Event loop (reminders fire in every state, standby included)
+        self.loop = EventLoop()
+        self.state = AppState.STANDBY
 
     # ---------- ENGINE REGISTRATION ---------- #
 
@@ -81,8 +89,9 @@ class HuzenixApp:
         self.engine.register_handler(Intent.EXIT, self._exit)
 
     def _load_plugins(self):
-        if CHAT_PLUGIN_AVAILABLE:
-            ChatPlugin().register(self.engine)
+        self.plugins = discover_plugins()
+        for plugin in self.plugins:
+            plugin.register(self.engine)
 
     # ---------- PURE HANDLERS ---------- #
 
@@ -127,46 +136,105 @@ class HuzenixApp:
     # ---------- MAIN LOOP ---------- #
 
     def run(self):
-        speak("Huzenix online hai.")
-
-        while True:
-         # 💤 Standby mode (wake word)
-            wait_for_wake()
-            speak("Haan, bolo. Main sun raha hoon.")
+        metrics.register_process_metrics()
+        metrics.start_http_server()
+        metrics.install_signal_handlers()
 
-        # 🟢 Conversation mode
-            while True:
-                schedule.run_pending()
+        speak("Huzenix online hai.")
 
-                query = listen()
+        start_listening(lambda text: self.loop.post(EventType.TRANSCRIPT, text))
+        self.reminders.start(lambda r: self.loop.post(EventType.REMINDER, r))
+        print("🛌 Waiting for wake word...")
 
-                if not query:
-                    time.sleep(0.2)
-                    continue
+        self.loop.run(self._on_event)
+        print(tracing.format_stats(tracing.tracer.stats()))
 
-                print("🗣 User:", query)
+    def _on_event(self, event: Event):
+        if event.type == EventType.TRANSCRIPT:
+            self._on_transcript(event.payload)
 
-            # 🔚 Exit conversation (NOT exit app)
-                if query in ("exit", "stop", "ruk jao", "bye"):
-                    speak("Theek hai, standby mode.")
-                    break
+        elif event.type == EventType.REMINDER:
+            speak_async(self.reminders.announce(event.payload))
 
-                result = self.engine.process(
-                    query,
-                    security_manager=self.security,
-                    memory=self.memory
-                )
+        elif event.type == EventType.EXIT:
+            self.loop.stop()  # full app exit
 
-                if result == Intent.EXIT:
-                    speak("Theek hai, band ho raha hoon.")
-                    return  # full app exit
+    def _on_transcript(self, query: str):
+        # 💤 Standby mode (wake word)
+        if self.state == AppState.STANDBY:
+            with tracing.span("wake"):
+                if not has_wake_word(query):
+                    return
+                self.state = AppState.CONVERSATION
+            speak_async("Haan, bolo. Main sun raha hoon.")
+            return
 
-                if result:
-                    speak(result)
+        # 🟢 Conversation mode
+        print("🗣 User:", query)
+
+        # 🔚 Exit conversation (NOT exit app)
+        if query in STANDBY_WORDS:
+            self.state = AppState.STANDBY
+            speak_async("Theek hai, standby mode.")
+            return
+
+        with tracing.turn(chars=len(query)):
+            result = self.engine.process(
+                query,
+                security_manager=self.security,
+                memory=self.memory
+            )
+
+            if result == Intent.EXIT:
+                self.state = AppState.STANDBY
+                # Exit once the farewell has been spoken
+                speak_async(FAREWELL, on_done=lambda: self.loop.post(EventType.EXIT))
+                return
+
+            if isinstance(result, str) and result:
+                speak_async(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Huzenix voice assistant")
+    parser.add_argument("--serve", action="store_true", help="run the headless text API instead of voice")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--allow-code-and-files", action="store_true",
+                        help="serve code execution and file commands over the API (off by default)")
+    parser.add_argument("--batch", metavar="QUERIES.jsonl", help="run queries from a JSONL file ('-' = stdin)")
+    parser.add_argument("--out", metavar="RESULTS.jsonl", help="batch results (default: stdout)")
+    parser.add_argument("--workers", type=int, default=4, help="batch worker threads")
+    args = parser.parse_args()
+
+    if args.batch:
+        import tempfile
+        from core import storage
+        from core.batch import run_batch
+        # Handlers (notes, reminders, ...) write to a throwaway data dir
+        with tempfile.TemporaryDirectory(prefix="huzenix-batch-") as data_dir:
+            app = HuzenixApp(data_dir=Path(data_dir))
+            try:
+                run_batch(app.engine, app.security, args.batch, args.out, args.workers)
+            finally:
+                storage.close_all()  # before the folder goes
+                app.memory.close()
+                app.code_runner.pool.shutdown()
+        return
+
+    app = HuzenixApp()
+
+    if args.serve:
+        from core.server import HuzenixServer
+        metrics.register_process_metrics()
+        metrics.start_http_server()
+        HuzenixServer(
+            app.engine, app.memory, app.security, host=args.host, port=args.port,
+            allow_unsafe=args.allow_code_and_files,
+        ).serve_forever()
+    else:
+        app.run()
 
-                time.sleep(0.3)
 
 if __name__ == "__main__":
-    HuzenixApp().run()
-
-
+    main()
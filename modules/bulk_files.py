@@ -0,0 +1,262 @@
+"""
+Bulk file operations for Huzenix.
+Deletes, moves, copies or renames every file matching a pattern
+("saari .log files delete karo", "move all pdfs to archive").
+
+An operation is planned first: files are selected (from the PathIndex when
+there is one), targets are worked out and clashes skipped, so the plan can be
+previewed as a dry run and confirmed before anything changes. Running it
+spreads the files over a small thread pool (file operations wait on the
+disk, not the GIL); workers hand results to a queue without blocking, and
+the caller gets progress callbacks and one summary at the end.
+
+Patterns without "/" match file names at any depth ("*.log"); with "/" they
+match paths relative to the root ("logs/*.txt" is everything below logs/).
+Rename templates take {name}, {stem}, {ext} and {n} (1, 2, ... in name order).
+"""
+
+import fnmatch
+import queue
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core import metrics
+from modules.content_search import walk_files
+
+OPERATIONS = ("delete", "move", "copy", "rename")
+WORKERS = 4               # threads per operation
+MAX_FILES = 5000          # files one operation may touch
+PREVIEW_NAMES = 3         # examples named in a preview
+FAILURES_NAMED = 3        # failures named in a summary
+PROGRESS_EVERY = 2.0      # seconds between progress callbacks
+
+ProgressCallback = Callable[[int, int], None]
+
+BULK_FILES = metrics.counter("huzenix_bulk_files_total", "Files handled by bulk operations by operation and outcome")
+BULK_LATENCY = metrics.histogram("huzenix_bulk_operation_seconds", "Bulk file operation run time")
+
+
+class BulkError(ValueError):
+    """The operation can't be planned (bad destination or template)."""
+
+
+def matches(rel: str, pattern: str) -> bool:
+    """Whether a root-relative path matches a bulk pattern (see module doc)."""
+    if "/" not in pattern:
+        return fnmatch.fnmatch(rel.rpartition("/")[2].lower(), pattern.lower())
+    return fnmatch.fnmatch(rel.lower(), pattern.lower().lstrip("./"))
+
+
+def select(root: Path, pattern: str, index=None, limit: int = MAX_FILES) -> Tuple[List[str], bool]:
+    """
+    Files below root matching pattern.
+
+    Args:
+        root: Directory searched
+        pattern: Bulk pattern ("*.log", "logs/*.txt")
+        index: PathIndex of root, if ready (else the tree is walked)
+        limit: Most files returned
+
+    Returns:
+        (sorted root-relative paths, True if there were more than limit)
+    """
+    if index is not None:
+        candidates: Iterable[str] = index.files()[1]
+    else:
+        candidates = (Path(p).relative_to(root).as_posix() for p in walk_files(root))
+
+    found = []
+    for rel in candidates:
+        if matches(rel, pattern):
+            if len(found) >= limit:
+                return sorted(found), True
+            found.append(rel)
+    return sorted(found), False
+
+
+def _inside(root: Path, path: Path) -> bool:
+    try:
+        path.resolve().relative_to(root.resolve())
+        return True
+    except ValueError:
+        return False
+
+
+class BulkPlan:
+    """What one bulk operation will do, worked out before anything changes."""
+
+    def __init__(self, root: Path, operation: str, files: List[str], target: str = "", truncated: bool = False):
+        """
+        Args:
+            root: Directory the files are relative to
+            operation: One of OPERATIONS
+            files: Root-relative paths (select())
+            target: Destination folder (move, copy) or name template (rename)
+            truncated: More files matched than were selected
+
+        Raises:
+            BulkError: Missing or unsafe destination, bad template
+        """
+        if operation not in OPERATIONS:
+            raise BulkError(f"unknown operation {operation}")
+        self.root = Path(root)
+        self.operation = operation
+        self.target = target
+        self.truncated = truncated
+        self.steps: List[Tuple[str, Optional[Path]]] = []
+        self.skipped: List[Tuple[str, str]] = []
+
+        if operation in ("move", "copy"):
+            self._plan_transfer(files, target)
+        elif operation == "rename":
+            self._plan_rename(files, target)
+        else:
+            self.steps = [(rel, None) for rel in files]
+
+    def _plan_transfer(self, files: List[str], folder: str) -> None:
+        if not folder:
+            raise BulkError(f"Where should the files {self.operation} to?")
+        destination = self.root / folder
+        if not _inside(self.root, destination):
+            raise BulkError(f"{folder} is outside the working folder.")
+        if destination.exists() and not destination.is_dir():
+            raise BulkError(f"{folder} is a file, not a folder.")
+        taken = set()
+        for rel in files:
+            source = self.root / rel
+            target = destination / source.name
+            if source.parent.resolve() == destination.resolve():
+                self.skipped.append((rel, "already there"))
+            elif target.exists() or source.name in taken:
+                self.skipped.append((rel, f"{source.name} already exists in {folder}"))
+            else:
+                taken.add(source.name)
+                self.steps.append((rel, target))
+
+    def _plan_rename(self, files: List[str], template: str) -> None:
+        if not template:
+            raise BulkError("What should the files be renamed to?")
+        taken = set()
+        for n, rel in enumerate(files, 1):
+            source = self.root / rel
+            try:
+                name = template.format(name=source.name, stem=source.stem, ext=source.suffix, n=n)
+            except (KeyError, IndexError, ValueError):
+                raise BulkError(f"Bad rename template {template}; use {{name}}, {{stem}}, {{ext}} or {{n}}.")
+            if not name or "/" in name or "\\" in name or name in (".", ".."):
+                raise BulkError(f"Bad file name from template: {name!r}")
+            target = source.with_name(name)
+            if target == source:
+                self.skipped.append((rel, "name unchanged"))
+            elif target.exists() or target in taken:
+                self.skipped.append((rel, f"{name} already exists"))
+            else:
+                taken.add(target)
+                self.steps.append((rel, target))
+
+    # ---------- PREVIEW ---------- #
+
+    def _describe(self, rel: str, target: Optional[Path]) -> str:
+        if self.operation == "rename":
+            return f"{rel} to {target.name}"
+        return rel
+
+    def preview(self) -> str:
+        """Dry-run description: how many files, a few examples, what's skipped."""
+        count = len(self.steps)
+        where = f" to {self.target}" if self.operation in ("move", "copy") else ""
+        examples = ", ".join(self._describe(rel, target) for rel, target in self.steps[:PREVIEW_NAMES])
+        more = f" and {count - PREVIEW_NAMES} more" if count > PREVIEW_NAMES else ""
+        text = f"This will {self.operation} {count} file{'' if count == 1 else 's'}{where}: {examples}{more}."
+        if self.skipped:
+            text += f" {len(self.skipped)} skipped ({self.skipped[0][1]})."
+        if self.truncated:
+            text += f" Only the first {MAX_FILES} matching files are included."
+        return text
+
+    # ---------- EXECUTION ---------- #
+
+    def _apply(self, rel: str, target: Optional[Path]) -> None:
+        source = self.root / rel
+        if self.operation == "delete":
+            source.unlink()
+            return
+        # Re-check: the target may have appeared since the plan was made
+        if target.exists():
+            raise FileExistsError(f"{target.name} already exists")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if self.operation == "copy":
+            shutil.copy2(source, target)
+        else:
+            shutil.move(str(source), str(target))
+
+    def execute(self, workers: int = WORKERS, on_progress: ProgressCallback = None) -> Dict:
+        """
+        Run the plan on a thread pool.
+
+        Args:
+            workers: Threads used
+            on_progress: Called as on_progress(done, total) every
+                         PROGRESS_EVERY seconds while files remain
+
+        Returns:
+            {"done": [rel], "failed": [(rel, error)], "skipped": [(rel, reason)],
+             "changed": [Path] (sources and targets, for index refreshes), "seconds"}
+        """
+        started = time.perf_counter()
+        results: "queue.Queue[Tuple[str, Optional[Path], Optional[str]]]" = queue.Queue()
+
+        def work(rel: str, target: Optional[Path]) -> None:
+            try:
+                self._apply(rel, target)
+                results.put_nowait((rel, target, None))
+            except Exception as e:
+                results.put_nowait((rel, target, str(e) or type(e).__name__))
+
+        done, failed, changed = [], [], []
+        total = len(self.steps)
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="huzenix-bulk") as pool:
+            for rel, target in self.steps:
+                pool.submit(work, rel, target)
+
+            next_report = time.monotonic() + PROGRESS_EVERY
+            while len(done) + len(failed) < total:
+                try:
+                    rel, target, error = results.get(timeout=max(0.0, next_report - time.monotonic()))
+                except queue.Empty:
+                    if on_progress:
+                        on_progress(len(done) + len(failed), total)
+                    next_report = time.monotonic() + PROGRESS_EVERY
+                    continue
+                if error is None:
+                    done.append(rel)
+                    changed.append(self.root / rel)
+                    if target is not None:
+                        changed.append(target)
+                else:
+                    failed.append((rel, error))
+
+        elapsed = time.perf_counter() - started
+        BULK_LATENCY.observe(elapsed, operation=self.operation)
+        BULK_FILES.inc(len(done), operation=self.operation, outcome="ok")
+        BULK_FILES.inc(len(failed), operation=self.operation, outcome="failed")
+        BULK_FILES.inc(len(self.skipped), operation=self.operation, outcome="skipped")
+        return {"done": done, "failed": failed, "skipped": self.skipped, "changed": changed, "seconds": elapsed}
+
+    def summary(self, result: Dict) -> str:
+        """One spoken line for an executed plan."""
+        past = {"delete": "Deleted", "move": "Moved", "copy": "Copied", "rename": "Renamed"}[self.operation]
+        done, failed, skipped = len(result["done"]), result["failed"], result["skipped"]
+        text = f"{past} {done} file{'' if done == 1 else 's'}"
+        if self.operation in ("move", "copy"):
+            text += f" to {self.target}"
+        text += "."
+        if failed:
+            named = ", ".join(f"{rel} ({error})" for rel, error in failed[:FAILURES_NAMED])
+            text += f" {len(failed)} failed: {named}."
+        if skipped:
+            text += f" {len(skipped)} skipped."
+        return text
@@ -1,9 +1,14 @@
 """
 Calculator module for Huzenix.
 Handles mathematical calculations.
+
+Spoken English/Hinglish math ("paanch plus teen", "square root of 81",
+"20 percent of 150") and typed expressions are compiled by
+core.spoken_math and evaluated without eval().
 """
 
-import re
+from core import spoken_math
+from core.spoken_math import MathError
 
 
 class Calculator:
@@ -20,28 +25,12 @@ class Calculator:
         Returns:
             Calculation result string
         """
-        # Extract numbers and operators
-        expression = Calculator._extract_expression(query)
-        
-        if not expression:
-            return "I couldn't understand the calculation. Please try again."
-
         try:
-            # Safe evaluation: only numbers, +, -, *, /, (, )
-            if not all(c in "0123456789+-*/()." for c in expression.replace(" ", "")):
-                return "Invalid mathematical expression."
-            
-            result = eval(expression)
-            return f"The answer is {result}"
-        except (ValueError, SyntaxError, ZeroDivisionError):
-            return "I couldn't calculate that. Please check your expression."
+            result = spoken_math.calculate(query or "", partial=True)
+        except MathError as e:
+            return f"I couldn't calculate that: {e}."
 
-    @staticmethod
-    def _extract_expression(query: str) -> str:
-        """Extract mathematical expression from query."""
-        # Remove common prefixes
-        query = query.replace("what is", "").replace("calculate", "").strip()
-        
-        # Find sequence of numbers and operators
-        match = re.search(r"[\d\s+\-*/().]+", query)
-        return match.group(0) if match else None
+        if result is None:
+            return "I couldn't understand the calculation. Please try again."
+
+        return f"The answer is {spoken_math.format_number(result)}"
@@ -1,28 +1,367 @@
+"""
+Code runner module for Huzenix.
+Runs Python snippets in a pool of warm worker interpreters.
+
+Each worker (modules/code_worker.py) is started ahead of time in isolated
+mode with the common modules already imported, and runs one snippet at a
+time in a forked child under per-run CPU/memory rlimits (where the OS has
+them), so no state carries over between runs. Requests and replies carry a
+run id; a reply for another run, or anything that isn't a protocol
+message, gets the worker replaced. So does a timeout, a dead worker or
+reaching MAX_RUNS (every run where the worker can't fork), in the
+background, so the next run is warm again.
+
+Output is streamed back while the snippet runs and capped at OUTPUT_LIMIT
+bytes per stream (head and tail are kept, the middle is left out), so a
+print loop can't fill memory. run_python() speaks the output of a snippet
+that is still running after SPEAK_AFTER seconds as it arrives.
+"""
+
+import contextvars
+import json
+import queue
+import os
+import shutil
+import signal
 import subprocess
+import sys
 import tempfile
-import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
 
-class CodeRunner:
+from core import metrics
+from core.voice_output import speak_async
 
-    def run_python(self, code: str) -> str:
+WORKER_SCRIPT = Path(__file__).with_name("code_worker.py")
+POOL_SIZE = 2
+MAX_RUNS = 50             # runs before a worker is replaced
+TIMEOUT = 10              # wall-clock seconds per run
+CPU_SECONDS = 5           # CPU seconds per run
+MEMORY_BYTES = 256 * 1024 * 1024  # extra address space per run
+START_TIMEOUT = 10
+OUTPUT_LIMIT = 16 * 1024  # bytes kept per stream (head + tail)
+SPEAK_AFTER = 0.5         # seconds before output is spoken while running
+
+OutputCallback = Callable[[str, str], None]
+
+RUN_LATENCY = metrics.histogram("huzenix_code_run_seconds", "Snippet run latency by worker state")
+RUNS = metrics.counter("huzenix_code_runs_total", "Snippet runs by outcome")
+
+
+class Worker:
+    """One warm interpreter speaking JSON lines over its stdin/stdout."""
+
+    def __init__(self):
+        self.runs = 0
+        self.forks = False       # set from the ready message
+        self.violated = False    # spoke out of protocol: replace after this run
+        self.workdir = tempfile.mkdtemp(prefix="huzenix-code-")
+        self.proc = subprocess.Popen(
+            [sys.executable, "-I", str(WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.workdir,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            # Own process group, so a kill also reaches forked snippet children
+            start_new_session=hasattr(os, "killpg"),
+        )
+        # Pipes can't be select()ed on Windows: a reader thread feeds a queue
+        self._replies: "queue.Queue[Optional[dict]]" = queue.Queue()
+        threading.Thread(target=self._read, name="huzenix-code-reader", daemon=True).start()
+        self.ready = threading.Event()
+
+    def _read(self) -> None:
+        for line in self.proc.stdout:
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                reply = None
+            if not isinstance(reply, dict):
+                self.violated = True
+                continue
+            if reply.get("ready") and not self.ready.is_set():
+                self.forks = bool(reply.get("fork"))
+                self.ready.set()
+            else:
+                self._replies.put(reply)
+        self._replies.put(None)  # EOF: the worker died
+
+    def wait_ready(self, timeout: float = START_TIMEOUT) -> bool:
+        return self.ready.wait(timeout)
+
+    def run(
+        self,
+        code: str,
+        timeout: float,
+        cpu: float,
+        memory: int,
+        limit: int,
+        on_output: OutputCallback,
+    ) -> Dict:
+        """
+        Run one snippet, passing each output chunk to on_output(stream, text).
+
+        Returns:
+            The worker's final reply, or {"status": "timeout"|"cpu_limit"|
+            "crashed", "exit_code"} when there is none
+        """
+        self.runs += 1
+        run_id = self.runs
+        request = {"id": run_id, "code": code, "cpu": cpu, "memory": memory, "limit": limit}
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".py") as f:
-                file_path = f.name
-                f.write(code.encode())
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+        except OSError:
+            return {"status": "crashed", "exit_code": self.proc.poll()}
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                reply = self._replies.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.kill()
+                return {"status": "timeout", "exit_code": None}
 
-            result = subprocess.run(
-                ["python", file_path],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            if reply is None:
+                code = self.proc.wait()
+                status = "cpu_limit" if code == -getattr(signal, "SIGXCPU", 0) else "crashed"
+                return {"status": status, "exit_code": code}
+            if reply.get("id") != run_id:
+                # Left over from an earlier run, or forged: drop it
+                self.violated = True
+                continue
+            if "stream" not in reply:
+                if "status" not in reply:
+                    self.violated = True
+                    reply = {"status": "crashed", "exit_code": None}
+                return reply
+            on_output(reply["stream"], str(reply.get("data", "")))
 
-            os.remove(file_path)
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    @property
+    def reusable(self) -> bool:
+        """Whether another run may use this worker (see WorkerPool.run)."""
+        return self.alive and self.forks and not self.violated
+
+    def kill(self) -> None:
+        if self.alive:
+            try:
+                if hasattr(os, "killpg"):
+                    os.killpg(self.proc.pid, signal.SIGKILL)
+                else:
+                    self.proc.kill()
+            except OSError:
+                pass
+        try:
+            self.proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            pass
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+
+class WorkerPool:
+    """A fixed number of warm workers; runs wait for a free one."""
+
+    def __init__(self, size: int = POOL_SIZE, max_runs: int = MAX_RUNS):
+        self.size = size
+        self.max_runs = max_runs
+        self._idle: "queue.Queue[Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> "WorkerPool":
+        """Spawn the workers (returns at once; they warm up in the background)."""
+        with self._lock:
+            if not self._started:
+                self._started = True
+                for _ in range(self.size):
+                    self._spawn()
+        return self
+
+    def _spawn(self) -> None:
+        try:
+            self._idle.put(Worker())
+        except OSError as e:
+            print(f"Code worker start error: {e}")
 
-            if result.stderr:
-                return f"Error:\n{result.stderr.strip()}"
+    def _replace(self, worker: Worker) -> None:
+        worker.kill()
+        threading.Thread(target=self._spawn, name="huzenix-code-spawn", daemon=True).start()
 
-            return result.stdout.strip() or "Code ran successfully with no output."
+    def run(
+        self,
+        code: str,
+        timeout: float = TIMEOUT,
+        cpu: float = CPU_SECONDS,
+        memory: int = MEMORY_BYTES,
+        limit: int = OUTPUT_LIMIT,
+        on_output: OutputCallback = None,
+    ) -> Dict:
+        """
+        Run a snippet on a warm worker.
 
+        Args:
+            code: Python source
+            timeout: Wall-clock seconds before the worker is killed
+            cpu: CPU seconds allowed
+            memory: Extra address space allowed, in bytes
+            limit: Bytes of stdout/stderr kept each (head and tail)
+            on_output: Called as on_output(stream, text) while the snippet
+                       runs, for the head of each stream
+
+        Returns:
+            {"status": ok|error|memory|timeout|cpu_limit|crashed, "exit_code",
+             "stdout", "stderr", "omitted": {stream: bytes left out},
+             "seconds", "first_output", "warm"}
+        """
+        self.start()
+        started = time.perf_counter()
+        head = {"stdout": [], "stderr": []}
+        received = {"stdout": 0, "stderr": 0}
+        first_output = None
+
+        def collect(stream: str, text: str) -> None:
+            nonlocal first_output
+            # The worker caps its streams; this only guards against one
+            # that writes to the protocol pipe directly
+            if stream not in head or received[stream] >= limit:
+                return
+            received[stream] += len(text)
+            head[stream].append(text)
+            if first_output is None:
+                first_output = time.perf_counter() - started
+            if on_output:
+                on_output(stream, text)
+
+        worker = self._idle.get()
+        warm = worker.ready.is_set()
+        if worker.wait_ready():
+            reply = worker.run(code, timeout, cpu, memory, limit, collect)
+        else:
+            reply = {"status": "crashed", "exit_code": None}
+            warm = False
+        if reply["status"] == "timeout" or not worker.reusable or worker.runs >= self.max_runs:
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+
+        omitted = reply.get("omitted") or {}
+        result = {"status": reply["status"], "exit_code": reply["exit_code"], "omitted": {}}
+        for stream in ("stdout", "stderr"):
+            text = "".join(head[stream])
+            tail = reply.get(f"{stream}_tail", "")
+            left_out = omitted.get(stream, 0)
+            if left_out:
+                text += f"\n... [{left_out} bytes left out] ...\n"
+            result[stream] = text + tail
+            result["omitted"][stream] = left_out
+
+        result["seconds"] = time.perf_counter() - started
+        result["first_output"] = first_output
+        result["warm"] = warm
+        RUN_LATENCY.observe(result["seconds"], worker="warm" if warm else "cold")
+        RUNS.inc(outcome=result["status"])
+        return result
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+
+class _EarlySpeech:
+    """
+    Speaks stdout of a long-running snippet line by line as it arrives.
+
+    Output of the first SPEAK_AFTER seconds is held back, so a quick snippet
+    is still answered with one reply; a timer speaks the held lines when the
+    snippet is still running by then.
+    """
+
+    def __init__(self, delay: float = SPEAK_AFTER):
+        self._held = ""
+        self._spoken = 0
+        self._live = False
+        self._stopped = False
+        self._lock = threading.Lock()
+        # Speak in the caller's context, so headless capture still applies
+        context = contextvars.copy_context()
+        self._timer = threading.Timer(delay, context.run, (self._go_live,))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def feed(self, stream: str, text: str) -> None:
+        if stream != "stdout":
+            return
+        with self._lock:
+            self._held += text
+            if self._live:
+                self._speak_lines()
+
+    def _go_live(self) -> None:
+        with self._lock:
+            if not self._stopped:
+                self._live = True
+                self._speak_lines()
+
+    def _speak_lines(self) -> None:
+        # Only whole lines; a partial one waits for its newline or the end
+        cut = self._held.rfind("\n") + 1
+        if cut and self._held[:cut].strip():
+            speak_async(self._held[:cut].strip())
+        self._spoken += cut
+        self._held = self._held[cut:]
+
+    def stop(self) -> int:
+        """Stop speaking; returns how many characters of stdout were spoken."""
+        self._timer.cancel()
+        with self._lock:
+            self._live = False
+            self._stopped = True
+            return self._spoken
+
+
+class CodeRunner:
+
+    def __init__(self, pool: WorkerPool = None):
+        # Workers warm up in the background from startup on
+        self.pool = (pool or WorkerPool()).start()
+
+    def run(self, code: str, on_output: OutputCallback = None) -> Dict:
+        """Run a snippet; see WorkerPool.run for the result."""
+        return self.pool.run(code, on_output=on_output)
+
+    def run_python(self, code: str) -> str:
+        speech = _EarlySpeech()
+        try:
+            result = self.run(code, on_output=speech.feed)
         except Exception as e:
+            speech.stop()
             return f"Execution failed: {str(e)}"
+        spoken = speech.stop()
+
+        status = result["status"]
+        if status == "timeout":
+            return f"Execution failed: timed out after {TIMEOUT} seconds."
+        if status == "cpu_limit":
+            return f"Execution failed: CPU limit of {CPU_SECONDS} seconds exceeded."
+        if status == "crashed":
+            return "Execution failed: the interpreter crashed."
+
+        if result["stderr"]:
+            return f"Error:\n{result['stderr'].strip()}"
+
+        rest = result["stdout"][spoken:].strip()
+        if spoken:
+            return rest
+        return rest or "Code ran successfully with no output."
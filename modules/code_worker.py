@@ -0,0 +1,303 @@
+"""
+Warm worker for CodeRunner (run as `python -I code_worker.py`).
+
+Imports the common modules once, then runs snippets sent by the parent one
+at a time. Requests and replies are JSON lines on stdin/stdout, each tagged
+with the run id of the request. While a snippet runs, its output is
+forwarded as {"stream": "stdout"|"stderr", "data": ...} messages line by
+line, up to the head of the byte cap; past that only a tail is kept, and it
+is sent with the final reply together with the number of bytes left out.
+
+Where the OS has fork(), every snippet runs in a forked child of the worker,
+so it starts from the warm imports but can't leave state behind (patched
+builtins, modules, threads) and can't reach the protocol pipes: the child
+talks to the worker over a private pipe, stdin/stdout point at /dev/null,
+and the worker alone writes replies. Per-run CPU and address-space limits
+are set in the child; exceeding the CPU limit kills only the child.
+Without fork() snippets run in the worker itself, which says so in its
+ready message so the parent replaces it after every run.
+"""
+
+import builtins
+import contextlib
+import io
+import json
+import os
+import signal
+import sys
+import time
+import traceback
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+PRELOAD = (
+    "math", "random", "statistics", "json", "re", "datetime", "itertools",
+    "collections", "functools", "string", "decimal", "fractions", "heapq", "bisect",
+)
+FILE_SIZE_LIMIT = 16 * 1024 * 1024  # largest file a snippet may write
+OUTPUT_LIMIT = 16 * 1024            # bytes of each stream kept per run
+TAIL_SHARE = 4                      # 1/4 of the cap is kept as the tail
+CHUNK = 4096                        # partial lines are forwarded at this size
+REPLY_FIELDS = ("status", "exit_code", "stdout_tail", "stderr_tail", "omitted", "seconds")
+
+
+def _vm_bytes() -> int:
+    """Current address-space size (Linux), 0 if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _set_limits(cpu: float, memory: int, final: bool = False) -> None:
+    """
+    Soft CPU/address-space limits for one run. With final (a forked child
+    that exits afterwards) the hard limits are lowered too, so the snippet
+    can't raise them again; the CPU hard limit is a second above the soft
+    one so SIGXCPU still comes first.
+    """
+    if resource is None:
+        return
+    if cpu:
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        soft = int(_cpu_seconds() + cpu) + 1
+        if hard == resource.RLIM_INFINITY or soft <= hard:
+            if final:
+                hard = soft + 1 if hard == resource.RLIM_INFINITY else min(soft + 1, hard)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    vm = _vm_bytes()
+    if memory and vm:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        soft = vm + memory
+        if hard == resource.RLIM_INFINITY or soft <= hard:
+            resource.setrlimit(resource.RLIMIT_AS, (soft, soft if final else hard))
+
+
+def _clear_limits() -> None:
+    """Undo _set_limits() in a worker that runs snippets itself (no fork)."""
+    if resource is None:
+        return
+    for limit in (resource.RLIMIT_CPU, resource.RLIMIT_AS):
+        _, hard = resource.getrlimit(limit)
+        resource.setrlimit(limit, (hard, hard))
+
+
+class CappedStream(io.TextIOBase):
+    """
+    Text stream that forwards whole lines to the parent as they are written.
+
+    The first limit - limit // TAIL_SHARE bytes are forwarded; after that
+    only the last limit // TAIL_SHARE bytes are kept (see tail()).
+    """
+
+    def __init__(self, name: str, send, limit: int = OUTPUT_LIMIT):
+        self.name = name
+        self._send = send
+        self._tail_limit = limit // TAIL_SHARE
+        self._head_left = limit - self._tail_limit
+        self._pending = ""
+        self._tail = []
+        self._tail_chars = 0
+        self.omitted = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if not isinstance(s, str):
+            raise TypeError(f"write() argument must be str, not {type(s).__name__}")
+        if self._head_left > 0:
+            self._pending += s
+            if "\n" in s or len(self._pending) >= CHUNK:
+                self.flush()
+        else:
+            # Cheap append; trimmed to the byte limit only now and then
+            self._tail.append(s)
+            self._tail_chars += len(s)
+            if self._tail_chars >= 2 * self._tail_limit:
+                self._trim_tail()
+        return len(s)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        data = self._pending.encode("utf-8", "replace")
+        self._pending = ""
+        if len(data) > self._head_left:
+            self._tail.append(data[self._head_left:].decode("utf-8", "ignore"))
+            data = data[:self._head_left]
+        self._head_left -= len(data)
+        self._send({"stream": self.name, "data": data.decode("utf-8", "ignore")})
+
+    def _trim_tail(self) -> None:
+        data = "".join(self._tail).encode("utf-8", "replace")
+        kept = data[-self._tail_limit:].decode("utf-8", "ignore") if self._tail_limit else ""
+        self.omitted += len(data) - len(kept.encode("utf-8"))
+        self._tail = [kept]
+        self._tail_chars = len(kept)
+
+    def tail(self) -> str:
+        """The last limit // TAIL_SHARE bytes past the head."""
+        self._trim_tail()
+        return self._tail.pop()
+
+
+def run(code: str, cpu: float, memory: int, send, limit: int = OUTPUT_LIMIT, final: bool = False) -> dict:
+    """
+    Run one snippet. final means this process exits afterwards (forked
+    child): its limits are made hard and never cleared.
+    """
+    out, err = CappedStream("stdout", send, limit), CappedStream("stderr", send, limit)
+    namespace = {"__name__": "__main__", "__builtins__": builtins}
+    status, exit_code = "ok", 0
+    started = time.perf_counter()
+
+    try:
+        compiled = compile(code, "<snippet>", "exec")
+    except SyntaxError:
+        err.write(traceback.format_exc(limit=0))
+        err.flush()
+        return _reply("error", 1, out, err, 0.0)
+
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        _set_limits(cpu, memory, final)
+        try:
+            exec(compiled, namespace)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            status = "ok" if exit_code == 0 else "error"
+        except MemoryError:
+            status, exit_code = "memory", 1
+            err.write("MemoryError: memory limit exceeded\n")
+        except BaseException:
+            status, exit_code = "error", 1
+            # Drop this file's frame from the traceback
+            etype, value, tb = sys.exc_info()
+            err.write("".join(traceback.format_exception(etype, value, tb.tb_next)))
+        finally:
+            if not final:
+                _clear_limits()
+            out.flush()
+            err.flush()
+
+    return _reply(status, exit_code, out, err, time.perf_counter() - started)
+
+
+def _reply(status: str, exit_code: int, out: CappedStream, err: CappedStream, seconds: float) -> dict:
+    return {
+        "status": status,
+        "exit_code": exit_code,
+        "stdout_tail": out.tail(),
+        "stderr_tail": err.tail(),
+        "omitted": {"stdout": out.omitted, "stderr": err.omitted},
+        "seconds": seconds,
+    }
+
+
+def _run_request(request: dict, send, final: bool = False) -> dict:
+    return run(
+        request["code"],
+        request.get("cpu", 0),
+        request.get("memory", 0),
+        send,
+        request.get("limit", OUTPUT_LIMIT),
+        final,
+    )
+
+
+def _child(request: dict, write_fd: int) -> None:
+    """Forked child: run one snippet, reporting over write_fd only."""
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    sys.stdin = open(os.devnull, "r")  # drop request lines buffered by the worker
+    pipe = os.fdopen(write_fd, "w", encoding="utf-8")
+
+    def send(message: dict) -> None:
+        pipe.write(json.dumps(message) + "\n")
+        pipe.flush()
+
+    send({"result": _run_request(request, send, final=True)})
+
+
+def _run_forked(request: dict, send) -> dict:
+    """Run a snippet in a forked child; returns the final reply (without id)."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.close(read_fd)
+            _child(request, write_fd)
+            code = 0
+        finally:
+            os._exit(code)  # no atexit handlers or threads of the snippet
+    os.close(write_fd)
+
+    result = None
+    with os.fdopen(read_fd, "r", encoding="utf-8", errors="replace") as pipe:
+        for line in pipe:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(message, dict):
+                continue
+            if isinstance(message.get("result"), dict):
+                result = message["result"]
+            elif message.get("stream") in ("stdout", "stderr"):
+                send({"stream": message["stream"], "data": str(message.get("data", ""))})
+
+    _, wait_status, usage = os.wait4(pid, 0)
+    if result is None:
+        exit_code = os.waitstatus_to_exitcode(wait_status)
+        cpu_signal = getattr(signal, "SIGXCPU", None)
+        cpu = request.get("cpu", 0)
+        # SIGKILL past the CPU budget is the hard limit (SIGXCPU was ignored)
+        over_cpu = exit_code == -signal.SIGKILL and cpu and usage.ru_utime + usage.ru_stime >= cpu
+        status = "cpu_limit" if (cpu_signal and exit_code == -cpu_signal) or over_cpu else "crashed"
+        return {"status": status, "exit_code": exit_code}
+    # Only the fields the parent knows, whatever the child sent
+    return {key: result[key] for key in REPLY_FIELDS if key in result}
+
+
+def main() -> None:
+    for name in PRELOAD:
+        __import__(name)
+    if resource is not None:
+        resource.setrlimit(resource.RLIMIT_FSIZE, (FILE_SIZE_LIMIT, FILE_SIZE_LIMIT))
+
+    # Snippets must not read requests or write replies
+    requests, replies = sys.stdin, sys.stdout
+    sys.stdin = open(os.devnull, "r")
+    forks = hasattr(os, "fork")
+
+    def send(message: dict) -> None:
+        replies.write(json.dumps(message) + "\n")
+        replies.flush()
+
+    send({"ready": True, "fork": forks})
+    for line in requests:
+        request = json.loads(line)
+        run_id = request.get("id")
+
+        def send_tagged(message: dict) -> None:
+            send(dict(message, id=run_id))
+
+        if forks:
+            send_tagged(_run_forked(request, send_tagged))
+        else:
+            send_tagged(_run_request(request, send_tagged))
+
+
+if __name__ == "__main__":
+    main()
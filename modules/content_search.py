@@ -0,0 +1,375 @@
+"""
+Content search for Huzenix.
+Finds the files that contain a phrase ("kaunsi file mein 'invoice 2024'
+likha hai").
+
+Each file is sniffed for binary content, memory-mapped and scanned in
+chunks. Matching ignores case and lets the words be separated by spaces,
+underscores or dashes within a line (or nothing: "invoice2024"). ASCII
+phrases are matched on the raw bytes (lower() only folds ASCII there, which
+is all they need); phrases with other letters ("über") are matched on
+UTF-8-decoded text with re.IGNORECASE, which is slower but folds "Über".
+Scanning is CPU-bound, so large searches run on a pool of worker
+processes (threads would take turns on the GIL); small ones, and all of
+them on a single CPU, run inline. The search stops once `limit` files
+have matched, and those are ranked by how often the phrase occurs, with a
+bonus when the file name matches too.
+
+    python -m modules.content_search --mb 256      # throughput benchmark
+"""
+
+import argparse
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core import metrics
+from core.fuzzy import normalize
+
+CHUNK = 4 * 1024 * 1024   # bytes scanned per step
+SNIFF = 8192              # leading bytes checked for NUL (binary)
+MAX_GAP = 8               # separator run allowed between words
+MAX_RESULTS = 10          # matching files before the search stops
+SNIPPETS = 2              # line snippets kept per file
+HIT_CAP = 1000            # occurrences counted per file
+SNIPPET_CHARS = 120
+BATCH_FILES = 64          # files per worker task
+INLINE_FILES = 256        # searches over fewer files skip the pool
+MAX_WORKERS = 4
+NAME_BONUS = 5            # score added when the file name contains the phrase
+
+SEARCH_LATENCY = metrics.histogram("huzenix_content_search_seconds", "Content search latency")
+SCANNED = metrics.counter("huzenix_content_search_bytes_total", "Bytes scanned by content search")
+
+
+def query_words(phrase: str) -> Tuple[str, ...]:
+    return tuple(re.findall(r"[^\W_]+", phrase.lower()))
+
+
+@lru_cache(maxsize=64)
+def _pattern(words: Tuple[str, ...]) -> "re.Pattern":
+    gap = rb"[ \t_\-]{0,%d}" % MAX_GAP
+    return re.compile(gap.join(re.escape(w.encode("utf-8")) for w in words))
+
+
+@lru_cache(maxsize=64)
+def _text_pattern(words: Tuple[str, ...]) -> "re.Pattern":
+    gap = r"[ \t_\-]{0,%d}" % MAX_GAP
+    return re.compile(gap.join(re.escape(w) for w in words), re.IGNORECASE)
+
+
+def _find_bytes(mm: mmap.mmap, size: int, words: Tuple[str, ...], overlap: int) -> Iterator[Tuple[int, int]]:
+    """(start, end) byte offsets of matches of an ASCII phrase."""
+    pattern, anchor = _pattern(words), words[0].encode("utf-8")
+    offset = 0
+    while offset < size:
+        # Matches may start in this chunk and run into the overlap
+        chunk = mm[offset: offset + CHUNK + overlap].lower()
+        limit = min(CHUNK, len(chunk))
+        pos = chunk.find(anchor)
+        while 0 <= pos < limit:
+            match = pattern.match(chunk, pos)
+            if match:
+                yield offset + pos, offset + match.end()
+                pos = chunk.find(anchor, match.end())
+            else:
+                pos = chunk.find(anchor, pos + 1)
+        offset += CHUNK
+
+
+def _find_text(mm: mmap.mmap, size: int, words: Tuple[str, ...], overlap: int) -> Iterator[Tuple[int, int]]:
+    """(start, end) byte offsets of matches of a non-ASCII phrase, Unicode case-folded."""
+    pattern = _text_pattern(words)
+    offset = 0
+    while offset < size:
+        # surrogateescape keeps undecodable bytes (and split characters at
+        # the chunk edges) one-to-one, so offsets map back exactly
+        text = mm[offset: offset + CHUNK + overlap].decode("utf-8", "surrogateescape")
+        chars, position = 0, offset  # text[:chars] is bytes offset..position
+        for match in pattern.finditer(text):
+            start = position + len(text[chars: match.start()].encode("utf-8", "surrogateescape"))
+            if start - offset >= CHUNK:
+                break
+            end = start + len(match.group().encode("utf-8", "surrogateescape"))
+            yield start, end
+            chars, position = match.end(), end
+        offset += CHUNK
+
+
+def _count_lines(mm: mmap.mmap, start: int, end: int) -> int:
+    """Newlines in mm[start:end], counted a chunk at a time."""
+    return sum(mm[i: min(end, i + CHUNK)].count(b"\n") for i in range(start, end, CHUNK))
+
+
+def _snippet(mm: mmap.mmap, start: int, end: int) -> str:
+    line_start = mm.rfind(b"\n", max(0, start - SNIPPET_CHARS), start) + 1
+    line_end = mm.find(b"\n", end, end + SNIPPET_CHARS)
+    if line_end == -1:
+        line_end = min(len(mm), end + SNIPPET_CHARS)
+    text = mm[max(line_start, start - SNIPPET_CHARS // 2): line_end].decode("utf-8", "replace")
+    return " ".join(text.split())[:SNIPPET_CHARS]
+
+
+def scan_file(path: str, words: Tuple[str, ...]) -> Tuple[Optional[Dict], int]:
+    """
+    Search one file.
+
+    Args:
+        path: File to scan
+        words: Lowercased query words (query_words())
+
+    Returns:
+        ({"path", "hits", "snippets": [(line number, text)]} or None, bytes scanned)
+    """
+    try:
+        with open(path, "rb") as f:
+            if b"\0" in f.read(SNIFF):
+                return None, 0
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return None, 0
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None, 0
+
+    # Upper case may take more bytes than lower case outside ASCII
+    overlap = 2 * sum(len(w.encode("utf-8")) for w in words) + MAX_GAP * len(words)
+    find = _find_bytes if all(w.isascii() for w in words) else _find_text
+    hits, snippets = 0, []
+    line, counted = 1, 0  # newlines counted up to offset `counted`
+    with mm:
+        for start, end in find(mm, size, words, overlap):
+            hits += 1
+            if len(snippets) < SNIPPETS:
+                line += _count_lines(mm, counted, start)
+                counted = start
+                snippets.append((line, _snippet(mm, start, end)))
+            if hits >= HIT_CAP:
+                break
+    if not hits:
+        return None, size
+    return {"path": path, "hits": hits, "snippets": snippets}, size
+
+
+def _scan_batch(paths: List[str], words: Tuple[str, ...]) -> Tuple[List[Dict], int, int]:
+    """Worker task: (matches, files scanned, bytes scanned)."""
+    found, scanned = [], 0
+    for path in paths:
+        match, size = scan_file(path, words)
+        scanned += size
+        if match:
+            found.append(match)
+    return found, len(paths), scanned
+
+
+class ContentSearcher:
+    """Runs content searches, on worker processes when they are big enough."""
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Args:
+            workers: Worker processes (default: CPUs, at most MAX_WORKERS,
+                     none on a single CPU; 0 searches inline only)
+        """
+        if workers is None:
+            cpus = os.cpu_count() or 1
+            workers = min(MAX_WORKERS, cpus) if cpus > 1 else 0
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # The app is multi-threaded: don't fork it
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._pool
+
+    def search(self, paths: Iterable[str], phrase: str, limit: int = MAX_RESULTS) -> Dict:
+        """
+        Find files containing phrase.
+
+        Args:
+            paths: Files to search, in the order they should be tried
+            phrase: Text to look for
+            limit: Stop after this many files matched
+
+        Returns:
+            {"matches": [{"path", "hits", "snippets", "score"}] best first,
+             "complete": False if the search stopped early,
+             "files", "bytes", "seconds"}
+        """
+        words = query_words(phrase)
+        started = time.perf_counter()
+        paths = iter(paths)
+        found: List[Dict] = []
+        files = scanned = 0
+
+        head = list(itertools.islice(paths, INLINE_FILES))
+        more = len(head) == INLINE_FILES
+        if words and (not more or not self.workers):
+            for path in itertools.chain(head, paths):
+                match, size = scan_file(path, words)
+                files += 1
+                scanned += size
+                if match:
+                    found.append(match)
+                    if len(found) >= limit:
+                        break
+        elif words:
+            found, files, scanned = self._search_pool(head, paths, words, limit)
+
+        complete = len(found) < limit
+        name_key = normalize(phrase)
+        for match in found:
+            named = name_key and name_key in normalize(os.path.basename(match["path"]))
+            match["score"] = min(match["hits"], HIT_CAP) + (NAME_BONUS if named else 0)
+        found.sort(key=lambda m: -m["score"])
+
+        elapsed = time.perf_counter() - started
+        SEARCH_LATENCY.observe(elapsed)
+        SCANNED.inc(scanned)
+        return {
+            "matches": found[:limit],
+            "complete": complete,
+            "files": files,
+            "bytes": scanned,
+            "seconds": elapsed,
+        }
+
+    def _search_pool(self, head: List[str], rest: Iterable[str], words, limit: int):
+        pool = self._executor()
+        batches = _batches(head, rest)
+        pending = set()
+        found: List[Dict] = []
+        files = scanned = 0
+
+        def submit() -> None:
+            # Only a few batches in flight, so stopping early wastes little
+            while len(pending) < 2 * self.workers:
+                batch = next(batches, None)
+                if batch is None:
+                    return
+                pending.add(pool.submit(_scan_batch, batch, words))
+
+        submit()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                matches, count, size = future.result()
+                found.extend(matches)
+                files += count
+                scanned += size
+            if len(found) >= limit:
+                for future in pending:
+                    future.cancel()
+                break
+            submit()
+        return found, files, scanned
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+def _batches(head: List[str], rest: Iterable[str]):
+    for i in range(0, len(head), BATCH_FILES):
+        yield head[i:i + BATCH_FILES]
+    rest = iter(rest)
+    while True:
+        batch = list(itertools.islice(rest, BATCH_FILES))
+        if not batch:
+            return
+        yield batch
+
+
+def walk_files(root) -> Iterable[str]:
+    """Every file below root, skipping dot-directories (used without a PathIndex)."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            yield os.path.join(dirpath, name)
+
+
+# ---------- BENCHMARK ---------- #
+
+def _make_tree(root: Path, megabytes: int, file_kb: int, phrase: str, planted: int) -> List[str]:
+    rng = random.Random(42)
+    vocab = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+        for _ in range(5000)
+    ]
+    paths = []
+    count = megabytes * 1024 // file_kb
+    lines = (" ".join(rng.choice(vocab) for _ in range(12)) for _ in range(2000))
+    block = "\n".join(lines).encode("ascii")
+    for i in range(count):
+        folder = root / f"dir{i % 50}"
+        folder.mkdir(exist_ok=True)
+        path = folder / (f"blob{i}.bin" if i % 20 == 0 else f"doc{i}.txt")
+        if i % 20 == 0:
+            data = os.urandom(1024) + b"\0" * (file_kb * 1024 - 1024)
+        else:
+            offset = rng.randrange(len(block) // 2)
+            data = (block[offset:] + block)[: file_kb * 1024]
+            if i % max(1, count // planted) == 1:
+                data = data[:512] + f"\n{phrase}\n".encode("ascii") + data[512:]
+        path.write_bytes(data)
+        paths.append(str(path))
+    return paths
+
+
+def benchmark(megabytes: int = 256, file_kb: int = 256, workers: Optional[int] = None) -> Dict:
+    """Search a synthetic tree (5% binaries) and report MB/s, inline and pooled."""
+    root = Path(tempfile.mkdtemp(prefix="huzenix-search-"))
+    phrase = "Invoice 2024"
+    try:
+        paths = _make_tree(root, megabytes, file_kb, phrase, planted=20)
+        report = {"files": len(paths), "megabytes": megabytes}
+        runs = {"inline": ContentSearcher(workers=0), "pool": ContentSearcher(workers=workers)}
+        for name, searcher in runs.items():
+            searcher.search(paths[:INLINE_FILES + 1], phrase, limit=1)  # warm the pool and page cache
+            result = searcher.search(paths, phrase, limit=len(paths))
+            early = searcher.search(paths, "invoice_2024", limit=3)
+            searcher.close()
+            report[name] = {
+                "workers": searcher.workers,
+                "full_scan_seconds": round(result["seconds"], 3),
+                "mb_per_sec": round(result["bytes"] / 2**20 / result["seconds"], 1),
+                "matches": len(result["matches"]),
+                "early_stop_seconds": round(early["seconds"], 3),
+                "early_stop_files": early["files"],
+            }
+        return report
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Huzenix content search")
+    parser.add_argument("--mb", type=int, default=256, help="size of the synthetic tree")
+    parser.add_argument("--file-kb", type=int, default=256, help="size of each file")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.mb, args.file_kb, args.workers), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,136 @@
 """
 File manager module for Huzenix.
 Handles file creation, deletion, reading, and listing.
+
+Spoken file names are looked up in a PathIndex (modules/path_index.py) of
+the tree below base_dir when they don't name an existing path as heard, so
+"read file report final dot txt" finds docs/report_final.txt. Deleting and
+renaming run straight away only for a name that exists as said (extension
+included); otherwise they follow an exact index match, and only after the
+user confirms the path it resolved to.
+
+"kaunsi file mein 'invoice 2024' likha hai" searches file contents
+(modules/content_search.py), most recently changed files first.
+
+"saari .log files delete karo", "move all pdfs to archive" and "rename
+all .jpeg files to .jpg" run as bulk operations (modules/bulk_files.py):
+the plan is spoken first and only runs once the user says yes.
+
+Files are read through modules/file_reader.py a page at a time ("next"
+for more), or as "read file app.log last 20 lines", "... lines with
+timeout" and "... summary".
 """
 
+import re
 from pathlib import Path
-from typing import List, Optional
-
-from core.voice_output import speak
+from typing import List, Optional, Tuple
+
+from core import paging, security
+from core.llm_client import ask_llm
+from core.voice_output import speak, speak_async
+from modules.bulk_files import BulkError, BulkPlan, select
+from modules.content_search import ContentSearcher, walk_files
+from modules.file_reader import MAX_LINES, BinaryFileError, FilePager, TextFile, summarize
+from modules.path_index import PathIndex
+
+INDEX_WAIT = 2.0  # seconds a lookup waits for the first index scan
+EXT_WORDS = {
+    "python": "py", "text": "txt", "markdown": "md", "word": "docx",
+    "excel": "xlsx", "powerpoint": "pptx", "image": "png", "photo": "jpg",
+}
+RECENT_WORDS = ("recent", "latest", "newest", "new", "naye", "nayi")
+DEFAULT_LINES = 10
+SUMMARY_NOTICE_PAGES = 10  # files this long get a "this may take a moment"
+READ_MODES = (
+    ("head", r"\s+(?:first|top|head|pehli|shuru ki)\s+(?P<n>\d+)?\s*lines?$"),
+    ("tail", r"\s+(?:last|tail|end|aakhri|akhri)\s+(?P<n>\d+)?\s*lines?$"),
+    ("grep", r"\s+(?:lines?\s+(?:with|containing|matching)|grep(?:\s+for)?)\s+(?P<q>.+)$"),
+    ("summary", r"\s+(?:summary|summarize|summarise|short mein)$"),
+)
+BULK_WORDS = ("all", "saari", "saare", "sab", "sabhi", "every")
+BULK_VERBS = (
+    ("delete", r"\b(?:delete|remove|hatao|mitao)\b"),
+    ("move", r"\b(?:move|shift)\b"),
+    ("copy", r"\bcopy\b"),
+    ("rename", r"\brename\b"),
+)
+BULK_TARGETS = (
+    r"\b(?:to|into)\s+(?:the\s+)?(?P<t>[^\s]+?)(?:\s+(?:folder|directory))?\s*$",
+    r"\s(?P<t>[^\s]+)\s+(?:folder\s+)?(?:mein|me|main)\s+(?:move|shift|copy|rename)\b",
+)
+DRY_RUN_WORDS = ("dry run", "preview", "sirf dikhao", "just show")
+SEARCH_PATTERNS = (
+    r"kaunsi files? (?:mein|me|main) (?P<q>.+?) (?:likha|likhi|likhe)\b",
+    r"which files? (?:contains?|has|have|mentions?) (?P<q>.+)",
+    r"(?:search|find)(?: in)? files? (?:for|containing|with) (?P<q>.+)",
+    r"(?:search|find) (?:text|content) (?P<q>.+)",
+)
 
 
 class FileManager:
     """Manages file operations."""
 
-    def __init__(self, base_dir: str = "."):
+    def __init__(self, base_dir: str = ".", index: bool = True):
         """
         Initialize file manager.
 
         Args:
             base_dir: Base directory for operations (default: current)
+            index: Keep a PathIndex of base_dir for spoken-name lookups
         """
         self.base_dir = Path(base_dir)
+        self.index = PathIndex(self.base_dir).start() if index else None
+        self.searcher = ContentSearcher()
+
+    def _index_ready(self) -> bool:
+        return self.index is not None and self.index.wait_ready(INDEX_WAIT)
+
+    def _literal(self, filename: str) -> Optional[Path]:
+        """The file named exactly as said (extension included), if it exists."""
+        filepath = self.base_dir / filename
+        return filepath if filepath.is_file() else None
+
+    def _resolve(self, filename: str, exact: bool = False) -> Optional[Path]:
+        """
+        Path for a (possibly misheard) file name.
+
+        Args:
+            filename: Cleaned name as spoken
+            exact: Only accept an unambiguous exact index match (delete, rename);
+                   callers confirm it unless _literal() finds the file
+
+        Returns:
+            Existing path, or None (after saying why when it is ambiguous)
+        """
+        filepath = self.base_dir / filename
+        if filepath.exists() or not self._index_ready():
+            return filepath if filepath.exists() else None
+
+        matches = self.index.resolve(filename)
+        if not matches:
+            return None
+        if not exact:
+            return matches[0]["path"]
+
+        exact_matches = [m for m in matches if m["score"] == 1.0]
+        if len(exact_matches) > 1:
+            names = ", ".join(m["relative"] for m in exact_matches)
+            stems = {m["relative"].rsplit(".", 1)[0].lower() for m in exact_matches}
+            missing = "the extension" if len(stems) == 1 else "the folder"
+            speak(f"Several files match {filename}: {names}. Please say {missing} too.")
+            return None
+        return exact_matches[0]["path"] if exact_matches else None
+
+    def _refresh(self, *paths: Path) -> None:
+        if self.index is not None:
+            for path in paths:
+                self.index.refresh(path)
+
+    def _display(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            return str(path)
 
     def _clean_filename(self, name: str) -> str:
         """
@@ -60,6 +171,7 @@ class FileManager:
             filepath = self.base_dir / filename
             filepath.parent.mkdir(parents=True, exist_ok=True)
             filepath.touch()
+            self._refresh(filepath)
             speak(f"File {filename} created.")
             return True
 
@@ -84,10 +196,14 @@ class FileManager:
             return False
 
         try:
-            filepath = self.base_dir / filename
-            if filepath.exists():
-                filepath.unlink()
-                speak(f"File {filename} deleted.")
+            filepath = self._literal(filename)
+            if filepath is not None:
+                speak(self._delete(filepath))
+                return True
+            filepath = self._resolve(filename, exact=True)
+            if filepath is not None:
+                question = f"Did you mean {self._display(filepath)}? Say 'yes' to delete it."
+                speak(security.ask_confirmation(question, lambda: self._delete(filepath)))
                 return True
             else:
                 speak("File not found.")
@@ -98,13 +214,45 @@ class FileManager:
             print(f"Delete file error: {e}")
             return False
 
-    def list_files(self) -> bool:
+    def _delete(self, filepath: Path) -> str:
+        try:
+            filepath.unlink()
+        except Exception as e:
+            print(f"Delete file error: {e}")
+            return f"Error deleting file: {e}"
+        self._refresh(filepath)
+        return f"File {self._display(filepath)} deleted."
+
+    def list_files(self, ext: Optional[str] = None, recent: bool = False) -> bool:
         """
-        List files in base directory.
+        List files, newest first.
+
+        Args:
+            ext: Only files with this extension, anywhere below base_dir
+            recent: Recently changed files anywhere below base_dir
+
+        Without either, the files directly in base_dir are listed. Long
+        listings are spoken a page at a time.
 
         Returns:
             True if successful, False otherwise
         """
+        if self._index_ready():
+            directory = None if ext or recent else ""
+            total, paths = self.index.files(ext=ext, directory=directory)
+            if not total:
+                speak(f"No {ext} files found." if ext else "No files found in the current directory.")
+                return False
+            files = f"{total} {ext + ' ' if ext else ''}file{'' if total == 1 else 's'}"
+            if recent:
+                heading = f"{files}, most recently changed first"
+            elif ext:
+                heading = f"{files}, newest first"
+            else:
+                heading = f"{files} in directory, newest first"
+            speak(paging.answer(paging.Pager(paths, total, heading)))
+            return True
+
         try:
             files = [f.name for f in self.base_dir.iterdir() if f.is_file()]
 
@@ -120,12 +268,17 @@ class FileManager:
             print(f"List files error: {e}")
             return False
 
-    def read_file(self, filename: str) -> bool:
+    def read_file(self, filename: str, mode: str = "pages", lines: int = DEFAULT_LINES, pattern: str = "") -> bool:
         """
-        Read and speak file contents.
+        Read a file aloud without loading it whole.
 
         Args:
             filename: Path/name of file to read
+            mode: "pages" (one page now, "next" for more), "head" or "tail"
+                  (first/last lines), "grep" (lines containing pattern) or
+                  "summary" (LLM map-reduce summary)
+            lines: Line count for head/tail (at most MAX_LINES)
+            pattern: Text to look for in grep mode
 
         Returns:
             True if successful, False otherwise
@@ -136,26 +289,207 @@ class FileManager:
             return False
 
         try:
-            filepath = self.base_dir / filename
-            if filepath.exists():
-                with open(filepath, "r", encoding="utf-8") as f:
-                    content = f.read().strip()
-
-                if content:
-                    speak(f"Content of {filename}: {content}")
-                    return True
-                else:
-                    speak(f"{filename} is empty.")
-                    return False
-            else:
+            filepath = self._resolve(filename)
+            if filepath is None:
                 speak("File not found.")
                 return False
 
+            filename = self._display(filepath)
+            with TextFile(filepath) as text_file:
+                if not text_file.pages:
+                    speak(f"{filename} is empty.")
+                    return False
+                return self._read_mode(text_file, filename, mode, min(lines, MAX_LINES), pattern)
+
+        except BinaryFileError:
+            speak(f"{filename} is not a text file.")
+            return False
+
         except Exception as e:
             speak(f"Error reading file: {e}")
             print(f"Read file error: {e}")
             return False
 
+    def _read_mode(self, text_file: TextFile, filename: str, mode: str, lines: int, pattern: str) -> bool:
+        if mode in ("head", "tail"):
+            found = text_file.head(lines) if mode == "head" else text_file.tail(lines)
+            where = "First" if mode == "head" else "Last"
+            heading = f"{where} {len(found)} line{'' if len(found) == 1 else 's'} of {filename}"
+            speak(paging.answer(paging.Pager(found, len(found), heading)))
+            return True
+
+        if mode == "grep":
+            found, capped = text_file.grep(pattern)
+            if not found:
+                speak(f"No line in {filename} contains '{pattern}'.")
+                return False
+            count = f"{len(found)}{'+' if capped else ''}"
+            lines_contain = "line contains" if len(found) == 1 else "lines contain"
+            heading = f"{count} {lines_contain} '{pattern}' in {filename}"
+            items = (f"line {number}: {line}" for number, line in found)
+            speak(paging.answer(paging.Pager(items, len(found), heading)))
+            return True
+
+        if mode == "summary":
+            if text_file.pages >= SUMMARY_NOTICE_PAGES:
+                speak(f"Summarizing {filename}, this may take a moment.")
+            speak(summarize(text_file, ask_llm, name=filename))
+            return True
+
+        if text_file.pages == 1:
+            speak(f"Content of {filename}: {text_file.page(0).strip()}")
+            return True
+        heading = f"{filename}, page 1 of {text_file.pages}"
+        speak(paging.answer(FilePager(text_file.path, text_file.pages, heading, filename)))
+        return True
+
+    def search_content(self, phrase: str) -> bool:
+        """
+        Say which files contain a phrase, best matches first.
+
+        Args:
+            phrase: Text to look for
+
+        Returns:
+            True if any file matched, False otherwise
+        """
+        phrase = phrase.strip().strip("'\"")
+        if not phrase:
+            speak("Please say what text to search for.")
+            return False
+
+        try:
+            if self._index_ready():
+                root = self.index.root
+                paths = (str(root / rel) for rel in self.index.files()[1])
+            else:
+                paths = walk_files(self.base_dir)
+            result = self.searcher.search(paths, phrase)
+        except Exception as e:
+            speak(f"Error searching files: {e}")
+            print(f"Search files error: {e}")
+            return False
+
+        matches = result["matches"]
+        if not matches:
+            speak(f"No file contains '{phrase}'.")
+            return False
+
+        count = len(matches)
+        heading = f"'{phrase}' found in {count} file{'' if count == 1 else 's'}"
+        if not result["complete"]:
+            heading += f" (stopped after the first {count})"
+        lines = (
+            f"{self._display(Path(m['path']))}, line {m['snippets'][0][0]}: {m['snippets'][0][1]}"
+            for m in matches
+        )
+        speak(paging.answer(paging.Pager(lines, count, heading)))
+        return True
+
+    def bulk(self, operation: str, pattern: str, target: str = "", dry_run: bool = False) -> bool:
+        """
+        Plan a bulk operation and ask to confirm it (or only preview it).
+
+        Args:
+            operation: "delete", "move", "copy" or "rename"
+            pattern: Files to include ("*.log", "logs/*.txt")
+            target: Destination folder (move, copy) or name template (rename)
+            dry_run: Only say what would happen
+
+        Returns:
+            True if a plan was made, False otherwise
+        """
+        try:
+            index = self.index if self._index_ready() else None
+            files, truncated = select(self.base_dir, pattern, index)
+            if not files:
+                speak(f"No files match {pattern}.")
+                return False
+            plan = BulkPlan(self.base_dir, operation, files, target, truncated)
+        except BulkError as e:
+            speak(str(e))
+            return False
+        except Exception as e:
+            speak(f"Error planning {operation}: {e}")
+            print(f"Bulk plan error: {e}")
+            return False
+
+        if not plan.steps:
+            speak(f"Nothing to {operation}: all {len(plan.skipped)} matching files are skipped ({plan.skipped[0][1]}).")
+            return False
+        if dry_run:
+            speak(plan.preview())
+            return True
+        speak(security.ask_confirmation(f"{plan.preview()} Say 'yes' to go ahead.", lambda: self._run_bulk(plan)))
+        return True
+
+    def _run_bulk(self, plan: BulkPlan) -> str:
+        """Confirmed: run the plan, speaking progress, and return the summary."""
+        def progress(done: int, total: int) -> None:
+            speak_async(f"{done} of {total} files done.")
+
+        try:
+            result = plan.execute(on_progress=progress)
+        except Exception as e:
+            print(f"Bulk run error: {e}")
+            return f"Error running {plan.operation}: {e}"
+        self._refresh(*result["changed"])
+        return plan.summary(result)
+
+    def _bulk_request(self, command: str) -> Optional[Tuple[str, Optional[str], str, bool]]:
+        """
+        (operation, pattern, target, dry run) for a bulk command, else None.
+        The pattern is None when the files weren't named clearly.
+        """
+        lower = command.lower()
+        if not (any(word in BULK_WORDS for word in lower.split()) or "*" in lower):
+            return None
+        operation = next((op for op, verb in BULK_VERBS if re.search(verb, lower)), None)
+        if operation is None:
+            return None
+
+        dry_run = any(word in lower for word in DRY_RUN_WORDS)
+        for word in DRY_RUN_WORDS:
+            command = re.sub(rf"\s*\b{word}\b", "", command, flags=re.IGNORECASE)
+
+        # Files are named before the destination: "to .jpg" is not a source
+        target, source = "", command
+        if operation != "delete":
+            for pattern in BULK_TARGETS:
+                match = re.search(pattern, command, re.IGNORECASE)
+                if match:
+                    target, source = match.group("t").strip("'\""), command[: match.start()]
+                    break
+        if operation == "rename" and target and "{" not in target:
+            # "to .jpg" changes the extension; "to holiday" numbers the files
+            target = "{stem}" + target if target.startswith(".") else target + "_{n}{ext}"
+
+        return operation, self._bulk_pattern(source), target, dry_run
+
+    def _bulk_pattern(self, text: str) -> Optional[str]:
+        """"*.log" for "saari .log files", "logs/*.txt" for "all txt files in logs"."""
+        lower = text.lower()
+        glob = re.search(r"(\S*\*\S*)", text)
+        if glob:
+            return glob.group(1)
+
+        ext = None
+        match = re.search(r"(?:\bdot\s+|(?<![\w.])\.)(\w+)\b", lower) or re.search(r"(\w+)\s+files\b", lower)
+        if match and match.group(1) not in BULK_WORDS:
+            ext = match.group(1)
+        else:
+            match = re.search(r"\b(?:%s)\s+(\w+?)s\b" % "|".join(BULK_WORDS), lower)
+            if match and match.group(1) != "file":
+                ext = match.group(1)
+        if not ext:
+            return None
+        pattern = f"*.{EXT_WORDS.get(ext, ext)}"
+
+        scope = re.search(r"\b(?:in|from)\s+(?:the\s+)?([\w./-]+?)(?:\s+(?:folder|directory))?\s*$", text.strip(), re.IGNORECASE)
+        if scope:
+            pattern = f"{scope.group(1).strip('/')}/{pattern}"
+        return pattern
+
     def rename_file(self, old_name: str, new_name: str) -> bool:
         """
         Rename a file.
@@ -175,13 +509,15 @@ class FileManager:
             return False
 
         try:
-            old_path = self.base_dir / old_name
             new_path = self.base_dir / new_name
-
-            if old_path.exists():
-                new_path.parent.mkdir(parents=True, exist_ok=True)
-                old_path.rename(new_path)
-                speak(f"File renamed from {old_name} to {new_name}")
+            old_path = self._literal(old_name)
+            if old_path is not None:
+                speak(self._rename(old_path, new_path))
+                return True
+            old_path = self._resolve(old_name, exact=True)
+            if old_path is not None:
+                question = f"Did you mean {self._display(old_path)}? Say 'yes' to rename it to {new_name}."
+                speak(security.ask_confirmation(question, lambda: self._rename(old_path, new_path)))
                 return True
             else:
                 speak("Original file not found.")
@@ -192,6 +528,40 @@ class FileManager:
             print(f"Rename file error: {e}")
             return False
 
+    def _rename(self, old_path: Path, new_path: Path) -> str:
+        try:
+            new_path.parent.mkdir(parents=True, exist_ok=True)
+            old_path.rename(new_path)
+        except Exception as e:
+            print(f"Rename file error: {e}")
+            return f"Error renaming file: {e}"
+        self._refresh(old_path, new_path)
+        return f"File renamed from {self._display(old_path)} to {self._display(new_path)}"
+
+    def _spoken_extension(self, command: str) -> Optional[str]:
+        """"pdf" for "list pdf files", "list files dot pdf" or "list python files"."""
+        match = re.search(r"(?:\bdot\s+|\.)(\w+)", command) or re.search(r"(\w+)\s+files\b", command)
+        if not match:
+            return None
+        word = match.group(1)
+        ext = EXT_WORDS.get(word, word)
+        if self._index_ready() and self.index.has_extension(ext):
+            return ext
+        return None
+
+    @staticmethod
+    def _search_phrase(command: str) -> Optional[str]:
+        """"invoice 2024" for "kaunsi file mein invoice 2024 likha hai" and similar."""
+        for pattern in SEARCH_PATTERNS:
+            match = re.search(pattern, command)
+            if match:
+                return match.group("q").strip(" ?.'\"")
+        return None
+
+    @staticmethod
+    def _is_recent(command: str) -> bool:
+        return any(word in RECENT_WORDS for word in command.split())
+
     def handle_command(self, command: str) -> bool:
         """
         Handle file management command.
@@ -203,8 +573,16 @@ class FileManager:
             True if successful, False otherwise
         """
         cmd_lower = command.lower().strip()
+        bulk = self._bulk_request(command.strip())
 
-        if cmd_lower.startswith("create file"):
+        if bulk is not None:
+            operation, pattern, target, dry_run = bulk
+            if pattern is None:
+                speak(f"Which files should I {operation}? For example: {operation} all .log files.")
+                return False
+            return self.bulk(operation, pattern, target, dry_run)
+
+        elif cmd_lower.startswith("create file"):
             filename = command[len("create file") :].strip()
             return self.create_file(filename)
 
@@ -213,8 +591,21 @@ class FileManager:
             return self.delete_file(filename)
 
         elif cmd_lower.startswith("read file"):
-            filename = command[len("read file") :].strip()
-            return self.read_file(filename)
+            rest = command[len("read file") :].strip()
+            for mode, pattern in READ_MODES:
+                match = re.search(pattern, rest, re.IGNORECASE)
+                if match:
+                    groups = match.groupdict()
+                    return self.read_file(
+                        rest[: match.start()],
+                        mode,
+                        lines=int(groups.get("n") or DEFAULT_LINES),
+                        pattern=(groups.get("q") or "").strip(" '\""),
+                    )
+            return self.read_file(rest)
+
+        elif cmd_lower.startswith("summarize file"):
+            return self.read_file(command[len("summarize file") :].strip(), "summary")
 
         elif cmd_lower.startswith("rename file"):
             rest = command[len("rename file") :].strip()
@@ -227,8 +618,11 @@ class FileManager:
                 )
                 return False
 
+        elif self._search_phrase(cmd_lower):
+            return self.search_content(self._search_phrase(cmd_lower))
+
         elif "list" in cmd_lower:
-            return self.list_files()
+            return self.list_files(ext=self._spoken_extension(cmd_lower), recent=self._is_recent(cmd_lower))
 
         else:
             speak("File command not recognized.")
@@ -0,0 +1,407 @@
+"""
+Large-file reading for Huzenix.
+Reads text files of any size through mmap a page at a time, so memory use
+doesn't depend on the file size and nothing is sent to the speech engine in
+one huge piece.
+
+A file is split into fixed byte windows of PAGE_BYTES; every page starts at
+the first line start in its window (or at a character boundary when a line
+is longer than LINE_SNAP), so pages can be read in any order and their count
+is known up front. Encodings are detected from BOMs, UTF-16 NUL patterns and
+a UTF-8 check, with charset_normalizer (if installed) for the rest.
+
+Modes: pages (spoken with "next"), head/tail N lines, grep, and a map-reduce
+summary that sends at most SUMMARY_TOKENS of the file to the LLM, sampling
+evenly spaced parts of files that are larger than that.
+"""
+
+import codecs
+import mmap
+import re
+from typing import Callable, Iterator, List, Tuple
+
+from core import metrics, paging
+
+PAGE_BYTES = 2048          # bytes per spoken page
+LINE_SNAP = 512            # how far a page start looks for a line start
+SCAN_PAGES = 256           # pages decoded at a time by whole-file scans
+RELEASE_BYTES = 16 * 1024 * 1024  # scanned bytes dropped from RSS at a time
+RELEASE_LAG = 4 * 1024 * 1024     # kept behind the scan: faults map whole (large) folios
+SNIFF = 64 * 1024          # bytes used to detect the encoding
+MAX_LINES = 50             # head/tail limit
+GREP_MAX = 200             # matching lines kept
+LINE_CHARS = 200           # characters spoken per matching line
+CHARS_PER_TOKEN = 4        # rough estimate for prompt budgets
+SUMMARY_TOKENS = 8000      # file text sent to the LLM per summary, at most
+MAP_TOKENS = 1500          # file text per map prompt
+REDUCE_TOKENS = 1500       # partial summaries combined per reduce prompt
+
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32-le"),  # before UTF-16 LE: same first bytes
+    (codecs.BOM_UTF32_BE, "utf-32-be"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+READ_BYTES = metrics.counter("huzenix_file_read_bytes_total", "File bytes decoded for reading")
+
+
+class BinaryFileError(ValueError):
+    """The file doesn't look like text."""
+
+
+def detect_encoding(sample: bytes) -> Tuple[str, int]:
+    """
+    Encoding of a file from its first bytes.
+
+    Returns:
+        (codec name, BOM length)
+
+    Raises:
+        BinaryFileError: NUL bytes that aren't UTF-16 text
+    """
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding, len(bom)
+
+    if b"\0" in sample:
+        # ASCII-range UTF-16 has a NUL in every other byte
+        even, odd = sample[0::2].count(0), sample[1::2].count(0)
+        half = len(sample) // 2
+        if odd > 0.3 * half and even < 0.05 * half:
+            return "utf-16-le", 0
+        if even > 0.3 * half and odd < 0.05 * half:
+            return "utf-16-be", 0
+        raise BinaryFileError("binary file")
+
+    try:
+        # Not final: the sample may end inside a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8", 0
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return "cp1252", 0
+    best = from_bytes(sample).best()
+    return (best.encoding if best else "cp1252"), 0
+
+
+class TextFile:
+    """A memory-mapped text file read in pages; use as a context manager."""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: File to open
+
+        Raises:
+            OSError: The file can't be opened
+            BinaryFileError: It isn't text
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if f.seek(0, 2) else None
+        self.size = len(self._mm) if self._mm else 0
+        if self._mm is None:
+            self.encoding, self._bom = "utf-8", 0
+        else:
+            try:
+                self.encoding, self._bom = detect_encoding(self._mm[:SNIFF])
+            except BinaryFileError:
+                self.close()
+                raise
+        # Code unit width: newline searches must stay aligned to it
+        self._unit = 4 if "32" in self.encoding else 2 if "16" in self.encoding else 1
+        self._newline = "\n".encode(self.encoding)
+        self.text_bytes = max(0, self.size - self._bom)
+        self.pages = -(-self.text_bytes // PAGE_BYTES)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self) -> "TextFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- OFFSETS ---------- #
+
+    def _aligned(self, pos: int) -> bool:
+        return (pos - self._bom) % self._unit == 0
+
+    def _find_newline(self, start: int, end: int) -> int:
+        pos = self._mm.find(self._newline, start, end)
+        while pos != -1 and not self._aligned(pos):
+            pos = self._mm.find(self._newline, pos + 1, end)
+        return pos
+
+    def _rfind_newline(self, start: int, end: int) -> int:
+        pos = self._mm.rfind(self._newline, start, end)
+        while pos != -1 and not self._aligned(pos):
+            pos = self._mm.rfind(self._newline, start, pos + len(self._newline) - 1)
+        return pos
+
+    def _char_boundary(self, pos: int) -> int:
+        pos -= (pos - self._bom) % self._unit
+        if self.encoding == "utf-8":
+            # Back off UTF-8 continuation bytes
+            while pos > self._bom and self._mm[pos] & 0xC0 == 0x80:
+                pos -= 1
+        return pos
+
+    def _page_start(self, page: int) -> int:
+        pos = self._bom + page * PAGE_BYTES
+        if page <= 0:
+            return self._bom
+        if pos >= self.size:
+            return self.size
+        # A page whose window starts right after a newline starts there
+        newline = self._find_newline(pos - len(self._newline), min(self.size, pos + LINE_SNAP))
+        if newline != -1:
+            return newline + len(self._newline)
+        return self._char_boundary(pos)
+
+    def _spans(self, per_span: int, first: int = 0) -> Iterator[Tuple[int, int]]:
+        """(start, end) of consecutive runs of per_span pages."""
+        released = 0
+        for page in range(first, self.pages, per_span):
+            start, end = self._page_start(page), self._page_start(page + per_span)
+            yield start, end
+            if end - released >= RELEASE_BYTES + RELEASE_LAG:
+                released = self._release(released, end - RELEASE_LAG)
+
+    def _release(self, start: int, end: int) -> int:
+        """
+        Drop scanned pages from this process's RSS (they stay in the page
+        cache), so a scan of a large file doesn't look like it holds it all.
+        """
+        end -= end % mmap.PAGESIZE
+        start -= start % mmap.PAGESIZE
+        if self._mm is not None and end > start and hasattr(mmap, "MADV_DONTNEED"):
+            self._mm.madvise(mmap.MADV_DONTNEED, start, end - start)
+        return end
+
+    def _decode(self, start: int, end: int) -> str:
+        READ_BYTES.inc(end - start)
+        return self._mm[start:end].decode(self.encoding, "replace")
+
+    # ---------- READING ---------- #
+
+    def page(self, page: int) -> str:
+        """Text of one page (0-based), "" past the end."""
+        if not 0 <= page < self.pages:
+            return ""
+        return self._decode(self._page_start(page), self._page_start(page + 1))
+
+    def iter_pages(self, first: int = 0) -> Iterator[str]:
+        for start, end in self._spans(1, first):
+            yield self._decode(start, end)
+
+    def lines(self) -> Iterator[Tuple[int, str]]:
+        """(line number, line) for every line, SCAN_PAGES in memory at a time."""
+        number, partial = 1, ""
+        for start, end in self._spans(SCAN_PAGES):
+            parts = (partial + self._decode(start, end)).split("\n")
+            partial = parts.pop()
+            for line in parts:
+                yield number, line.rstrip("\r")
+                number += 1
+            if len(partial) > SCAN_PAGES * PAGE_BYTES:
+                # A line longer than a scan is yielded in pieces
+                yield number, partial
+                partial = ""
+        if partial:
+            yield number, partial.rstrip("\r")
+
+    def head(self, count: int) -> List[str]:
+        """First count lines."""
+        lines = []
+        for _, line in self.lines():
+            if len(lines) >= count:
+                break
+            lines.append(line)
+        return lines
+
+    def tail(self, count: int) -> List[str]:
+        """Last count lines, found by searching back from the end."""
+        if not self.size:
+            return []
+        end = self.size
+        # A final newline doesn't start another line
+        if self._rfind_newline(max(self._bom, end - len(self._newline)), end) != -1:
+            end -= len(self._newline)
+        start = end
+        for _ in range(count):
+            # Long lines are cut at a page of text
+            newline = self._rfind_newline(max(self._bom, start - PAGE_BYTES), start)
+            if newline == -1:
+                start = self._char_boundary(max(self._bom, start - PAGE_BYTES))
+                break
+            start = newline
+            if start <= self._bom:
+                break
+        if start > self._bom and self._mm[start: start + len(self._newline)] == self._newline:
+            start += len(self._newline)
+        return [line.rstrip("\r") for line in self._decode(start, end).split("\n")][-count:]
+
+    def grep(self, pattern: str, limit: int = GREP_MAX) -> Tuple[List[Tuple[int, str]], bool]:
+        """
+        Lines containing pattern (case-insensitive, plain text).
+
+        Returns:
+            ([(line number, line)], True if the scan stopped at limit)
+        """
+        needle = pattern.lower()
+        regex = re.compile(re.escape(pattern), re.IGNORECASE)
+        found = []
+        number = 1
+        # One search per span; lines are only cut out around hits
+        for start, end in self._spans(SCAN_PAGES):
+            text = self._decode(start, end)
+            haystack = text.lower()
+            if len(haystack) == len(text):
+                hits = ((pos, pos + len(needle)) for pos in _find_all(haystack, needle))
+            else:
+                # Lowercasing changed offsets ("İ"): fall back to the slower regex
+                hits = (match.span() for match in regex.finditer(text))
+            counted, last = 0, -1
+            for hit_start, hit_end in hits:
+                line_start = text.rfind("\n", 0, hit_start) + 1
+                if line_start == last:
+                    continue  # another hit on the same line
+                if len(found) >= limit:
+                    return found, True
+                number += text.count("\n", counted, line_start)
+                counted = last = line_start
+                line_end = text.find("\n", hit_end)
+                found.append((number, text[line_start: None if line_end == -1 else line_end].strip()[:LINE_CHARS]))
+            number += text.count("\n", counted)
+        return found, False
+
+    def text(self) -> str:
+        """The whole file (for small files only)."""
+        return self._decode(self._bom, self.size) if self.size else ""
+
+    def chunks(self, tokens: int) -> Iterator[str]:
+        """Consecutive runs of pages of about `tokens` tokens each."""
+        per_chunk = max(1, tokens * CHARS_PER_TOKEN // PAGE_BYTES)
+        for start, end in self._spans(per_chunk):
+            yield self._decode(start, end)
+
+    def sampled_chunks(self, tokens: int, count: int) -> Iterator[str]:
+        """count evenly spaced chunks of about `tokens` tokens each."""
+        per_chunk = max(1, tokens * CHARS_PER_TOKEN // PAGE_BYTES)
+        stride = max(per_chunk, self.pages // max(1, count))
+        for first in range(0, self.pages, stride)[:count]:
+            yield self._decode(self._page_start(first), self._page_start(first + per_chunk))
+
+
+def _find_all(text: str, needle: str) -> Iterator[int]:
+    pos = text.find(needle)
+    while pos != -1:
+        yield pos
+        pos = text.find(needle, pos + 1)
+
+
+# ---------- SUMMARY ---------- #
+
+def _tokens(chars: int) -> int:
+    return chars // CHARS_PER_TOKEN + 1
+
+
+def summarize(
+    text_file: TextFile,
+    ask: Callable[[str], str],
+    budget: int = SUMMARY_TOKENS,
+    name: str = "the file",
+) -> str:
+    """
+    Map-reduce summary of a file within a token budget.
+
+    Each chunk of MAP_TOKENS is summarized on its own as it is read (map),
+    then the partial summaries are combined REDUCE_TOKENS at a time until
+    one is left (reduce). Files over the budget are sampled at evenly
+    spaced chunks; the prompt says so.
+
+    Args:
+        text_file: Open TextFile
+        ask: prompt -> reply (e.g. core.llm_client.ask_llm)
+        budget: Tokens of file text sent in map prompts, at most
+        name: File name used in prompts
+
+    Returns:
+        Summary text for speech
+    """
+    total = _tokens(text_file.text_bytes)
+    if total <= MAP_TOKENS:
+        return ask(
+            f"Summarize this file ({name}) for speech in 2-3 short sentences. "
+            f"Mention names, numbers and errors that stand out.\n\n{text_file.text()}"
+        )
+
+    per_chunk = max(1, MAP_TOKENS * CHARS_PER_TOKEN // PAGE_BYTES)
+    if total <= budget:
+        chunks, sampled = text_file.chunks(MAP_TOKENS), False
+        count = -(-text_file.pages // per_chunk)
+    else:
+        count = max(1, budget // MAP_TOKENS)
+        chunks, sampled = text_file.sampled_chunks(MAP_TOKENS, count), True
+
+    where = "evenly spaced excerpts" if sampled else "consecutive parts"
+    partials = []
+    for index, chunk in enumerate(chunks, 1):
+        partials.append(ask(
+            f"This is part {index} of {count} ({where}) of {name}. Summarize it in 1-2 "
+            f"sentences, keeping names, numbers and errors.\n\n{chunk}"
+        ))
+
+    while len(partials) > 1 and sum(_tokens(len(p)) for p in partials) > REDUCE_TOKENS:
+        groups, group, size = [], [], 0
+        for partial in partials:
+            if group and size + _tokens(len(partial)) > REDUCE_TOKENS:
+                groups.append(group)
+                group, size = [], 0
+            group.append(partial)
+            size += _tokens(len(partial))
+        groups.append(group)
+        if len(groups) == len(partials):
+            break  # every partial is too long to pair up; combine them as they are
+        partials = [
+            ask("Combine these notes into 2 sentences.\n" + "\n".join(f"- {p}" for p in g))
+            if len(g) > 1 else g[0]
+            for g in groups
+        ]
+
+    coverage = " (only excerpts were read; say so)" if sampled else ""
+    return ask(
+        f"These are notes on {where} of {name}{coverage}. Summarize the whole file for "
+        "speech in 2-3 short sentences.\n" + "\n".join(f"- {p}" for p in partials)
+    )
+
+
+class FilePager(paging.Pager):
+    """Pages of a file for speech; "summary" runs summarize() on the file."""
+
+    def __init__(self, path, pages: int, heading: str, name: str):
+        super().__init__(self._read(path), pages, heading, page_size=1)
+        self.path = path
+        self.name = name
+
+    @staticmethod
+    def _read(path) -> Iterator[str]:
+        # Kept open while the listing is pending; closed when it is dropped
+        with TextFile(path) as text_file:
+            for page in text_file.iter_pages():
+                yield page.strip()
+
+    def summary(self, ask: Callable[[str], str]) -> str:
+        self.total = self.spoken
+        with TextFile(self.path) as text_file:
+            return summarize(text_file, ask, name=self.name)
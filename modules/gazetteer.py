@@ -0,0 +1,357 @@
+"""
+City gazetteer for Huzenix.
+Resolves noisy spoken city names ("luck now", "dilli") to OpenWeather city
+ids using an offline index built once from OpenWeather's city.list.json(.gz).
+
+The index is a single file of flat arrays that is memory-mapped on open, so
+loading costs nothing and only the pages a lookup touches are read. Names
+are matched with their spaces removed (speech-to-text often splits or joins
+words), first exactly and then by trigram overlap reranked by edit distance.
+
+Index files are versioned by the city list they were built from
+(cities-<mtime_ns>.idx): a rebuild writes a new file instead of replacing
+one that may be mapped, the caller swaps to it and closes the old one, and
+older versions are removed.
+"""
+
+import gzip
+import json
+import mmap
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from core.fuzzy import edit_ratio, normalize, trigrams
+
+MAGIC = b"HZGAZ01\n"
+MIN_SCORE = 0.6        # weakest fuzzy match that is accepted
+SHORTLIST = 6          # trigram candidates reranked by edit distance
+MEMO_SIZE = 1024       # resolved names remembered per index
+INDEX_PREFIX = "cities-"
+INDEX_SUFFIX = ".idx"
+ALIASES = {
+    # Older or spoken names, tried when the name itself isn't in the list
+    "dilli": "delhi", "bombay": "mumbai", "bambai": "mumbai", "calcutta": "kolkata",
+    "madras": "chennai", "bangalore": "bengaluru", "banglore": "bengaluru",
+    "gurgaon": "gurugram", "poona": "pune", "benaras": "varanasi", "banaras": "varanasi",
+}
+
+# Sections of the index file, in order: name, dtype
+SECTIONS = (
+    ("key_off", np.uint32),       # sorted unique name keys -> offsets into keys
+    ("keys", np.uint8),
+    ("key_ntri", np.uint16),      # trigram count per key
+    ("key_city_off", np.uint32),  # key -> range in key_city
+    ("key_city", np.uint32),      # city rows, lowest id first
+    ("city_id", np.uint32),
+    ("city_country", np.uint8),   # two ASCII bytes per city
+    ("city_name_off", np.uint32), # display names
+    ("city_names", np.uint8),
+    ("tri_hash", np.uint32),      # sorted trigram hashes
+    ("tri_off", np.uint32),       # trigram -> range in tri_keys
+    ("tri_keys", np.uint32),
+)
+
+
+# ---------- BUILD ---------- #
+
+def _read_city_list(path: Path) -> List[Dict]:
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_index(source: Path, target: Path) -> int:
+    """
+    Compile an OpenWeather city list into an index file.
+
+    Args:
+        source: city.list.json or city.list.json.gz
+        target: Index file to write (replaced atomically)
+
+    Returns:
+        Number of cities indexed
+    """
+    cities = [c for c in _read_city_list(Path(source)) if c.get("name") and c.get("id")]
+    cities.sort(key=lambda c: c["id"])
+
+    by_key: Dict[str, List[int]] = {}
+    for row, city in enumerate(cities):
+        key = normalize(city["name"])
+        if key:
+            by_key.setdefault(key, []).append(row)
+    keys = sorted(by_key, key=lambda k: k.encode("utf-8"))
+
+    postings: Dict[int, List[int]] = {}
+    for k, key in enumerate(keys):
+        for tri in trigrams(key):
+            postings.setdefault(tri, []).append(k)
+    tri_hash = sorted(postings)
+
+    def blob(strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    def ranges(lists):
+        offsets = np.zeros(len(lists) + 1, dtype=np.uint32)
+        np.cumsum([len(l) for l in lists], out=offsets[1:])
+        flat = np.fromiter((x for l in lists for x in l), dtype=np.uint32, count=int(offsets[-1]))
+        return offsets, flat
+
+    key_off, key_bytes = blob(keys)
+    key_city_off, key_city = ranges([by_key[k] for k in keys])
+    name_off, name_bytes = blob(c["name"] for c in cities)
+    tri_off, tri_keys = ranges([postings[t] for t in tri_hash])
+    country = "".join((c.get("country") or "  ")[:2].ljust(2) for c in cities).encode("ascii", "replace")
+
+    arrays = {
+        "key_off": key_off,
+        "keys": key_bytes,
+        "key_ntri": np.array([len(trigrams(k)) for k in keys], dtype=np.uint16),
+        "key_city_off": key_city_off,
+        "key_city": key_city,
+        "city_id": np.array([c["id"] for c in cities], dtype=np.uint32),
+        "city_country": np.frombuffer(country, dtype=np.uint8),
+        "city_name_off": name_off,
+        "city_names": name_bytes,
+        "tri_hash": np.array(tri_hash, dtype=np.uint32),
+        "tri_off": tri_off,
+        "tri_keys": tri_keys,
+    }
+
+    # Header: magic, JSON table of (offset, count) per section, 8-byte aligned data
+    table, position = {}, 0
+    for name, dtype in SECTIONS:
+        data = arrays[name].astype(dtype, copy=False)
+        table[name] = (position, len(data))
+        position += -(-data.nbytes // 8) * 8
+    header = json.dumps(table).encode("utf-8")
+    header_size = -(-(len(MAGIC) + 4 + len(header)) // 8) * 8
+
+    tmp = Path(str(target) + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + len(header).to_bytes(4, "little") + header)
+        f.write(b"\0" * (header_size - f.tell()))
+        for name, dtype in SECTIONS:
+            data = arrays[name].astype(dtype, copy=False).tobytes()
+            f.write(data + b"\0" * (-len(data) % 8))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+    return len(cities)
+
+
+# ---------- LOOKUP ---------- #
+
+class Gazetteer:
+    """Memory-mapped city index; see build_index()."""
+
+    def __init__(self, path: Path):
+        """
+        Open an index file.
+
+        Args:
+            path: File written by build_index()
+
+        Raises:
+            ValueError: Not a gazetteer index
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()  # close() may race a lookup after a swap
+        self._closed = False
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a city index")
+
+        header_len = int.from_bytes(self._mm[len(MAGIC): len(MAGIC) + 4], "little")
+        start = len(MAGIC) + 4
+        table = json.loads(self._mm[start: start + header_len])
+        base = -(-(start + header_len) // 8) * 8
+        for name, dtype in SECTIONS:
+            offset, count = table[name]
+            setattr(self, "_" + name, np.frombuffer(self._mm, dtype=dtype, count=count, offset=base + offset))
+        # Spoken city names repeat a lot
+        self.resolve = lru_cache(maxsize=MEMO_SIZE)(self._resolve)
+
+    def __len__(self) -> int:
+        return len(self._city_id)
+
+    def _key(self, k: int) -> str:
+        return bytes(self._keys[self._key_off[k]: self._key_off[k + 1]]).decode("utf-8")
+
+    def _find_key(self, key: str) -> Optional[int]:
+        target = key.encode("utf-8")
+        lo, hi = 0, len(self._key_off) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(self._keys[self._key_off[mid]: self._key_off[mid + 1]]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < len(self._key_off) - 1 and self._key(lo) == key else None
+
+    def _city(self, row: int, score: float) -> Dict:
+        name = bytes(self._city_names[self._city_name_off[row]: self._city_name_off[row + 1]])
+        return {
+            "id": int(self._city_id[row]),
+            "name": name.decode("utf-8"),
+            "country": bytes(self._city_country[2 * row: 2 * row + 2]).decode("ascii").strip(),
+            "score": round(score, 3),
+        }
+
+    def _best_city(self, k: int, country: Optional[str]) -> int:
+        rows = self._key_city[self._key_city_off[k]: self._key_city_off[k + 1]]
+        if country:
+            wanted = country.upper().encode("ascii")
+            for row in rows:
+                if bytes(self._city_country[2 * row: 2 * row + 2]) == wanted:
+                    return int(row)
+        return int(rows[0])
+
+    def _fuzzy(self, key: str) -> List[tuple]:
+        """(score, key index) for keys sharing trigrams with key, best first."""
+        query = np.array(trigrams(key), dtype=np.uint32)
+        slots = np.searchsorted(self._tri_hash, query)
+        found = slots < len(self._tri_hash)
+        found[found] = self._tri_hash[slots[found]] == query[found]
+        slots = slots[found]
+        if not len(slots):
+            return []
+
+        parts = [self._tri_keys[self._tri_off[s]: self._tri_off[s + 1]] for s in slots]
+        candidates, shared = np.unique(np.concatenate(parts), return_counts=True)
+        dice = 2.0 * shared / (len(query) + self._key_ntri[candidates])
+        if len(dice) > SHORTLIST:
+            top = np.argpartition(-dice, SHORTLIST - 1)[:SHORTLIST]
+            top = top[np.argsort(-dice[top], kind="stable")]
+        else:
+            top = np.argsort(-dice, kind="stable")
+        top = top[dice[top] >= 0.5 * dice[top[0]]]
+
+        scored = []
+        for i in top:
+            k = int(candidates[i])
+            # Trigrams find the neighbourhood; edit distance orders it
+            scored.append((0.5 * float(dice[i]) + 0.5 * edit_ratio(key, self._key(k)), k))
+        scored.sort(key=lambda item: -item[0])
+        return scored
+
+    def _resolve(self, name: str, country: Optional[str] = None) -> Optional[Dict]:
+        """
+        Best city for a spoken name (memoized as resolve()).
+
+        Args:
+            name: e.g. "luck now", "new delhi"
+            country: Preferred ISO country code among same-named cities
+
+        Returns:
+            {"id", "name", "country", "score"}, or None if nothing is close
+        """
+        key = normalize(name)
+        if not key:
+            return None
+        with self._lock:
+            if self._closed:
+                return None
+            return self._lookup(key, country)
+
+    def _lookup(self, key: str, country: Optional[str]) -> Optional[Dict]:
+        for exact in (key, ALIASES.get(key)):
+            k = self._find_key(exact) if exact else None
+            if k is not None:
+                return self._city(self._best_city(k, country), 1.0)
+
+        scored = self._fuzzy(key)
+        if not scored or scored[0][0] < MIN_SCORE:
+            return None
+        score, k = scored[0]
+        return self._city(self._best_city(k, country), score)
+
+    def get(self, city_id: int) -> Optional[Dict]:
+        """City by OpenWeather id."""
+        with self._lock:
+            if self._closed:
+                return None
+            row = int(np.searchsorted(self._city_id, city_id))
+            if row < len(self._city_id) and self._city_id[row] == city_id:
+                return self._city(row, 1.0)
+            return None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            # Arrays are views into the map; drop them before closing it
+            self._closed = True
+            for name, _ in SECTIONS:
+                setattr(self, "_" + name, None)
+            self.resolve.cache_clear()
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # a caller still holds a view; the map closes with it
+
+
+def _index_versions(data_dir: Path) -> List[Path]:
+    """Index files in data_dir, oldest first."""
+    versions = []
+    for path in data_dir.glob(f"{INDEX_PREFIX}*{INDEX_SUFFIX}"):
+        stamp = path.name[len(INDEX_PREFIX): -len(INDEX_SUFFIX)]
+        if stamp.isdigit():
+            versions.append((int(stamp), path))
+    return [path for _, path in sorted(versions)]
+
+
+def _remove_old_versions(data_dir: Path, keep: Path) -> None:
+    for path in _index_versions(data_dir):
+        if path != keep:
+            try:
+                path.unlink()
+            except OSError:
+                pass  # still mapped elsewhere (Windows); removed next time
+
+
+def open_gazetteer(data_dir: Path, on_built: Callable[[Gazetteer], None] = None) -> Optional[Gazetteer]:
+    """
+    Open the newest index in data_dir. When there is none for the current
+    city.list.json(.gz) in the same directory, a new version is built on a
+    background thread and passed to on_built, which should swap to it and
+    close the index it replaces; older versions are then removed.
+
+    Returns:
+        The newest existing index, or None if there is none yet
+    """
+    data_dir = Path(data_dir)
+    sources = [p for p in (data_dir / "city.list.json.gz", data_dir / "city.list.json") if p.exists()]
+    versions = _index_versions(data_dir)
+
+    if sources:
+        current = data_dir / f"{INDEX_PREFIX}{sources[0].stat().st_mtime_ns}{INDEX_SUFFIX}"
+        if not current.exists():
+            def build():
+                try:
+                    count = build_index(sources[0], current)
+                    print(f"City index built: {count} cities")
+                    gazetteer = Gazetteer(current)
+                    if on_built is not None:
+                        on_built(gazetteer)
+                    else:
+                        gazetteer.close()
+                    _remove_old_versions(data_dir, current)
+                except (OSError, ValueError) as e:
+                    print(f"City index error: {e}")
+
+            threading.Thread(target=build, name="huzenix-gazetteer", daemon=True).start()
+
+    try:
+        return Gazetteer(versions[-1]) if versions else None
+    except (OSError, ValueError) as e:
+        print(f"City index error: {e}")
+        return None
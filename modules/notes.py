@@ -1,15 +1,273 @@
 """
 Notes module for Huzenix.
-Manages note creation, reading, and deletion.
+Manages note creation, reading, editing, and deletion.
+
+Notes live in an append-only JSON-lines log (notes.jsonl). Every note has a
+stable numeric id, a timestamp and tags; edits and deletes append new records
+(deletes are tombstones) and a background compaction drops dead records.
+An in-memory offset index maps each live note to its latest record, so
+"last N notes" reads N records directly instead of the whole file.
 """
 
+import json
+import os
+import re
+import threading
+import time
+from itertools import dropwhile, islice
 from pathlib import Path
-from datetime import datetime
-from typing import List
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from core import paging, security
+from core.search_index import SearchIndex, snippet
 from core.voice_output import speak
 from core.voice_input import listen
 
+COMPACT_MIN_DEAD_BYTES = 64 * 1024  # don't bother compacting tiny logs
+DEFAULT_LAST_N = 5
+ITER_CHUNK = 16  # ids fetched by the first step of iter_notes
+LEGACY_LINE_RE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]\s*(.*)$")
+HASHTAG_RE = re.compile(r"#(\w+)")
+NOTE_ID_RE = re.compile(r"\bnote\s+(?:number\s+|no\.?\s+)?(\d+)\b")
+EDIT_RE = re.compile(r"\b(?:edit|change|update|badlo)\s+note\s+(\d+)\s+(?:to|se|:)?\s*(.+)$", re.IGNORECASE)
+ADD_RE = re.compile(
+    r"\b(?:note\s+(?:likho|likh\s+do|karo|kar\s+lo|down|that)|(?:add|write|take|save)\s+(?:a\s+)?note"
+    r"|likh\s+lo|likh\s+do)\s*:?\s*(.*)$",
+    re.IGNORECASE,
+)
+# Delete only when the command is a delete: verb first, or a Hindi verb last
+DELETE_RE = re.compile(
+    r"^(?:please\s+)?(?:delete|remove|hatao|mitao|mita\s+do)\b"
+    r"|\b(?:delete|remove)\s+(?:karo|kar\s+do)$|\b(?:hatao|hata\s+do|mitao|mita\s+do)$"
+)
+LAST_N_RE = re.compile(r"\b(?:last|latest|pichle|aakhri)\s+(\d+)\b")
+# A search leads with its verb or phrase, or ends with a Hindi verb
+SEARCH_RE = re.compile(
+    r"^(?:please\s+)?(?:search|find|look\s+up)\b|^(?:notes?\s+(?:about|mein|me)|jis\s*(?:me|mein|mai))\b"
+    r"|\bjis\s*(?:me|mein|mai)\b.*\b(?:likha|likhi)\b|\b(?:dhundo|dhoondo|khojo)$"
+)
+SEARCH_FILLER = frozenset(
+    "search find dhundo dhoondo khojo note notes wala wali woh wo jisme jismein jis me mein mai "
+    "likha likhi tha thi about for my mere meri the a an with that which se".split()
+)
+# Spoken date filters -> (since, until) relative to local midnight today, in days
+DATE_FILTERS = [
+    (re.compile(r"\b(?:today|aaj)\b"), (0, None)),
+    (re.compile(r"\b(?:yesterday|kal)\b"), (-1, 0)),
+    (re.compile(r"\b(?:this|is)\s+(?:week|hafte)\b"), ("week", None)),
+    (re.compile(r"\b(?:last|pichle)\s+(?:week|hafte)\b"), (-7, None)),
+    (re.compile(r"\b(?:this|is)\s+(?:month|mahine)\b"), ("month", None)),
+    (re.compile(r"\b(?:last|pichle)\s+(?:month|mahine)\b"), (-30, None)),
+]
+SEARCH_RESULTS = 3
+
+
+class NoteLog:
+    """Append-only note log with tombstones, compaction and an offset index."""
+
+    def __init__(self, path: Path, search: SearchIndex = None):
+        self.path = Path(path)
+        self.search = search
+        self._lock = threading.RLock()
+        self._offsets: Dict[int, Tuple[int, int]] = {}  # id -> (offset, length), creation order
+        self._next_id = 1
+        self._size = 0
+        self._dead_bytes = 0
+        self._compacting = False
+
+        self.path.touch(exist_ok=True)
+        self._scan()
+        self._reader = open(self.path, "rb")
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    # ---------- INDEX ---------- #
+
+    def _scan(self) -> None:
+        """Build the offset index with one pass over the log (startup only)."""
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                length = len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write at the tail: cut it off below
+                    break
+                self._index(record, offset, length)
+                offset += length
+        if offset != self.path.stat().st_size:
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+        self._size = offset
+
+    def _index(self, record: dict, offset: int, length: int) -> None:
+        note_id = record["id"]
+        if record.get("op") == "seq":
+            # Written by compaction/clear so ids of dropped notes are never reused
+            self._next_id = max(self._next_id, note_id + 1)
+            return
+        previous = self._offsets.get(note_id)
+        if previous is not None:
+            self._dead_bytes += previous[1]
+
+        if record.get("op") == "del":
+            self._offsets.pop(note_id, None)
+            self._dead_bytes += length
+            if self.search is not None:
+                self.search.remove(note_id)
+        else:
+            self._offsets[note_id] = (offset, length)
+            if self.search is not None:
+                self.search.add(note_id, record["text"], record["ts"])
+        self._next_id = max(self._next_id, note_id + 1)
+
+    def _read(self, note_id: int) -> Optional[Dict]:
+        location = self._offsets.get(note_id)
+        if location is None:
+            return None
+        self._reader.seek(location[0])
+        record = json.loads(self._reader.read(location[1]))
+        record.pop("op", None)
+        return record
+
+    # ---------- WRITES ---------- #
+
+    def _append(self, record: dict) -> None:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.path, "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._index(record, self._size, len(line))
+        self._size += len(line)
+
+    def add(self, text: str, tags: List[str] = None, ts: float = None) -> Dict:
+        with self._lock:
+            note = {
+                "op": "add",
+                "id": self._next_id,
+                "ts": ts or time.time(),
+                "text": text,
+                "tags": sorted({t.lower() for t in (tags or [])}),
+            }
+            self._append(note)
+        self._maybe_compact()
+        note.pop("op")
+        return note
+
+    def edit(self, note_id: int, text: str, tags: List[str] = None) -> Optional[Dict]:
+        with self._lock:
+            current = self._read(note_id)
+            if current is None:
+                return None
+            note = dict(current, op="edit", text=text, edited=time.time())
+            if tags is not None:
+                note["tags"] = sorted({t.lower() for t in tags})
+            self._append(note)
+        self._maybe_compact()
+        note.pop("op")
+        return note
+
+    def delete(self, note_id: int) -> bool:
+        with self._lock:
+            if note_id not in self._offsets:
+                return False
+            self._append({"op": "del", "id": note_id, "ts": time.time()})
+        self._maybe_compact()
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            with open(self.path, "wb"):
+                pass
+            self._offsets.clear()
+            self._size = 0
+            self._dead_bytes = 0
+            if self.search is not None:
+                self.search.clear()
+            self._append(self._seq_record())
+
+    def _seq_record(self) -> dict:
+        return {"op": "seq", "id": self._next_id - 1}
+
+    # ---------- READS ---------- #
+
+    def get(self, note_id: int) -> Optional[Dict]:
+        with self._lock:
+            return self._read(note_id)
+
+    def last(self, n: int = DEFAULT_LAST_N) -> List[Dict]:
+        """Newest n notes, newest first."""
+        return list(self.iter_notes(newest_first=True, limit=n))
+
+    def iter_notes(self, newest_first: bool = False, limit: int = None) -> Iterator[Dict]:
+        """
+        Lazily yield live notes in creation order (or reversed).
+
+        Ids are taken from the index in doubling chunks, so the first few
+        notes cost the same however long the log is. The index is in id
+        order, which lets each chunk resume after the last id seen even if
+        notes were added or deleted in between.
+        """
+        remaining = limit
+        chunk = ITER_CHUNK
+        last = None
+        while remaining is None or remaining > 0:
+            with self._lock:
+                order = reversed(self._offsets) if newest_first else iter(self._offsets)
+                if last is not None:
+                    order = dropwhile((lambda i: i >= last) if newest_first else (lambda i: i <= last), order)
+                ids = list(islice(order, chunk if remaining is None else min(chunk, remaining)))
+            if not ids:
+                return
+            last = ids[-1]
+            chunk *= 2
+            for note_id in ids:
+                note = self.get(note_id)
+                if note is not None:
+                    if remaining is not None:
+                        remaining -= 1
+                    yield note
+
+    # ---------- COMPACTION ---------- #
+
+    def _maybe_compact(self) -> None:
+        with self._lock:
+            live_bytes = self._size - self._dead_bytes
+            if (self._compacting or self._dead_bytes < COMPACT_MIN_DEAD_BYTES
+                    or self._dead_bytes < live_bytes):
+                return
+            self._compacting = True
+        threading.Thread(target=self.compact, name="huzenix-notes-compact", daemon=True).start()
+
+    def compact(self) -> None:
+        """Rewrite the log with only the latest record of each live note."""
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with self._lock:
+                seq = (json.dumps(self._seq_record()) + "\n").encode("utf-8")
+                offsets, position = {}, len(seq)
+                with open(tmp, "wb") as out:
+                    out.write(seq)
+                    for note_id, (offset, length) in self._offsets.items():
+                        self._reader.seek(offset)
+                        out.write(self._reader.read(length))
+                        offsets[note_id] = (position, length)
+                        position += length
+                    out.flush()
+                    os.fsync(out.fileno())
+                self._reader.close()
+                os.replace(tmp, self.path)
+                self._reader = open(self.path, "rb")
+                self._offsets, self._size, self._dead_bytes = offsets, position, 0
+        except OSError as e:
+            print(f"Notes compaction error: {e}")
+        finally:
+            self._compacting = False
+
 
 class NotesManager:
     """Manages user notes."""
@@ -26,7 +284,63 @@ class NotesManager:
 
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
-        self.file = self.data_dir / "notes.txt"
+        self.legacy_file = self.data_dir / "notes.txt"
+        self.file = self.data_dir / "notes.jsonl"
+
+        migrate = not self.file.exists()
+        # Full-text index is built from the log on startup and kept in step
+        self.index = SearchIndex()
+        self.log = NoteLog(self.file, search=self.index)
+        if migrate:
+            self._migrate_legacy()
+
+    def _migrate_legacy(self) -> None:
+        """Import "[YYYY-mm-dd HH:MM:SS] text" lines from notes.txt once."""
+        if not self.legacy_file.exists():
+            return
+        try:
+            lines = self.legacy_file.read_text(encoding="utf-8").splitlines()
+        except IOError as e:
+            print(f"Error reading legacy notes: {e}")
+            return
+
+        for line in filter(None, (l.strip() for l in lines)):
+            match = LEGACY_LINE_RE.match(line)
+            if match:
+                ts = datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S").timestamp()
+                text = match.group(2)
+            else:
+                ts, text = None, line
+            self.log.add(text, HASHTAG_RE.findall(text), ts=ts)
+
+        if len(self.log):
+            self.legacy_file.replace(self.legacy_file.with_name("notes.txt.migrated"))
+
+    # ---------- FORMATTING ---------- #
+
+    @staticmethod
+    def format_note(note: Dict) -> str:
+        timestamp = datetime.fromtimestamp(note["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+        return f"[{timestamp}] {note['text']}"
+
+    @staticmethod
+    def _spoken(note: Dict) -> str:
+        return f"Note {note['id']}: {note['text']}"
+
+    # ---------- OPERATIONS ---------- #
+
+    def add_note(self, text: str, tags: List[str] = None) -> Dict:
+        """
+        Save a note.
+
+        Args:
+            text: Note content (#hashtags become tags)
+            tags: Extra tags
+
+        Returns:
+            The stored note
+        """
+        return self.log.add(text, list(tags or []) + HASHTAG_RE.findall(text))
 
     def take_note(self) -> bool:
         """
@@ -43,9 +357,7 @@ class NotesManager:
             return False
 
         try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            with open(self.file, "a", encoding="utf-8") as f:
-                f.write(f"[{timestamp}] {note}\n")
+            self.add_note(note)
             speak("Note saved successfully.")
             return True
         except IOError as e:
@@ -53,64 +365,104 @@ class NotesManager:
             print(f"Error saving note: {e}")
             return False
 
-    def read_notes(self) -> bool:
+    def listing(self, n: Optional[int] = None) -> Optional[paging.Pager]:
+        """
+        Newest-first pager over the notes; bodies are read page by page.
+
+        Args:
+            n: Only the newest n notes (default: all)
+
+        Returns:
+            Pager, or None if there are no notes
+        """
+        total = len(self.log)
+        if not total:
+            return None
+        notes = self.log.iter_notes(newest_first=True, limit=n)
+        if n is None or n >= total:
+            heading = f"You have {total} notes. Newest first"
+        else:
+            total = n
+            heading = f"Your latest {n} notes"
+        return paging.Pager((self._spoken(note) for note in notes), total, heading)
+
+    def read_notes(self, n: Optional[int] = None) -> bool:
         """
-        Read and speak all notes.
+        Speak the count and the newest page of notes ("next" continues).
+
+        Args:
+            n: Only the newest n notes (default: all)
 
         Returns:
             True if notes were read, False otherwise
         """
-        if not self.file.exists():
+        pager = self.listing(n)
+        if pager is None:
             speak("You don't have any notes yet.")
             return False
 
-        try:
-            with open(self.file, "r", encoding="utf-8") as f:
-                lines = [line.strip() for line in f if line.strip()]
+        speak(paging.answer(pager))
+        return True
 
-            if not lines:
-                speak("You don't have any notes.")
-                return False
+    def search_notes(
+        self,
+        query: str,
+        k: int = SEARCH_RESULTS,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Tuple[Dict, str]]:
+        """
+        Ranked keyword search.
 
-            speak(f"You have {len(lines)} notes:")
-            for line in lines:
-                print(line)
-                speak(line)
+        Args:
+            query: Keywords ("invoice", "invo*")
+            k: Max results
+            since, until: Optional creation-time bounds
 
-            return True
-        except IOError as e:
-            speak("Sorry, I couldn't read your notes.")
-            print(f"Error reading notes: {e}")
-            return False
+        Returns:
+            (note, snippet) pairs, best first
+        """
+        hits = self.index.search(
+            query,
+            k,
+            since.timestamp() if since else None,
+            until.timestamp() if until else None,
+        )
+        results = []
+        for note_id, _ in hits:
+            note = self.log.get(note_id)
+            if note is not None:
+                results.append((note, snippet(note["text"], query)))
+        return results
+
+    def delete_note(self, note_id: int) -> bool:
+        return self.log.delete(note_id)
+
+    def edit_note(self, note_id: int, text: str) -> Optional[Dict]:
+        return self.log.edit(note_id, text, HASHTAG_RE.findall(text) or None)
 
     def delete_all(self) -> bool:
         """
-        Delete all notes after confirmation.
+        Ask to delete all notes; the next reply confirms or cancels it.
 
         Returns:
-            True if notes were deleted, False otherwise
+            True if the confirmation was asked, False if there are no notes
         """
-        if not self.file.exists():
+        if not len(self.log):
             speak("You don't have any notes to delete.")
             return False
 
-        try:
-            speak("Are you sure you want to delete all notes? Say yes to confirm.")
-            confirmation = listen().lower() if listen() else ""
-
-            if "yes" in confirmation:
-                with open(self.file, "w", encoding="utf-8") as f:
-                    f.truncate(0)
-                speak("All your notes have been deleted.")
-                return True
-            else:
-                speak("Deletion cancelled.")
-                return False
+        question = f"Are you sure you want to delete all {len(self.log)} notes? Say yes to confirm."
+        speak(security.ask_confirmation(question, self._delete_all))
+        return True
 
+    def _delete_all(self) -> str:
+        try:
+            self.log.clear()
         except IOError as e:
-            speak("Sorry, I couldn't delete the notes.")
             print(f"Error deleting notes: {e}")
-            return False
+            return "Sorry, I couldn't delete the notes."
+        return "All your notes have been deleted."
 
     def get_notes(self) -> List[str]:
         """
@@ -119,11 +471,83 @@ class NotesManager:
         Returns:
             List of note strings
         """
-        if not self.file.exists():
-            return []
+        return [self.format_note(note) for note in self.log.iter_notes()]
+
+    # ---------- COMMANDS ---------- #
+
+    def _search_command(self, lower: str) -> str:
+        since = until = None
+        midnight = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        for regex, (start, end) in DATE_FILTERS:
+            match = regex.search(lower)
+            if not match:
+                continue
+            if start == "week":
+                since = midnight - timedelta(days=midnight.weekday())
+            elif start == "month":
+                since = midnight.replace(day=1)
+            else:
+                since = midnight + timedelta(days=start)
+            until = midnight + timedelta(days=end) if end is not None else None
+            lower = lower[: match.start()] + " " + lower[match.end():]
+            break
+
+        keywords = " ".join(w for w in re.findall(r"[\w*]+", lower) if w not in SEARCH_FILLER)
+        if not keywords:
+            return "What should I search your notes for?"
+
+        results = self.search_notes(keywords, since=since, until=until)
+        if not results:
+            return f"No notes found for '{keywords}'."
+        return f"Found {len(results)} notes: " + "; ".join(
+            f"Note {note['id']}: {text}" for note, text in results
+        )
+
+    def handle_command(self, query: str) -> str:
+        """
+        Handle a spoken notes command.
+
+        Examples: "note likho milk lana hai", "last 3 notes", "delete note 4",
+        "edit note 4 to call at 6", "delete all notes".
+
+        Returns:
+            Text to speak
+        """
+        q = query.strip()
+        lower = q.lower()
+
+        # Adding or editing first: note text may itself say "delete" or "all"
+        add = ADD_RE.search(q)
+        edit = EDIT_RE.search(q)
+        if edit and (not add or edit.start() < add.start()):
+            note_id = int(edit.group(1))
+            note = self.edit_note(note_id, edit.group(2).strip())
+            return f"Note {note_id} updated." if note else f"Note {note_id} not found."
+        if add and add.group(1).strip():
+            note = self.add_note(add.group(1).strip())
+            return f"Note {note['id']} saved."
+
+        match = NOTE_ID_RE.search(lower)
+        if DELETE_RE.search(lower):
+            if match:
+                note_id = int(match.group(1))
+                if self.delete_note(note_id):
+                    return f"Note {note_id} deleted."
+                return f"Note {note_id} not found."
+            if re.search(r"\b(?:all|sab|saare)\b", lower):
+                self.delete_all()
+                return ""
+
+        if SEARCH_RE.search(lower):
+            return self._search_command(lower)
+
+        if match:
+            note = self.log.get(int(match.group(1)))
+            return self._spoken(note) if note else f"Note {match.group(1)} not found."
+
+        count = LAST_N_RE.search(lower)
+        pager = self.listing(max(1, int(count.group(1))) if count else None)
+        if pager is None:
+            return "You don't have any notes yet."
+        return paging.answer(pager)
 
-        try:
-            with open(self.file, "r", encoding="utf-8") as f:
-                return [line.strip() for line in f if line.strip()]
-        except IOError:
-            return []
@@ -0,0 +1,691 @@
+"""
+File name index for Huzenix.
+Keeps every file under a root directory in memory so spoken names resolve
+without walking the disk: "report final dot txt" finds docs/report_final.txt.
+
+Names are matched on their stem with everything but letters and digits
+removed (core.fuzzy): exactly, by prefix through a sorted key list, and by
+trigram overlap reranked by edit distance. The extension is compared
+separately. Per-file data lives in flat arrays, so listing by extension or
+recency is one vectorized pass even over a million files.
+
+The first scan runs in the background. On Linux the index then follows
+changes through inotify (called via ctypes); elsewhere, or once the kernel
+runs out of watches, a periodic rescan keeps it current instead.
+"""
+
+import bisect
+import ctypes
+import ctypes.util
+import errno
+import os
+import re
+import select
+import struct
+import sys
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core import metrics
+from core.fuzzy import edit_ratio, normalize, trigrams
+from core.scheduler import DeadlineScheduler
+
+MIN_SCORE = 0.6          # weakest match resolve() returns
+SHORTLIST = 8            # trigram candidates reranked by edit distance
+PREFIX_LIMIT = 16        # keys taken from a prefix match
+BULK_SLICE = 65536       # keys per batch when trigrams are built after a scan
+EXT_MISMATCH = 0.7       # score factor when the spoken extension differs
+DIR_MISMATCH = 0.85      # score factor when a spoken directory isn't in the path
+RESCAN_INTERVAL = 3600   # full rescan while inotify is watching everything
+FALLBACK_RESCAN = 300    # full rescan without inotify
+SKIP_DIRS = frozenset({"__pycache__", "node_modules"})
+SPOKEN_SYMBOLS = {"dot": ".", "slash": "/", "underscore": "_", "dash": "-", "hyphen": "-"}
+SPOKEN_DIGITS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10",
+}
+
+# inotify(7)
+IN_ATTRIB = 0x4
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+WATCH_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+FILES = metrics.gauge("huzenix_file_index_files", "Files in the path index")
+SCAN_LATENCY = metrics.histogram("huzenix_file_index_scan_seconds", "Full path index scans")
+EVENTS = metrics.counter("huzenix_file_index_events_total", "Filesystem change events applied")
+
+
+def split_name(name: str) -> Tuple[str, str]:
+    """("report_final", "txt") for "report_final.txt"; dotfiles have no extension."""
+    stem, dot, ext = name.rpartition(".")
+    if not dot or not stem:
+        return name, ""
+    return stem, ext.lower()
+
+
+def spoken_parts(text: str) -> Tuple[str, str, str]:
+    """
+    Split a spoken file name into (directory, stem, extension).
+
+    "notes slash to do dot txt" -> ("notes", "to do", "txt")
+    """
+    words = [SPOKEN_SYMBOLS.get(w, w) for w in text.lower().replace("\\", "/").split()]
+    joined = re.sub(r"\s*([./_-])\s*", r"\1", " ".join(words)).strip("/ ")
+    directory, _, name = joined.rpartition("/")
+    stem, ext = split_name(name)
+    return directory, stem, normalize(ext)
+
+
+def _trigrams(key: str) -> List[int]:
+    """Distinct trigrams of a padded key: three ASCII bytes packed, else core.fuzzy's hashes."""
+    padded = f"  {key} "
+    if not padded.isascii():
+        return trigrams(key)
+    data = padded.encode("ascii")
+    return sorted({data[i] << 16 | data[i + 1] << 8 | data[i + 2] for i in range(len(data) - 2)})
+
+
+def _bulk_trigrams(keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """_trigrams() of many ASCII keys at once, as (key index, trigram) pairs."""
+    padded = [f"  {key} " for key in keys]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    data = np.frombuffer("".join(padded).encode("ascii"), dtype=np.uint8).astype(np.uint32)
+    grams = data[:-2] << 16 | data[1:-1] << 8 | data[2:]
+    counts = lengths - 2
+    owner = np.repeat(np.arange(len(keys), dtype=np.uint64), counts)
+    # Trigram i of key j starts at offset(j) + i; skip the ones spanning two keys
+    first = np.cumsum(lengths) - lengths
+    first_pair = np.cumsum(counts) - counts
+    pos = np.arange(int(counts.sum())) + np.repeat(first - first_pair, counts)
+    pairs = np.sort(owner << np.uint64(32) | grams[pos])
+    if len(pairs):
+        pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+    return (pairs >> np.uint64(32)).astype(np.int32), (pairs & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def _spoken_digits(text: str) -> str:
+    return " ".join(SPOKEN_DIGITS.get(w, w) for w in text.split())
+
+
+class _Entries:
+    """Index data for one scan of the tree; a full rescan builds a new one."""
+
+    def __init__(self):
+        self.dirs: List[Optional[str]] = []            # dir id -> path relative to root
+        self.dir_ids: Dict[str, int] = {}
+        self.names: List[Optional[str]] = []           # slot -> file name, None when free
+        self.slot_dir = array("i")
+        self.slot_key = array("i")                     # -1 when free
+        self.slot_ext = array("i")
+        self.slot_next = array("i")                    # next slot with the same key
+        self.mtimes = array("d")
+        self.free: List[int] = []
+        self.count = 0
+
+        self.keys: List[str] = []
+        self.key_ids: Dict[str, int] = {}
+        self.key_head = array("i")                     # key -> first slot, -1 if none
+        self.key_ntri = array("i")
+        self.postings: Dict[int, array] = {}           # trigram -> key ids
+        self.sorted_keys: List[str] = []               # kept sorted once finish() ran
+        self._sorted = False
+
+        self.exts: List[str] = []
+        self.ext_ids: Dict[str, int] = {}
+
+    # ---------- UPDATES ---------- #
+
+    def add_dir(self, rel: str) -> int:
+        d = self.dir_ids.get(rel)
+        if d is None:
+            d = self.dir_ids[rel] = len(self.dirs)
+            self.dirs.append(rel)
+        return d
+
+    def _key(self, key: str) -> int:
+        k = self.key_ids.get(key)
+        if k is None:
+            k = self.key_ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.key_head.append(-1)
+            if not self._sorted:
+                # Bulk scan: trigrams are computed by finish()
+                self.key_ntri.append(0)
+                return k
+            grams = _trigrams(key)
+            self.key_ntri.append(len(grams))
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array("i")
+                posting.append(k)
+            bisect.insort(self.sorted_keys, key)
+        return k
+
+    def _ext(self, ext: str) -> int:
+        e = self.ext_ids.get(ext)
+        if e is None:
+            e = self.ext_ids[ext] = len(self.exts)
+            self.exts.append(ext)
+        return e
+
+    @staticmethod
+    def name_key(name: str) -> str:
+        stem, _ = split_name(name)
+        return normalize(stem) or name.lower()
+
+    def find(self, rel_dir: str, name: str) -> Optional[int]:
+        """Slot of a file, by walking the slots that share its key."""
+        d = self.dir_ids.get(rel_dir)
+        k = self.key_ids.get(self.name_key(name))
+        if d is None or k is None:
+            return None
+        for slot in self.slots(k):
+            if self.slot_dir[slot] == d and self.names[slot] == name:
+                return slot
+        return None
+
+    def add(self, rel_dir: str, name: str, mtime: float, check: bool = True) -> None:
+        """
+        Add a file, or update its mtime if it is already indexed.
+
+        check=False skips the lookup for files known to be new (a fresh scan).
+        """
+        slot = self.find(rel_dir, name) if check else None
+        if slot is not None:
+            self.mtimes[slot] = mtime
+            return
+
+        d = self.add_dir(rel_dir)
+        k = self._key(self.name_key(name))
+        e = self._ext(split_name(name)[1])
+        if self.free:
+            slot = self.free.pop()
+            self.names[slot] = name
+            self.slot_dir[slot], self.slot_key[slot], self.slot_ext[slot] = d, k, e
+            self.mtimes[slot] = mtime
+        else:
+            slot = len(self.names)
+            self.names.append(name)
+            self.slot_dir.append(d)
+            self.slot_key.append(k)
+            self.slot_ext.append(e)
+            self.slot_next.append(-1)
+            self.mtimes.append(mtime)
+        self.slot_next[slot] = self.key_head[k]
+        self.key_head[k] = slot
+        self.count += 1
+
+    def _free(self, slot: int) -> None:
+        k = self.slot_key[slot]
+        if self.key_head[k] == slot:
+            self.key_head[k] = self.slot_next[slot]
+        else:
+            prev = self.key_head[k]
+            while self.slot_next[prev] != slot:
+                prev = self.slot_next[prev]
+            self.slot_next[prev] = self.slot_next[slot]
+        self.names[slot] = None
+        self.slot_key[slot] = -1
+        self.free.append(slot)
+        self.count -= 1
+
+    def remove(self, rel_dir: str, name: str) -> bool:
+        slot = self.find(rel_dir, name)
+        if slot is None:
+            return False
+        self._free(slot)
+        return True
+
+    def remove_tree(self, rel: str) -> None:
+        """Forget a directory and everything below it."""
+        prefix = rel + "/"
+        doomed = [d for path, d in self.dir_ids.items() if path == rel or path.startswith(prefix)]
+        if not doomed:
+            return
+        live = np.frombuffer(self.slot_key, dtype=np.int32) >= 0
+        in_tree = np.isin(np.frombuffer(self.slot_dir, dtype=np.int32), doomed)
+        for slot in np.flatnonzero(live & in_tree).tolist():
+            self._free(slot)
+        for d in doomed:
+            del self.dir_ids[self.dirs[d]]
+            self.dirs[d] = None
+
+    def finish(self) -> None:
+        """Build trigram postings and the sorted key list after a bulk scan; later keys update them in place."""
+        ascii_ids = np.array([k for k, key in enumerate(self.keys) if key.isascii()], dtype=np.int32)
+        owner_parts, gram_parts = [], []
+        # In slices, to bound the temporary arrays
+        for start in range(0, len(ascii_ids), BULK_SLICE):
+            ids = ascii_ids[start:start + BULK_SLICE]
+            owners, grams = _bulk_trigrams([self.keys[k] for k in ids.tolist()])
+            owner_parts.append(ids[owners])
+            gram_parts.append(grams)
+        others = [(k, gram) for k, key in enumerate(self.keys) if not key.isascii() for gram in _trigrams(key)]
+        owner_parts.append(np.array([k for k, _ in others], dtype=np.int32))
+        gram_parts.append(np.array([g for _, g in others], dtype=np.uint32))
+        owners, grams = np.concatenate(owner_parts), np.concatenate(gram_parts)
+
+        ntri = np.bincount(owners, minlength=len(self.keys)).astype(np.int32)
+        self.key_ntri = array("i", ntri.tobytes())
+        order = np.argsort(grams, kind="stable")
+        grams, owners = grams[order], owners[order]
+        if len(grams):
+            starts = np.flatnonzero(np.r_[True, grams[1:] != grams[:-1]])
+            ends = np.r_[starts[1:], len(grams)]
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self.postings[int(grams[start])] = array("i", owners[start:end].tobytes())
+        self.sorted_keys = sorted(self.keys)
+        self._sorted = True
+
+    # ---------- QUERIES ---------- #
+
+    def path(self, slot: int) -> str:
+        d = self.dirs[self.slot_dir[slot]]
+        return f"{d}/{self.names[slot]}" if d else self.names[slot]
+
+    def slots(self, k: int) -> Iterator[int]:
+        slot = self.key_head[k]
+        while slot != -1:
+            yield slot
+            slot = self.slot_next[slot]
+
+    def prefix_keys(self, prefix: str, limit: int = PREFIX_LIMIT) -> List[int]:
+        """Live keys starting with prefix, in key order."""
+        found = []
+        i = bisect.bisect_left(self.sorted_keys, prefix)
+        while i < len(self.sorted_keys) and len(found) < limit:
+            key = self.sorted_keys[i]
+            if not key.startswith(prefix):
+                break
+            k = self.key_ids[key]
+            if self.key_head[k] != -1:
+                found.append(k)
+            i += 1
+        return found
+
+    def fuzzy_keys(self, key: str) -> List[Tuple[float, int]]:
+        """(score, key id) for live keys sharing trigrams with key, best first."""
+        query = _trigrams(key)
+        parts = [np.frombuffer(self.postings[g], dtype=np.int32) for g in query if g in self.postings]
+        if not parts:
+            return []
+        shared = np.bincount(np.concatenate(parts))
+        candidates = np.flatnonzero(shared)
+        candidates = candidates[np.frombuffer(self.key_head, dtype=np.int32)[candidates] >= 0]
+        if not len(candidates):
+            return []
+        dice = 2.0 * shared[candidates] / (len(query) + np.frombuffer(self.key_ntri, dtype=np.int32)[candidates])
+        if len(dice) > SHORTLIST:
+            top = np.argpartition(-dice, SHORTLIST - 1)[:SHORTLIST]
+        else:
+            top = np.arange(len(dice))
+        top = top[dice[top] >= 0.5 * dice[top].max()]
+
+        scored = []
+        for i in top:
+            k = int(candidates[i])
+            # Trigrams find the neighbourhood; edit distance orders it
+            scored.append((0.5 * float(dice[i]) + 0.5 * edit_ratio(key, self.keys[k]), k))
+        scored.sort(key=lambda item: -item[0])
+        return scored
+
+    def select(self, ext: Optional[str] = None, directory: Optional[str] = None) -> np.ndarray:
+        """Live slots, optionally with one extension and/or in one directory."""
+        mask = np.frombuffer(self.slot_key, dtype=np.int32) >= 0
+        if directory is not None:
+            mask &= np.frombuffer(self.slot_dir, dtype=np.int32) == self.dir_ids.get(directory, -1)
+        if ext is not None:
+            mask &= np.frombuffer(self.slot_ext, dtype=np.int32) == self.ext_ids.get(ext, -1)
+        return np.flatnonzero(mask)
+
+    def newest_first(self, slots: np.ndarray, first: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(the `first` newest slots in order, all slots ordered by mtime, newest first)."""
+        mtimes = np.frombuffer(self.mtimes, dtype=np.float64)[slots]
+        if len(slots) > first:
+            top = np.argpartition(-mtimes, first - 1)[:first]
+            top = top[np.argsort(-mtimes[top], kind="stable")]
+        else:
+            top = np.argsort(-mtimes, kind="stable")
+        return slots[top], mtimes
+
+
+class _Inotify:
+    """Just enough of inotify(7) over ctypes: directory watches and their events."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, str] = {}  # watch descriptor -> dir relative to root
+        self.full = False               # out of watches: rescans must cover the rest
+
+    def add(self, path: str, rel: str) -> None:
+        if self.full:
+            return
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self.dirs[wd] = rel
+        elif ctypes.get_errno() == errno.ENOSPC:
+            print("File index: out of inotify watches, falling back to rescans")
+            self.full = True
+
+    def remove_tree(self, rel: str) -> None:
+        prefix = rel + "/"
+        for wd, path in list(self.dirs.items()):
+            if path == rel or path.startswith(prefix):
+                self._rm_watch(self.fd, wd)
+                self.dirs.pop(wd, None)
+
+    def read(self, timeout: float) -> List[Tuple[Optional[str], int]]:
+        """Pending events as (path relative to root, mask); waits up to timeout."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            raw = data[offset + EVENT_HEADER.size: offset + EVENT_HEADER.size + length]
+            offset += EVENT_HEADER.size + length
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            rel = self.dirs.get(wd)
+            if mask & IN_Q_OVERFLOW or rel is None:
+                events.append((None, mask))
+                continue
+            name = os.fsdecode(raw.split(b"\0", 1)[0])
+            events.append((f"{rel}/{name}" if rel else name, mask))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PathIndex:
+    """In-memory index of the files below root; see the module docstring."""
+
+    def __init__(
+        self,
+        root,
+        include_hidden: bool = False,
+        watch: bool = True,
+        rescan_interval: Optional[float] = None,
+    ):
+        """
+        Args:
+            root: Directory to index
+            include_hidden: Also index dotfiles and dot-directories
+            watch: Follow changes through inotify where available
+            rescan_interval: Seconds between full rescans (default: RESCAN_INTERVAL
+                             while inotify covers the tree, FALLBACK_RESCAN otherwise)
+        """
+        self.root = Path(root).resolve()
+        self.include_hidden = include_hidden
+        self.watch = watch
+        self.rescan_interval = rescan_interval
+        self._entries = _Entries()
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._backlog: Optional[List[str]] = None  # paths changed during a rescan
+        self._watcher: Optional[_Inotify] = None
+        self._closed = False
+        self._rescans = DeadlineScheduler(self._rescan_due, name="huzenix-file-rescan")
+        FILES.track(self, len)
+
+    def __len__(self) -> int:
+        return self._entries.count
+
+    def start(self) -> "PathIndex":
+        """Scan in the background and start following changes; returns at once."""
+        if self.watch and sys.platform.startswith("linux"):
+            try:
+                self._watcher = _Inotify()
+                threading.Thread(target=self._follow, name="huzenix-file-watch", daemon=True).start()
+            except (OSError, AttributeError) as e:
+                print(f"File index: inotify unavailable ({e}), using rescans")
+        threading.Thread(target=self.rescan, name="huzenix-file-scan", daemon=True).start()
+        return self
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until the first scan is done (True) or timeout passes (False)."""
+        return self._ready.wait(timeout)
+
+    def close(self) -> None:
+        self._closed = True
+        self._rescans.stop()
+        if self._watcher is not None:
+            self._watcher.close()
+
+    # ---------- SCANNING ---------- #
+
+    def _skipped(self, name: str) -> bool:
+        return name in SKIP_DIRS or (not self.include_hidden and name.startswith("."))
+
+    def _scan(self, entries: _Entries, rel_dir: str, check: bool = True) -> None:
+        stack = [rel_dir]
+        while stack:
+            rel = stack.pop()
+            path = os.path.join(self.root, rel)
+            if self._watcher is not None:
+                self._watcher.add(path, rel)
+            try:
+                listing = os.scandir(path)
+            except OSError:
+                continue
+            entries.add_dir(rel)
+            with listing:
+                for entry in listing:
+                    if not self.include_hidden and entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIP_DIRS:
+                                stack.append(f"{rel}/{entry.name}" if rel else entry.name)
+                        elif entry.is_file():
+                            entries.add(rel, entry.name, entry.stat().st_mtime, check)
+                    except OSError:
+                        continue
+
+    def rescan(self) -> None:
+        """Rebuild the index from disk; queries keep using the old one until it is done."""
+        with self._lock:
+            self._backlog = []
+        with SCAN_LATENCY.time():
+            entries = _Entries()
+            self._scan(entries, "", check=False)
+            entries.finish()
+
+        with self._lock:
+            self._entries = entries
+            backlog, self._backlog = self._backlog, None
+            for rel in backlog:
+                self._refresh(rel)
+        self._ready.set()
+
+        interval = self.rescan_interval
+        if interval is None:
+            watching = self._watcher is not None and not self._watcher.full
+            interval = RESCAN_INTERVAL if watching else FALLBACK_RESCAN
+        if not self._closed:
+            self._rescans.schedule("rescan", time.time() + interval)
+            self._rescans.start()
+
+    def _rescan_due(self, _: str) -> None:
+        if not self._closed:
+            self.rescan()
+
+    # ---------- CHANGES ---------- #
+
+    def _follow(self) -> None:
+        while not self._closed:
+            try:
+                events = self._watcher.read(1.0)
+            except (OSError, ValueError) as e:
+                if not self._closed:
+                    print(f"File watch error: {e}")
+                return
+            for rel, mask in events:
+                if rel is None:
+                    # Queue overflow or an unknown watch: only a rescan can tell
+                    self._rescans.schedule("rescan", time.time())
+                else:
+                    self.refresh(rel)
+            EVENTS.inc(len(events))
+
+    def refresh(self, path) -> None:
+        """
+        Bring one path up to date with the disk (file, directory or gone).
+
+        Args:
+            path: Absolute, or relative to root
+        """
+        path = Path(path)
+        try:
+            rel = (path if path.is_absolute() else self.root / path).relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        if rel == "." or any(self._skipped(part) for part in rel.split("/")):
+            return
+        with self._lock:
+            self._refresh(rel)
+            if self._backlog is not None:
+                self._backlog.append(rel)
+
+    def _refresh(self, rel: str) -> None:
+        rel_dir, _, name = rel.rpartition("/")
+        full = os.path.join(self.root, rel)
+        entries = self._entries
+        if os.path.isdir(full) and not os.path.islink(full):
+            self._scan(entries, rel)
+            return
+        try:
+            if os.path.isfile(full):
+                entries.add(rel_dir, name, os.stat(full).st_mtime)
+                return
+        except OSError:
+            pass
+        if not entries.remove(rel_dir, name):
+            entries.remove_tree(rel)
+            if self._watcher is not None:
+                self._watcher.remove_tree(rel)
+
+    # ---------- QUERIES ---------- #
+
+    def resolve(self, spoken: str, limit: int = 3) -> List[Dict]:
+        """
+        Files whose names best match a spoken name, best first.
+
+        Args:
+            spoken: e.g. "report final dot txt", "notes slash todo"
+            limit: Most matches returned
+
+        Returns:
+            [{"path": Path, "relative": str, "score": float}] for matches
+            scoring at least MIN_SCORE; 1.0 means the stem and extension
+            matched exactly. Equal scores are ordered newest first.
+        """
+        directory, stem, ext = spoken_parts(spoken)
+        with self._lock:
+            entries = self._entries
+            words = stem.split()
+            if not ext and len(words) > 1 and normalize(words[-1]) in entries.ext_ids:
+                # "report final txt": the dot wasn't heard
+                stem, ext = " ".join(words[:-1]), normalize(words[-1])
+
+            scores: Dict[int, float] = {}
+            for key in {normalize(stem), normalize(_spoken_digits(stem))}:
+                if not key:
+                    continue
+                k = entries.key_ids.get(key)
+                if k is not None and entries.key_head[k] != -1:
+                    scores[k] = 1.0
+                    continue
+                for k in entries.prefix_keys(key):
+                    scores[k] = max(scores.get(k, 0.0), 0.6 + 0.3 * len(key) / len(entries.keys[k]))
+                for score, k in entries.fuzzy_keys(key):
+                    scores[k] = max(scores.get(k, 0.0), score)
+
+            dir_key = normalize(directory)
+            ext_id = entries.ext_ids.get(ext, -1) if ext else None
+            ranked = []
+            for k, score in scores.items():
+                for slot in entries.slots(k):
+                    factor = 1.0
+                    if ext_id is not None and entries.slot_ext[slot] != ext_id:
+                        factor *= EXT_MISMATCH
+                    if dir_key and dir_key not in normalize(entries.dirs[entries.slot_dir[slot]]):
+                        factor *= DIR_MISMATCH
+                    if score * factor >= MIN_SCORE:
+                        ranked.append((score * factor, entries.mtimes[slot], slot))
+            ranked.sort(key=lambda item: (-item[0], -item[1]))
+
+            matches = []
+            for score, _, slot in ranked[:limit]:
+                rel = entries.path(slot)
+                matches.append({"path": self.root / rel, "relative": rel, "score": round(score, 3)})
+            return matches
+
+    def has_extension(self, ext: str) -> bool:
+        # The watcher can't append to slot_ext while its buffer is exported here
+        with self._lock:
+            entries = self._entries
+            e = entries.ext_ids.get(ext.lower().lstrip("."))
+            return e is not None and bool((np.frombuffer(entries.slot_ext, dtype=np.int32) == e).any())
+
+    def files(self, ext: Optional[str] = None, directory: Optional[str] = None, first: int = 16) -> Tuple[int, Iterator[str]]:
+        """
+        Indexed files, newest first.
+
+        Args:
+            ext: Only this extension ("pdf")
+            directory: Only files directly in this directory, relative to
+                       root ("" is the root itself); None means the whole tree
+            first: How many are ordered up front; the rest are sorted
+                   only if the iterator gets that far
+
+        Returns:
+            (count, lazy iterator of paths relative to root)
+        """
+        with self._lock:
+            entries = self._entries
+            slots = entries.select(ext.lower().lstrip(".") if ext else None, directory)
+            top, mtimes = entries.newest_first(slots, first)
+
+        def path(slot: int) -> Optional[str]:
+            with self._lock:
+                return entries.path(slot) if entries.names[slot] is not None else None
+
+        def paths() -> Iterator[str]:
+            # Files removed since the count was taken are skipped
+            for slot in top.tolist():
+                rel = path(slot)
+                if rel is not None:
+                    yield rel
+            if len(slots) > len(top):
+                seen = set(top.tolist())
+                for slot in slots[np.argsort(-mtimes, kind="stable")].tolist():
+                    rel = path(slot) if slot not in seen else None
+                    if rel is not None:
+                        yield rel
+
+        return len(slots), paths()
@@ -3,26 +3,146 @@ Reminders module for Huzenix.
 Manages reminder creation, display, and checking.
 """
 
-import json
+import bisect
+import calendar
+import re
+import threading
+import uuid
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from zoneinfo import ZoneInfo
-from typing import List, Dict, Optional
-import dateparser
+from typing import Any, Callable, Iterator, List, Dict, Optional, Tuple
 
 from core.voice_output import speak
 from core.voice_input import listen
+from core import metrics, paging
+from core.scheduler import DeadlineScheduler
+from core.storage import JournaledStore
+from core.time_parser import parse_time
+
+FIRE_LAG = metrics.histogram(
+    "huzenix_reminder_fire_lag_seconds",
+    "Delay between a reminder's due time and when it was spoken",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 900, 3600),
+)
+
+PAGE_SIZE = paging.PAGE_SIZE  # reminders per page
+MAX_EXPANSION = 500  # occurrences of one series listed per query window
+SLOW_SPLITS = 1      # time-phrase splits of a command tried with dateparser
+
+PENDING = metrics.gauge("huzenix_reminders_pending", "Reminders not yet fired")
+
+SET_RE = re.compile(r"\bremind me (?:to |about )?(?P<rest>.+)$")
+TIME_START_RE = re.compile(
+    r"\s(?=(?:in|at|after|on|tomorrow|today|tonight|kal|aaj|parso|next"
+    r"|subah|dopahar|shaam|sham|raat|morning|afternoon|evening"
+    r"|\d+(?::\d+)?\s*(?:baje|am|pm|min\w*|ghant\w*|hours?|days?|din))\b)"
+)
+NEXT_N_RE = re.compile(r"\b(?:next|agle|agli)\s+(\d+)\b")
+TAG_BEFORE_RE = re.compile(r"\b(\w+)\s+(?:tag|category)\b")
+TAG_AFTER_RE = re.compile(r"\b(?:tag|category)\s+(\w+)\b")
+TAG_FILLER = frozenset("a the with this under in of for wale wali ka ki ke all sab show".split())
+
+# Recurrence phrases -> rule (freq, interval, day); "start" is added on create
+REPEAT_PATTERNS = [
+    (re.compile(r"\b(?:every|har)\s+(\d+)\s+(?:hours?|ghante?)\b"),
+     lambda m: {"freq": "hourly", "interval": int(m.group(1))}),
+    (re.compile(r"\b(?:every\s+hour|har\s+ghante?|hourly)\b"),
+     lambda m: {"freq": "hourly", "interval": 1}),
+    (re.compile(r"\b(?:every\s+weekdays?|on\s+weekdays|weekdays)\b"),
+     lambda m: {"freq": "weekdays", "interval": 1}),
+    (re.compile(r"\b(?:every\s+(\d+)\s+days)\b"),
+     lambda m: {"freq": "daily", "interval": int(m.group(1))}),
+    (re.compile(r"\b(?:every\s+day|daily|rozana|roz|har\s+din)\b"),
+     lambda m: {"freq": "daily", "interval": 1}),
+    (re.compile(r"\b(?:every\s+week|weekly|har\s+hafte)\b"),
+     lambda m: {"freq": "daily", "interval": 7}),
+    (re.compile(r"\b(?:every\s+month|monthly|har\s+mahine)(?:\s+on)?(?:\s+(?:the|day))?"
+                r"(?:\s+(\d{1,2})(?:st|nd|rd|th)?)?\b"),
+     lambda m: {"freq": "monthly", "interval": 1, **({"day": int(m.group(1))} if m.group(1) else {})}),
+]
+
+
+class ReminderIndex:
+    """
+    Sorted (fire time, id) lists, overall and per tag, kept in step with the
+    store so time-range and tag queries are bisects instead of scans.
+    """
+
+    def __init__(self):
+        self._all: List[Tuple[float, str]] = []
+        self._by_tag: Dict[str, List[Tuple[float, str]]] = {}
+        self._keys: Dict[str, Tuple[float, str]] = {}  # id -> (fire time, tag)
+        self._lock = threading.RLock()  # the timer thread removes fired ids
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, reminder_id: str, fire_at: float, tag: str) -> None:
+        with self._lock:
+            self.remove(reminder_id)
+            entry = (fire_at, reminder_id)
+            bisect.insort(self._all, entry)
+            bisect.insort(self._by_tag.setdefault(tag, []), entry)
+            self._keys[reminder_id] = (fire_at, tag)
+
+    def remove(self, reminder_id: str) -> None:
+        with self._lock:
+            key = self._keys.pop(reminder_id, None)
+            if key is None:
+                return
+            fire_at, tag = key
+            for entries in (self._all, self._by_tag[tag]):
+                i = bisect.bisect_left(entries, (fire_at, reminder_id))
+                if i < len(entries) and entries[i] == (fire_at, reminder_id):
+                    del entries[i]
+            if not self._by_tag[tag]:
+                del self._by_tag[tag]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._all.clear()
+            self._by_tag.clear()
+            self._keys.clear()
+
+    def tags(self) -> List[str]:
+        with self._lock:
+            return sorted(self._by_tag)
+
+    def range(
+        self,
+        start: float = None,
+        end: float = None,
+        tag: str = None,
+        offset: int = 0,
+        limit: int = None,
+    ) -> Tuple[List[str], int]:
+        """
+        Ids with start <= fire time < end, earliest first.
+
+        Returns:
+            (ids of the requested page, total matches)
+        """
+        with self._lock:
+            entries = self._all if tag is None else self._by_tag.get(tag, [])
+            lo = 0 if start is None else bisect.bisect_left(entries, (start, ""))
+            hi = len(entries) if end is None else bisect.bisect_left(entries, (end, ""))
+            total = max(0, hi - lo)
+            first = lo + offset
+            last = hi if limit is None else min(hi, first + limit)
+            return [rid for _, rid in entries[first:last]], total
 
 
 class ReminderManager:
     """Manages reminders with timezone support."""
 
-    def __init__(self, data_dir: Path = None):
+    def __init__(self, data_dir: Path = None, on_fire: Callable[[Dict], None] = None):
         """
         Initialize reminder manager.
 
         Args:
             data_dir: Directory for reminder storage
+            on_fire: Called with each due reminder (default: speak it)
         """
         if data_dir is None:
             data_dir = Path(__file__).parent.parent / "data"
@@ -31,22 +151,51 @@ class ReminderManager:
         self.data_dir.mkdir(exist_ok=True)
         self.file = self.data_dir / "reminders.json"
         self.timezone = "Asia/Kolkata"
-        self.reminders = self._load()
+        self.store = JournaledStore(
+            self.file, default={"reminders": {}}, migrate=_migrate_legacy
+        )
 
-    def _load(self) -> List[Dict]:
-        """Load reminders from file."""
-        if not self.file.exists():
-            return []
-        try:
-            with open(self.file, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return []
+        # Parsed once: a min-heap by UTC fire time (start() runs the timer
+        # thread) and sorted indexes for time-range / tag queries
+        self.on_fire = on_fire
+        self.scheduler = DeadlineScheduler(self._fire, name="huzenix-reminders")
+        self.index = ReminderIndex()
+        self._series = set()  # ids of recurring reminders
+        for reminder in self.reminders:
+            self._schedule(reminder)
+
+        PENDING.track(self, lambda manager: len(manager.store.data["reminders"]))
 
-    def _save(self) -> None:
-        """Save reminders to file."""
-        with open(self.file, "w", encoding="utf-8") as f:
-            json.dump(self.reminders, f, indent=2)
+    @property
+    def reminders(self) -> List[Dict]:
+        """All reminders, in creation order."""
+        return list(self.store.data["reminders"].values())
+
+    def start(self, on_fire: Callable[[Dict], None] = None) -> None:
+        """
+        Fire reminders on time from a background thread.
+
+        Args:
+            on_fire: Replaces the constructor's on_fire (runs on the timer thread)
+        """
+        if on_fire is not None:
+            self.on_fire = on_fire
+        self.scheduler.start()
+
+    def _schedule(self, reminder: Dict) -> None:
+        fire_at = self._parse_iso_time(reminder.get("time", ""))
+        if fire_at is None:
+            return
+        ts = fire_at.timestamp()
+        # A series is one entry: only its next occurrence is queued, and
+        # listings expand it on demand
+        if reminder.get("repeat"):
+            self._series.add(reminder["id"])
+        else:
+            self.index.add(reminder["id"], ts, reminder.get("tag", "uncategorized").lower())
+        self.scheduler.schedule(reminder["id"], ts)
+
+    # ---------- CREATE ---------- #
 
     def set_reminder(
         self,
@@ -54,6 +203,7 @@ class ReminderManager:
         time_str: str,
         city: Optional[str] = None,
         tag: str = "uncategorized",
+        repeat: Optional[Dict] = None,
     ) -> bool:
         """
         Set a new reminder.
@@ -63,48 +213,62 @@ class ReminderManager:
             time_str: Natural language time expression
             city: City/location (optional)
             tag: Category tag (default: uncategorized)
+            repeat: Recurrence rule, e.g. {"freq": "daily"},
+                {"freq": "hourly", "interval": 3}, {"freq": "weekdays"},
+                {"freq": "monthly", "day": 5}; time_str gives the first time
 
         Returns:
             True if successful, False otherwise
         """
-        settings = {
-            "TIMEZONE": self.timezone,
-            "RETURN_AS_TIMEZONE_AWARE": True,
-        }
-        reminder_time = dateparser.parse(time_str, settings=settings)
-
+        reminder_time = self._parse_time(time_str)
         if reminder_time is None:
             speak("Sorry, I couldn't understand the reminder time.")
             return False
 
-        # Ensure timezone-aware
-        if reminder_time.tzinfo is None:
-            try:
-                reminder_time = reminder_time.replace(
-                    tzinfo=ZoneInfo(self.timezone)
-                )
-            except Exception:
-                speak("Could not assign timezone to the reminder time.")
-                return False
+        _, message = self._create(text, reminder_time, city, tag, repeat)
+        speak(message)
+        return True
+
+    def _parse_time(self, time_str: str, fast_only: bool = False) -> Optional[datetime]:
+        """Natural language time -> timezone-aware datetime (None if unparseable)."""
+        return parse_time(time_str, self.timezone, fast_only=fast_only)
+
+    def _create(
+        self,
+        text: str,
+        reminder_time: datetime,
+        city: Optional[str],
+        tag: str,
+        repeat: Optional[Dict] = None,
+    ) -> Tuple[Dict, str]:
+        if repeat:
+            # The rule is anchored at the requested time; the first
+            # occurrence is the next one from now
+            tz = ZoneInfo(self.timezone)
+            repeat = dict(repeat, start=reminder_time.astimezone(tz).isoformat())
+            reminder_time = next(occurrences(repeat, datetime.now(tz), tz))
 
         # Store in UTC for consistency
         reminder_utc = reminder_time.astimezone(ZoneInfo("UTC"))
 
-        self.reminders.append(
-            {
-                "text": text,
-                "time": reminder_utc.isoformat(),
-                "city": city or "default (IST)",
-                "tag": tag.lower(),
-            }
-        )
+        reminder_id = _new_id()
+        reminder = {
+            "id": reminder_id,
+            "text": text,
+            "time": reminder_utc.isoformat(),
+            "city": city or "default (IST)",
+            "tag": tag.lower(),
+        }
+        if repeat:
+            reminder["repeat"] = repeat
+        self.store.set_item("reminders", reminder_id, reminder)
+        self._schedule(reminder)
 
-        self._save()
         formatted_time = reminder_time.strftime("%A, %d %B %Y at %I:%M %p")
-        speak(
-            f"Reminder set for {formatted_time} under category '{tag}'"
-        )
-        return True
+        message = f"Reminder set for {formatted_time} under category '{tag}'"
+        if repeat:
+            message += f", repeating {describe_repeat(repeat)}"
+        return reminder, message
 
     def _parse_iso_time(self, iso_str: str) -> Optional[datetime]:
         """Parse ISO formatted time string."""
@@ -116,65 +280,258 @@ class ReminderManager:
         except (ValueError, TypeError):
             return None
 
-    def show_all(self) -> None:
-        """Display all reminders."""
-        if not self.reminders:
-            speak("You have no reminders saved.")
-            return
+    # ---------- QUERIES ---------- #
 
-        speak(f"You have {len(self.reminders)} reminders:")
-        for reminder in self.reminders:
-            self._speak_reminder(reminder)
+    def query(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        tag: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = PAGE_SIZE,
+    ) -> Tuple[List[Dict], int]:
+        """
+        Reminders due in [start, end), optionally with a tag, earliest first.
 
-    def show_upcoming(self) -> None:
-        """Display upcoming reminders."""
-        now_utc = datetime.now(ZoneInfo("UTC"))
-        upcoming = [
-            r
-            for r in self.reminders
-            if (self._parse_iso_time(r.get("time", "")) or now_utc) > now_utc
-        ]
+        Args:
+            start, end: Timezone-aware bounds (None = open)
+            tag: Only this tag
+            offset, limit: Page to return (limit=None for all)
 
-        if not upcoming:
-            speak("You have no upcoming reminders.")
-            return
+        Returns:
+            (reminders on the page, total matches)
+        """
+        tag = tag.lower() if tag else None
+        series = self._expand_series(start, end, tag)
+        if not series:
+            ids, total = self.index.range(
+                start.timestamp() if start else None,
+                end.timestamp() if end else None,
+                tag,
+                offset,
+                limit,
+            )
+            reminders = self.store.data["reminders"]
+            return [reminders[i] for i in ids if i in reminders], total
+
+        # One-shots up to the end of the page, merged with series occurrences
+        ids, total = self.index.range(
+            start.timestamp() if start else None,
+            end.timestamp() if end else None,
+            tag,
+            0,
+            None if limit is None else offset + limit,
+        )
+        reminders = self.store.data["reminders"]
+        items = [(self._parse_iso_time(reminders[i]["time"]), reminders[i]) for i in ids if i in reminders]
+        items.extend(series)
+        items.sort(key=lambda item: item[0])
+        page = items[offset:] if limit is None else items[offset:offset + limit]
+        return [reminder for _, reminder in page], total + len(series)
+
+    def _expand_series(
+        self, start: Optional[datetime], end: Optional[datetime], tag: Optional[str]
+    ) -> List[Tuple[datetime, Dict]]:
+        """
+        Occurrences of recurring reminders in [start, end). An open-ended
+        window yields only each series' next occurrence; so does one with
+        no bounds at all (e.g. every reminder with a tag).
+        """
+        if not self._series or (start is None and end is not None):
+            return []
+        if start is None:
+            start = datetime.now(ZoneInfo("UTC"))
+
+        tz = ZoneInfo(self.timezone)
+        reminders = self.store.data["reminders"]
+        expanded = []
+        for reminder_id in list(self._series):
+            reminder = reminders.get(reminder_id)
+            if reminder is None or (tag and reminder.get("tag") != tag):
+                continue
+            for n, when in enumerate(occurrences(reminder["repeat"], start, tz)):
+                if (end is not None and when >= end) or n >= MAX_EXPANSION:
+                    break
+                expanded.append((when, dict(reminder, time=when.astimezone(ZoneInfo("UTC")).isoformat())))
+                if end is None:
+                    break
+        return expanded
+
+    def upcoming(self, offset: int = 0, limit: Optional[int] = PAGE_SIZE) -> Tuple[List[Dict], int]:
+        return self.query(start=datetime.now(ZoneInfo("UTC")), offset=offset, limit=limit)
+
+    def expired(self, offset: int = 0, limit: Optional[int] = PAGE_SIZE) -> Tuple[List[Dict], int]:
+        return self.query(end=datetime.now(ZoneInfo("UTC")), offset=offset, limit=limit)
+
+    def _day_window(self, days_ahead: int, span_days: int = 1) -> Tuple[datetime, datetime]:
+        local_now = datetime.now(ZoneInfo(self.timezone))
+        start = local_now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=days_ahead)
+        return start, start + timedelta(days=span_days)
+
+    def handle_command(self, query: str) -> str:
+        """
+        Handle a spoken reminders command.
 
-        speak(f"You have {len(upcoming)} upcoming reminders:")
-        for reminder in upcoming:
-            self._speak_reminder(reminder)
+        Examples: "remind me to call mom in 2 hours", "kal ke reminders",
+        "next 5 reminders", "work tag this week", "delete all reminders".
 
-    def show_expired(self) -> None:
-        """Display expired reminders."""
-        now_utc = datetime.now(ZoneInfo("UTC"))
-        expired = [
-            r
-            for r in self.reminders
-            if (self._parse_iso_time(r.get("time", "")) or now_utc) <= now_utc
+        Returns:
+            Text to speak
+        """
+        q = query.lower().strip()
+
+        match = SET_RE.search(q)
+        if match:
+            return self._set_from_command(match.group("rest"))
+
+        if "delete" in q and _has_word(q, "all", "sab"):
+            self._delete_all()
+            return "All reminders have been deleted."
+
+        tag = _extract_tag(q)
+        if _has_word(q, "recurring", "repeating"):
+            return self._describe_series(tag)
+
+        limit = None
+        now = datetime.now(ZoneInfo("UTC"))
+
+        if _has_word(q, "tomorrow", "kal"):
+            start, end = self._day_window(1)
+            label = "reminders for tomorrow"
+        elif _has_word(q, "today", "aaj"):
+            start, end = now, self._day_window(0)[1]
+            label = "reminders for today"
+        elif _has_word(q, "week", "hafte", "hafta"):
+            local_now = datetime.now(ZoneInfo(self.timezone))
+            start, end = now, self._day_window(7 - local_now.weekday())[0]
+            label = "reminders this week"
+        elif _has_word(q, "expired", "old", "purane"):
+            start, end = None, now
+            label = "expired reminders"
+        else:
+            start, end = now, None
+            label = "upcoming reminders"
+            next_n = NEXT_N_RE.search(q)
+            if next_n:
+                limit = max(1, int(next_n.group(1)))
+
+        scope = f"{label} tagged '{tag}'" if tag else label
+        heading = f"Your next {{total}} {scope}" if limit else f"You have {{total}} {scope}"
+        pager = self.listing(start, end, tag, heading, limit)
+        if pager is None:
+            return f"You have no {scope}."
+        return paging.answer(pager)
+
+    def _set_from_command(self, rest: str) -> str:
+        """
+        "call mom at 5 pm work tag": try each place the time phrase could
+        start, leftmost first, and keep the first split that parses. Every
+        split is tried on the fast path; only the leftmost SLOW_SPLITS go
+        to dateparser (tens of ms each, seconds for its first import).
+        """
+        tag = _extract_tag(rest)
+        if tag:
+            phrase = rf"(?:\s(?:under|with))?\s*(?:{re.escape(tag)}\s+(?:tag|category)|(?:tag|category)\s+{re.escape(tag)})\b"
+            rest = re.sub(phrase, "", rest, count=1).strip()
+        repeat, rest = _extract_repeat(rest)
+
+        splits = [
+            (rest[: split.start()].strip(), rest[split.end():].strip())
+            for split in TIME_START_RE.finditer(rest)
+        ]
+        splits = [(text, time_str) for text, time_str in splits if text]
+        for fast_only, candidates in ((True, splits), (False, splits[:SLOW_SPLITS])):
+            for text, time_str in candidates:
+                reminder_time = self._parse_time(time_str, fast_only=fast_only)
+                if reminder_time is not None:
+                    _, message = self._create(text, reminder_time, None, tag or "uncategorized", repeat)
+                    return message
+
+        if repeat and rest:
+            # "drink water every 2 hours": the series starts now
+            now = datetime.now(ZoneInfo(self.timezone))
+            _, message = self._create(rest, now, None, tag or "uncategorized", repeat)
+            return message
+        return "Sorry, I couldn't understand the reminder time."
+
+    def _describe_series(self, tag: Optional[str]) -> str:
+        reminders = self.store.data["reminders"]
+        series = [
+            reminders[i] for i in list(self._series)
+            if i in reminders and (not tag or reminders[i].get("tag") == tag)
         ]
+        if not series:
+            return "You have no recurring reminders."
+        pager = paging.Pager(
+            map(self._describe, series), len(series), f"You have {len(series)} recurring reminders"
+        )
+        return paging.answer(pager)
 
-        if not expired:
-            speak("You have no expired reminders.")
-            return
+    # ---------- SPOKEN LISTINGS ---------- #
 
-        speak(f"You have {len(expired)} expired reminders:")
-        for reminder in expired:
-            self._speak_reminder(reminder)
+    def listing(
+        self,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        tag: Optional[str],
+        heading: str,
+        limit: Optional[int] = None,
+    ) -> Optional[paging.Pager]:
+        """
+        Pager over query(start, end, tag); later pages are fetched as they
+        are asked for.
 
-    def show_by_tag(self, tag: str) -> None:
-        """Display reminders by tag."""
-        filtered = [
-            r
-            for r in self.reminders
-            if r.get("tag", "uncategorized").lower() == tag.lower()
-        ]
+        Args:
+            heading: Format string with {total}
+            limit: Only the first limit matches (default: all)
 
-        if not filtered:
-            speak(f"No reminders found with tag '{tag}'.")
-            return
+        Returns:
+            Pager, or None if nothing matches
+        """
+        page, total = self.query(start, end, tag, limit=PAGE_SIZE if limit is None else min(limit, PAGE_SIZE))
+        if not total:
+            return None
+        if limit is not None:
+            total = min(total, limit)
+
+        def lines() -> Iterator[str]:
+            batch, offset = page, 0
+            while batch:
+                yield from map(self._describe, batch)
+                offset += len(batch)
+                if offset >= total:
+                    return
+                batch, _ = self.query(start, end, tag, offset=offset, limit=min(PAGE_SIZE, total - offset))
 
-        speak(f"You have {len(filtered)} reminders with tag '{tag}':")
-        for reminder in filtered:
-            self._speak_reminder(reminder)
+        return paging.Pager(lines(), total, heading.format(total=total))
+
+    def _speak_listing(self, pager: Optional[paging.Pager], empty: str) -> None:
+        speak(paging.answer(pager) if pager is not None else empty)
+
+    def show_all(self) -> None:
+        """Display all reminders, a page at a time."""
+        reminders = self.reminders
+        pager = None
+        if reminders:
+            pager = paging.Pager(
+                map(self._describe, reminders), len(reminders), f"You have {len(reminders)} reminders"
+            )
+        self._speak_listing(pager, "You have no reminders saved.")
+
+    def show_upcoming(self) -> None:
+        """Display upcoming reminders, a page at a time."""
+        pager = self.listing(datetime.now(ZoneInfo("UTC")), None, None, "You have {total} upcoming reminders")
+        self._speak_listing(pager, "You have no upcoming reminders.")
+
+    def show_expired(self) -> None:
+        """Display expired reminders, a page at a time."""
+        pager = self.listing(None, datetime.now(ZoneInfo("UTC")), None, "You have {total} expired reminders")
+        self._speak_listing(pager, "You have no expired reminders.")
+
+    def show_by_tag(self, tag: str) -> None:
+        """Display reminders by tag, a page at a time."""
+        pager = self.listing(None, None, tag, f"You have {{total}} reminders with tag '{tag}'")
+        self._speak_listing(pager, f"No reminders found with tag '{tag}'.")
 
     def show_interactive(self) -> None:
         """Show reminders with user choice."""
@@ -194,8 +551,7 @@ class ReminderManager:
         else:
             self.show_all()
 
-    def _speak_reminder(self, reminder: Dict) -> None:
-        """Speak a single reminder."""
+    def _describe(self, reminder: Dict) -> str:
         time_dt = self._parse_iso_time(reminder.get("time", ""))
         if time_dt:
             local_time = time_dt.astimezone(ZoneInfo(self.timezone))
@@ -203,38 +559,188 @@ class ReminderManager:
         else:
             formatted = "unknown time"
 
-        speak(
+        text = (
             f"{reminder['text']} at {formatted} "
             f"in {reminder['city']} under {reminder['tag']} tag"
         )
+        if reminder.get("repeat"):
+            text += f", repeating {describe_repeat(reminder['repeat'])}"
+        return text
+
+    def _speak_reminder(self, reminder: Dict) -> None:
+        """Speak a single reminder."""
+        speak(self._describe(reminder))
+
+    # ---------- FIRING ---------- #
 
     def check_and_trigger(self) -> None:
-        """Check for triggered reminders and speak them."""
-        now_utc = datetime.now(ZoneInfo("UTC"))
-        to_remove = []
+        """Fire every reminder that is already due (the timer thread does this on its own)."""
+        for reminder_id in self.scheduler.pop_due():
+            self._fire(reminder_id)
 
-        for i, reminder in enumerate(self.reminders):
-            reminder_time = self._parse_iso_time(reminder.get("time", ""))
-            if reminder_time is None:
-                continue
+    def _fire(self, reminder_id: str) -> None:
+        reminder = self.store.data["reminders"].get(reminder_id)
+        if reminder is None:
+            return
 
-            if now_utc >= reminder_time:
-                local_time = reminder_time.astimezone(ZoneInfo(self.timezone))
-                formatted = local_time.strftime("%d %B %Y, %I:%M %p")
-                speak(
-                    f"Reminder: {reminder['text']} (set for {formatted} IST)"
-                )
-                to_remove.append(i)
+        now = datetime.now(ZoneInfo("UTC"))
+        reminder_time = self._parse_iso_time(reminder.get("time", ""))
+        if reminder_time is not None:
+            FIRE_LAG.observe((now - reminder_time).total_seconds())
+
+        if reminder.get("repeat"):
+            # Materialize only the next occurrence (missed ones are skipped)
+            since = max(now, reminder_time or now) + timedelta(seconds=1)
+            following = next(occurrences(reminder["repeat"], since, ZoneInfo(self.timezone)))
+            updated = dict(reminder, time=following.astimezone(ZoneInfo("UTC")).isoformat())
+            self.store.set_item("reminders", reminder_id, updated)
+            self._schedule(updated)
+        else:
+            self.store.del_item("reminders", reminder_id)
+            self.index.remove(reminder_id)
 
-        # Remove triggered reminders
-        for i in reversed(to_remove):
-            self.reminders.pop(i)
+        if self.on_fire is not None:
+            self.on_fire(reminder)
+        else:
+            speak(self.announce(reminder))
 
-        if to_remove:
-            self._save()
+    def announce(self, reminder: Dict) -> str:
+        """Spoken text for a due reminder."""
+        reminder_time = self._parse_iso_time(reminder.get("time", ""))
+        if reminder_time is None:
+            return f"Reminder: {reminder['text']}"
+        local_time = reminder_time.astimezone(ZoneInfo(self.timezone))
+        formatted = local_time.strftime("%d %B %Y, %I:%M %p")
+        return f"Reminder: {reminder['text']} (set for {formatted} IST)"
 
     def delete_all(self) -> None:
         """Delete all reminders."""
-        self.reminders.clear()
-        self._save()
+        self._delete_all()
         speak("All reminders have been deleted.")
+
+    def _delete_all(self) -> None:
+        self.store.set("reminders", {})
+        self.scheduler.clear()
+        self.index.clear()
+        self._series.clear()
+
+
+# ---------- RECURRENCE ---------- #
+
+def occurrences(repeat: Dict, since: datetime, tz: ZoneInfo) -> Iterator[datetime]:
+    """
+    Lazily yield occurrences of a recurrence rule at or after `since`.
+
+    Jumps straight to `since` instead of walking the series from its start,
+    so the cost does not grow with how long the series has run.
+
+    Args:
+        repeat: Rule with "freq" (hourly | daily | weekdays | monthly),
+            "interval", optional "day" (monthly) and "start" (local ISO time)
+        since: Timezone-aware lower bound
+        tz: Zone wall-clock times are kept in
+
+    Yields:
+        Timezone-aware datetimes in tz, ascending
+    """
+    start = datetime.fromisoformat(repeat["start"]).astimezone(tz)
+    since = max(since.astimezone(tz), start)
+    freq = repeat.get("freq", "daily")
+    interval = max(1, int(repeat.get("interval", 1)))
+
+    if freq == "hourly":
+        # Fixed steps in absolute time
+        step = timedelta(hours=interval)
+        utc = ZoneInfo("UTC")
+        start_utc = start.astimezone(utc)
+        n = -(-(since.astimezone(utc) - start_utc) // step)
+        t = start_utc + n * step
+        while True:
+            yield t.astimezone(tz)
+            t += step
+
+    elif freq in ("daily", "weekdays"):
+        # Same wall-clock time; day offsets aligned to the start date
+        day = since.date()
+        if interval > 1:
+            behind = (day - start.date()).days % interval
+            if behind:
+                day += timedelta(days=interval - behind)
+        while True:
+            t = datetime.combine(day, start.time(), tzinfo=tz)
+            if t >= since and (freq == "daily" or day.weekday() < 5):
+                yield t
+            day += timedelta(days=interval)
+
+    elif freq == "monthly":
+        dom = int(repeat.get("day", start.day))
+        year, month = since.year, since.month
+        while True:
+            last = calendar.monthrange(year, month)[1]
+            t = datetime.combine(date(year, month, min(dom, last)), start.time(), tzinfo=tz)
+            if t >= since:
+                yield t
+            month += interval
+            year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+
+    else:
+        raise ValueError(f"Unknown recurrence: {freq}")
+
+
+def describe_repeat(repeat: Dict) -> str:
+    freq, interval = repeat.get("freq"), int(repeat.get("interval", 1))
+    if freq == "hourly":
+        return "every hour" if interval == 1 else f"every {interval} hours"
+    if freq == "weekdays":
+        return "on weekdays"
+    if freq == "daily":
+        return {1: "daily", 7: "weekly"}.get(interval, f"every {interval} days")
+    if freq == "monthly":
+        day = repeat.get("day") or datetime.fromisoformat(repeat["start"]).day
+        return f"monthly on day {day}"
+    return freq or "once"
+
+
+def _extract_repeat(text: str) -> Tuple[Optional[Dict], str]:
+    for regex, build in REPEAT_PATTERNS:
+        match = regex.search(text)
+        if match:
+            rest = (text[: match.start()] + " " + text[match.end():]).strip()
+            return build(match), " ".join(rest.split())
+    return None, text
+
+
+def _has_word(text: str, *words: str) -> bool:
+    return any(re.search(rf"\b{w}\b", text) for w in words)
+
+
+def _extract_tag(text: str) -> Optional[str]:
+    """ "work tag", "tag work", "with tag work" -> "work"."""
+    for regex in (TAG_BEFORE_RE, TAG_AFTER_RE):
+        for match in regex.finditer(text):
+            if match.group(1) not in TAG_FILLER:
+                return match.group(1)
+    return None
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def _migrate_legacy(raw: Any) -> Dict:
+    """
+    Older files held a bare list (or {"reminders": [...]}) without ids;
+    key every reminder by a fresh id.
+    """
+    if isinstance(raw, dict) and not isinstance(raw.get("reminders", {}), list):
+        return raw
+    items = raw.get("reminders", []) if isinstance(raw, dict) else raw
+    if not isinstance(items, list):
+        items = []
+
+    reminders = {}
+    for item in items:
+        if isinstance(item, dict):
+            item.setdefault("id", _new_id())
+            reminders[item["id"]] = item
+    return {"reminders": reminders}
@@ -1,27 +1,97 @@
 """
 Weather module for Huzenix.
 Fetches and provides weather information.
+
+Responses are cached per city. A fresh entry is answered without a request;
+a stale one is answered at once while a background refresh replaces it, so
+a slow API only ever delays the first query for a city. Requests share one
+keep-alive session, and the last asked-for city is prefetched shortly
+before the hours weather is usually asked for.
+
+When data/city.list.json(.gz) from OpenWeather is present, spoken names are
+resolved through an offline gazetteer (modules/gazetteer.py) and queried by
+city id, so "luck now" still finds Lucknow.
 """
 
 import os
 import re
-from typing import Optional, Dict
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, Dict, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 
+from core import metrics
+from core.scheduler import DeadlineScheduler
 from core.voice_output import speak
+from modules.gazetteer import open_gazetteer
+
+DEFAULT_BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
+DEFAULT_TTL = 600         # seconds an answer is fresh
+MAX_STALE = 3 * 3600      # stale answers older than this are refetched first
+NOT_FOUND_TTL = 300       # unknown city names are remembered this long
+POOL_SIZE = 4
+PREFETCH_LEAD = 300       # prefetch this long before a usual query hour
+PREFETCH_MIN_QUERIES = 2  # an hour is "usual" after this many queries in it
+
+CACHE = metrics.counter("huzenix_weather_cache_total", "Weather lookups by cache result")
+FETCH_LATENCY = metrics.histogram("huzenix_weather_fetch_seconds", "OpenWeather request latency")
 
 
 class WeatherManager:
     """Manages weather data fetching."""
 
-    def __init__(self):
-        """Initialize weather manager."""
-        self.api_key = os.getenv("OPENWEATHER_API_KEY") or os.getenv(
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        max_stale: float = MAX_STALE,
+        prefetch: bool = True,
+        data_dir: Path = None,
+        country: str = "IN",
+    ):
+        """
+        Initialize weather manager.
+
+        Args:
+            api_key: OpenWeather key (default: OPENWEATHER_API_KEY / WEATHER_API_KEY)
+            base_url: Current-weather endpoint (default: OPENWEATHER_URL or OpenWeather)
+            ttl: Seconds a cached answer is served without a refresh
+            max_stale: Seconds a stale answer may still be served while refreshing
+            prefetch: Refresh last_city ahead of the usual query hours
+            data_dir: Where city.list.json(.gz) / cities-*.idx live
+            country: Preferred country when several cities share a name
+        """
+        self.api_key = api_key or os.getenv("OPENWEATHER_API_KEY") or os.getenv(
             "WEATHER_API_KEY"
         )
-        self.base_url = "http://api.openweathermap.org/data/2.5/weather"
+        self.base_url = base_url or os.getenv("OPENWEATHER_URL", DEFAULT_BASE_URL)
         self.timeout = 6
         self.last_city = "Lucknow"
+        self.ttl = ttl
+        self.max_stale = max_stale
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # city key -> (data or None if not found, fetched at)
+        self._cache: Dict[str, Tuple[Optional[Dict], float]] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        if data_dir is None:
+            data_dir = Path(__file__).parent.parent / "data"
+        self.country = country
+        self.gazetteer = open_gazetteer(data_dir, on_built=self._use_gazetteer)
+
+        self.prefetch = prefetch
+        self._query_hours = [0] * 24
+        self._prefetcher = DeadlineScheduler(self._prefetch, name="huzenix-weather")
 
     def get_weather(self, query: str) -> str:
         """
@@ -40,9 +110,11 @@ class WeatherManager:
             )
 
         city = self._extract_city(query)
+        self._note_query_time()
 
         try:
-            data = self._fetch_weather_data(city)
+            city, city_id = self.resolve_city(city)
+            data = self.lookup(city, city_id)
             if not data:
                 return f"Weather info for '{city}' not found."
 
@@ -66,46 +138,185 @@ class WeatherManager:
         """
         match = re.search(r"\bin\s+(.+)", (query or "").lower())
         if match:
-            city = match.group(1).strip()
+            spoken = match.group(1).strip()
             # Remove common trailing words
-            city = re.sub(r"\b(today|now|please)\b", "", city).strip()
+            city = re.sub(r"\b(today|now|please)\b", "", spoken).strip()
+            if city != spoken and self.gazetteer:
+                # ...unless they are part of the name ("luck now" -> Lucknow)
+                whole = self.gazetteer.resolve(spoken, self.country)
+                if whole and whole["score"] == 1.0:
+                    city = spoken
             self.last_city = city
             return city
 
         return self.last_city
 
-    def _fetch_weather_data(self, city: str) -> Optional[Dict]:
+    def _use_gazetteer(self, gazetteer) -> None:
+        old, self.gazetteer = self.gazetteer, gazetteer
+        if old is not None:
+            old.close()
+
+    def resolve_city(self, city: str) -> Tuple[str, Optional[int]]:
         """
-        Fetch weather data from API.
+        Canonical name and OpenWeather id for a spoken city name.
+
+        Returns:
+            (name, id), or (city, None) when there is no gazetteer or no
+            close match (the API is then queried by name)
+        """
+        match = self.gazetteer.resolve(city, self.country) if self.gazetteer else None
+        if match is None:
+            return city, None
+        return match["name"], match["id"]
+
+    # ---------- CACHE ---------- #
+
+    @staticmethod
+    def _key(city: str, city_id: Optional[int] = None) -> str:
+        return f"#{city_id}" if city_id is not None else " ".join(city.lower().split())
+
+    def lookup(self, city: str, city_id: Optional[int] = None) -> Optional[Dict]:
+        """
+        Weather data for city, from the cache when possible.
 
         Args:
             city: City name
+            city_id: OpenWeather id (preferred over the name when given)
 
         Returns:
-            Weather data dict or None
+            Weather data dict, or None if the city is unknown
+
+        Raises:
+            requests.RequestException: No usable cached answer and the request failed
         """
-        params = {"q": city, "appid": self.api_key, "units": "metric"}
+        key = self._key(city, city_id)
+        with self._lock:
+            entry = self._cache.get(key)
+        now = time.time()
+
+        if entry is not None:
+            data, fetched_at = entry
+            age = now - fetched_at
+            if data is None and age < NOT_FOUND_TTL:
+                CACHE.inc(result="not_found")
+                return None
+            if data is not None and age < self.ttl:
+                CACHE.inc(result="fresh")
+                return data
+            if data is not None and age < self.max_stale:
+                CACHE.inc(result="stale")
+                self._refresh_async(city, city_id)
+                return data
 
+        CACHE.inc(result="miss")
         try:
-            response = requests.get(
+            return self._refresh(city, city_id)
+        except requests.RequestException:
+            if entry is not None and entry[0] is not None:
+                # Very old is still better than nothing when the API is down
+                return entry[0]
+            raise
+
+    def _refresh(self, city: str, city_id: Optional[int] = None) -> Optional[Dict]:
+        data = self._fetch_weather_data(city, city_id)
+        with self._lock:
+            self._cache[self._key(city, city_id)] = (data, time.time())
+        return data
+
+    def _refresh_async(self, city: str, city_id: Optional[int] = None) -> None:
+        key = self._key(city, city_id)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._refresh(city, city_id)
+            except requests.RequestException as e:
+                print(f"Weather refresh error: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="huzenix-weather-refresh", daemon=True).start()
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    # ---------- PREFETCH ---------- #
+
+    def _note_query_time(self) -> None:
+        if not self.prefetch:
+            return
+        self._query_hours[datetime.now().hour] += 1
+        self._schedule_prefetch()
+
+    def _schedule_prefetch(self) -> None:
+        """Queue a refresh of last_city just before the next usual query hour."""
+        now = datetime.now()
+        top_of_hour = now.replace(minute=0, second=0, microsecond=0)
+        for ahead in range(1, 25):
+            hour_start = top_of_hour + timedelta(hours=ahead)
+            if self._query_hours[hour_start.hour] >= PREFETCH_MIN_QUERIES:
+                self._prefetcher.schedule("last_city", hour_start.timestamp() - PREFETCH_LEAD)
+                self._prefetcher.start()
+                return
+
+    def _prefetch(self, _: str) -> None:
+        # Runs on the prefetch thread; failures just leave the cache as is
+        if self.api_key:
+            try:
+                self._refresh(*self.resolve_city(self.last_city))
+            except requests.RequestException as e:
+                print(f"Weather prefetch error: {e}")
+        self._schedule_prefetch()
+
+    # ---------- API ---------- #
+
+    def _fetch_weather_data(self, city: str, city_id: Optional[int] = None) -> Optional[Dict]:
+        """
+        Fetch weather data from API.
+
+        Args:
+            city: City name
+            city_id: OpenWeather id (exact, skips the API's name matching)
+
+        Returns:
+            Weather data dict, or None if the API doesn't know the city
+
+        Raises:
+            requests.RequestException: Network error or timeout
+        """
+        params = {"appid": self.api_key, "units": "metric"}
+        if city_id is not None:
+            params["id"] = city_id
+        else:
+            params["q"] = city
+
+        with FETCH_LATENCY.time():
+            response = self._session.get(
                 self.base_url, params=params, timeout=self.timeout
             )
+        try:
             data = response.json()
+        except ValueError:
+            response.raise_for_status()
+            raise requests.RequestException("Invalid weather response")
 
-            cod = data.get("cod")
-            if isinstance(cod, str):
-                cod = int(cod) if cod.isdigit() else 0
+        cod = data.get("cod")
+        if isinstance(cod, str):
+            cod = int(cod) if cod.isdigit() else 0
 
-            if cod != 200:
-                message = data.get("message", "not found")
-                print(f"Weather API error: {message}")
+        if cod != 200:
+            message = data.get("message", "not found")
+            print(f"Weather API error: {message}")
+            if cod == 404:
                 return None
+            raise requests.RequestException(f"Weather API error: {message}")
 
-            return data
-
-        except requests.RequestException as e:
-            print(f"Request error: {e}")
-            return None
+        return data
 
     def _format_weather(self, data: Dict, city: str) -> str:
         """
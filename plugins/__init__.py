@@ -1,6 +1,24 @@
-"""Huzenix plugins package."""
+"""
+Huzenix plugins package.
 
-from plugins.base import HuzenixPlugin
-from plugins.chat import ChatPlugin
+Plugins are found through their manifests (plugins/registry.py) and only
+imported when first used; the names below are imported on first access.
+"""
 
-__all__ = ["HuzenixPlugin", "ChatPlugin"]
+import importlib
+
+_EXPORTS = {
+    "HuzenixPlugin": "plugins.base",
+    "ChatPlugin": "plugins.chat",
+    "LazyPlugin": "plugins.registry",
+    "discover": "plugins.registry",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'plugins' has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
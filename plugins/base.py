@@ -35,6 +35,11 @@ class HuzenixPlugin(ABC):
         """
         pass
 
+    @property
+    def keywords(self) -> dict:
+        """Extra intent keywords, {Intent: [keyword, ...]} (optional)."""
+        return {}
+
     def register(self, engine) -> None:
         """
         Register this plugin with conversation engine.
@@ -42,5 +47,7 @@ class HuzenixPlugin(ABC):
         Args:
             engine: ConversationEngine instance
         """
+        for intent, words in self.keywords.items():
+            engine.intent_parser.add_keywords(intent, words)
         for intent in self.intents:
             engine.register_handler(intent, self.handle)
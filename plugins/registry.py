@@ -0,0 +1,227 @@
+"""
+Plugin discovery for Huzenix.
+
+Each plugin ships a JSON manifest next to its module:
+
+    {
+      "name": "ChatPlugin",
+      "entry": "plugins.chat:ChatPlugin",
+      "intents": ["conversation"],
+      "keywords": {"conversation": ["gpt"]}
+    }
+
+Startup only reads the manifests and registers a LazyPlugin per plugin with
+the engine (intents and keywords), so a plugin's module and its heavy
+dependencies are imported the first time one of its intents is routed, not
+before. Manifests are read from the plugins package and from the folders in
+HUZENIX_PLUGIN_PATH (os.pathsep-separated; those folders are importable).
+
+    python -m plugins.registry --counts 1,10,100     # startup benchmark
+"""
+
+import argparse
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from core import metrics
+from core.intent_parser import Intent
+from plugins.base import HuzenixPlugin
+
+PLUGIN_DIR = Path(__file__).parent
+PATH_ENV = "HUZENIX_PLUGIN_PATH"
+MANIFEST_GLOB = "*.json"
+
+PLUGIN_IMPORTS = metrics.histogram("huzenix_plugin_import_seconds", "Time to import a plugin on first use")
+PLUGIN_LOADS = metrics.counter("huzenix_plugin_loads_total", "Plugin imports by outcome")
+
+
+class ManifestError(ValueError):
+    """A manifest is missing fields or names unknown intents."""
+
+
+def _intent(value: str) -> Intent:
+    try:
+        return Intent(value.lower())
+    except ValueError:
+        raise ManifestError(f"unknown intent {value!r}")
+
+
+class LazyPlugin(HuzenixPlugin):
+    """Stands in for a plugin until one of its intents is routed to it."""
+
+    def __init__(self, manifest: Dict, source: Path = None):
+        """
+        Args:
+            manifest: Parsed manifest (see module doc)
+            source: Manifest file, for messages
+
+        Raises:
+            ManifestError: Missing name/entry/intents or unknown intent
+        """
+        try:
+            self._name = manifest["name"]
+            self.entry = manifest["entry"]
+            self._intents = [_intent(i) for i in manifest["intents"]]
+        except (KeyError, TypeError):
+            raise ManifestError(f"{source or 'manifest'} needs name, entry and intents")
+        if ":" not in self.entry:
+            raise ManifestError(f"entry {self.entry!r} should look like 'package.module:Class'")
+        self._keywords = {_intent(i): list(words) for i, words in (manifest.get("keywords") or {}).items()}
+        self.source = source
+        self._plugin: Optional[HuzenixPlugin] = None
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def intents(self) -> list:
+        return self._intents
+
+    @property
+    def keywords(self) -> dict:
+        return self._keywords
+
+    @property
+    def loaded(self) -> bool:
+        return self._plugin is not None
+
+    def load(self) -> Optional[HuzenixPlugin]:
+        """Import and create the real plugin (once); None if that failed."""
+        with self._lock:
+            if self._plugin is None and self._error is None:
+                module_name, _, attr = self.entry.partition(":")
+                started = time.perf_counter()
+                try:
+                    plugin_class = getattr(importlib.import_module(module_name), attr)
+                    self._plugin = plugin_class()
+                    PLUGIN_LOADS.inc(outcome="ok")
+                except Exception as e:
+                    self._error = str(e)
+                    PLUGIN_LOADS.inc(outcome="error")
+                    print(f"Plugin {self._name} load error: {e}")
+                PLUGIN_IMPORTS.observe(time.perf_counter() - started)
+            return self._plugin
+
+    def handle(self, query: str) -> str:
+        plugin = self.load()
+        if plugin is None:
+            return f"The {self._name} plugin could not be loaded."
+        return plugin.handle(query)
+
+
+def _manifest_dirs() -> List[Path]:
+    dirs = [PLUGIN_DIR]
+    for entry in os.getenv(PATH_ENV, "").split(os.pathsep):
+        if entry:
+            dirs.append(Path(entry))
+    return dirs
+
+
+def discover(dirs: Iterable[Path] = None) -> List[LazyPlugin]:
+    """
+    Read plugin manifests without importing any plugin.
+
+    Args:
+        dirs: Folders to scan (default: the plugins package and HUZENIX_PLUGIN_PATH)
+
+    Returns:
+        One LazyPlugin per valid manifest, in file name order
+    """
+    plugins = []
+    for directory in (_manifest_dirs() if dirs is None else dirs):
+        directory = Path(directory)
+        if not directory.is_dir():
+            continue
+        if directory != PLUGIN_DIR and str(directory) not in sys.path:
+            sys.path.append(str(directory))
+        for path in sorted(directory.glob(MANIFEST_GLOB)):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    plugins.append(LazyPlugin(json.load(f), path))
+            except (OSError, ValueError) as e:
+                print(f"Plugin manifest error ({path.name}): {e}")
+    return plugins
+
+
+# ---------- BENCHMARK ---------- #
+
+def _make_plugins(root: Path, count: int, import_ms: float, functions: int) -> None:
+    for i in range(count):
+        name = f"{root.name.replace('-', '_')}_{i}"  # unique per run: not in sys.modules yet
+        body = "\n".join(f"def helper_{j}(x):\n    return x * {j} + {i}\n" for j in range(functions))
+        (root / f"{name}.py").write_text(
+            "import time\n"
+            f"time.sleep({import_ms / 1000})  # stands in for a heavy dependency\n"
+            "from plugins.base import HuzenixPlugin\n"
+            f"{body}\n"
+            f"class Plugin(HuzenixPlugin):\n"
+            f"    name = 'bench{i}'\n"
+            f"    intents = []\n"
+            f"    def handle(self, query):\n"
+            f"        return helper_1(len(query))\n",
+            encoding="utf-8",
+        )
+        manifest = {"name": f"bench{i}", "entry": f"{name}:Plugin", "intents": ["conversation"],
+                    "keywords": {"conversation": [f"bench{i}"]}}
+        (root / f"{name}.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+
+def benchmark(counts: List[int], import_ms: float = 20.0, functions: int = 200) -> List[Dict]:
+    """Startup cost of discovering and registering N plugins, lazy vs importing them all."""
+    from core.conversation_engine import ConversationEngine
+
+    report = []
+    for count in counts:
+        root = Path(tempfile.mkdtemp(prefix="huzenix-plugins-"))
+        try:
+            _make_plugins(root, count, import_ms, functions)
+            engine = ConversationEngine()
+            started = time.perf_counter()
+            plugins = discover([root])
+            for plugin in plugins:
+                plugin.register(engine)
+            lazy = time.perf_counter() - started
+
+            started = time.perf_counter()
+            plugins[0].handle("hello")
+            first_use = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for plugin in plugins[1:]:
+                plugin.load()
+            eager = lazy + first_use + time.perf_counter() - started
+            report.append({
+                "plugins": count,
+                "lazy_startup_ms": round(lazy * 1000, 2),
+                "eager_startup_ms": round(eager * 1000, 1),
+                "first_use_ms": round(first_use * 1000, 1),
+            })
+        finally:
+            sys.path.remove(str(root))
+            shutil.rmtree(root, ignore_errors=True)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Huzenix plugin startup")
+    parser.add_argument("--counts", default="1,10,50,200", help="plugin counts to try")
+    parser.add_argument("--import-ms", type=float, default=20.0, help="simulated import time per plugin")
+    parser.add_argument("--functions", type=int, default=200, help="functions per generated module")
+    args = parser.parse_args()
+    counts = [int(c) for c in args.counts.split(",")]
+    print(json.dumps(benchmark(counts, args.import_ms, args.functions), indent=2))
+
+
+if __name__ == "__main__":
+    main()